@@ -81,9 +81,40 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Take the write lock at BEGIN so concurrent ticket claims queue up
+            # on the busy timeout instead of failing on a lock upgrade.
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
+        # File-backed test DB: the shared-cache in-memory DB raises "table is
+        # locked" instead of waiting, which breaks the concurrent claim tests.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
+# --- Cache ----------------------------------------------------------------------
+# Per-process memory by default; point CACHE_BACKEND/CACHE_LOCATION at Redis or
+# Memcached in production so all workers share the dashboard stats cache.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "campus-default"),
+    }
+}
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv("DASHBOARD_STATS_CACHE_TTL", "30"))
+
+# --- Event search -----------------------------------------------------------------
+# "auto": the database index (SQLite FTS5 / PostgreSQL tsvector) where there is
+# one, else the in-process index; "database" or "memory" force one of them.
+EVENT_SEARCH_BACKEND = os.getenv("EVENT_SEARCH_BACKEND", "auto")
+
+# --- Ticket QR codes -------------------------------------------------------------
+# Only signed CE1 payloads check in. To let codes printed before the switch
+# (legacy JSON, bare ticket ids) still scan while they are reissued, set an
+# ISO date or datetime; unsigned payloads are refused again after it.
+QR_ACCEPT_UNSIGNED_UNTIL = os.getenv("QR_ACCEPT_UNSIGNED_UNTIL", "")
+
 # --- Password validation ------------------------------------------------------
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -105,6 +136,10 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Attendee exports hold personal data: kept outside MEDIA_ROOT (which DEBUG
+# serves to anyone) and only handed out by the export download view.
+EXPORTS_ROOT = Path(os.getenv("EXPORTS_ROOT", BASE_DIR / "private" / "exports"))
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "campusevents.User"
 
@@ -184,11 +219,30 @@ DEFAULT_FROM_EMAIL = os.getenv(
     f"Campus Events <{EMAIL_HOST_USER}>" if EMAIL_HOST_USER else "Campus Events <no-reply@example.com>",
 )
 
+# Queued emails are sent in batches, one connection per batch, at most
+# EMAIL_RATE_PER_MINUTE per minute (campusevents.emails.dispatch).
+EMAIL_DISPATCH_BATCH_SIZE = int(os.getenv("EMAIL_DISPATCH_BATCH_SIZE", "100"))
+EMAIL_RATE_PER_MINUTE = int(os.getenv("EMAIL_RATE_PER_MINUTE", "600"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+
 # --- Celery defaults ---------------------------------------------------------
 CELERY_TASK_ALWAYS_EAGER = False
 CELERY_BROKER_URL = "memory://"
 CELERY_RESULT_BACKEND = "cache+memory://"
 
+CELERY_BEAT_SCHEDULE = {
+    # Roll closed days into DailyStats so the dashboard doesn't scan tickets.
+    "rollup-daily-stats": {
+        "task": "campusevents.tasks.rollup_daily_stats",
+        "schedule": 15 * 60.0,
+    },
+    # Drain queued emails (batched, rate capped; see campusevents.emails.dispatch).
+    "dispatch-email-queue": {
+        "task": "campusevents.tasks.dispatch_email_queue",
+        "schedule": 60.0,
+    },
+}
+
 # Test mode: pytest / CI
 if "pytest" in _sys.modules or os.environ.get("DJANGO_TEST", "0") == "1":
     CELERY_TASK_ALWAYS_EAGER = True
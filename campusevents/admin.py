@@ -1,7 +1,7 @@
 # campusevents/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Organization, Event, Ticket, EmailLog
+from .models import User, Organization, Event, Ticket, EmailLog, DailyStats, ExportJob
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -67,7 +67,10 @@ class EventAdmin(admin.ModelAdmin):
     readonly_fields = ("stats",)
 
     def stats(self, obj):
-        return f"Remaining capacity: {obj.remaining_capacity}"
+        return (
+            f"Remaining capacity: {obj.remaining_capacity} "
+            f"(issued: {obj.issued_count}, used: {obj.used_count}, cancelled: {obj.cancelled_count})"
+        )
 
 
 @admin.register(Ticket)
@@ -87,7 +90,34 @@ class TicketAdmin(admin.ModelAdmin):
 
 @admin.register(EmailLog)
 class EmailLogAdmin(admin.ModelAdmin):
-    list_display = ("to", "subject", "status", "created_at", "sent_at", "user", "event_id", "ticket_id")
+    list_display = ("to", "subject", "status", "attempts", "created_at", "sent_at", "user", "event_id", "ticket_id")
     list_filter = ("status",)
     search_fields = ("to", "subject", "last_error", "message_id", "send_key")
     readonly_fields = ("created_at", "sent_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Requeue for the email dispatcher")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=EmailLog.SENT).update(status=EmailLog.QUEUED, last_error="")
+        self.message_user(request, f"Requeued {updated} email(s).")
+
+
+@admin.register(DailyStats)
+class DailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("day", "events_created", "tickets_issued", "tickets_used", "updated_at")
+    date_hierarchy = "day"
+    readonly_fields = ("day", "events_created", "tickets_issued", "tickets_used", "updated_at")
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_by", "format", "status", "rows_written", "rows_total", "created_at", "finished_at")
+    list_filter = ("status", "format")
+    search_fields = ("created_by__email",)
+    # the file is private (no URL), so show its name rather than a link
+    readonly_fields = ("rows_total", "rows_written", "file_name", "error", "created_at", "finished_at")
+    exclude = ("file",)
+
+    @admin.display(description="File")
+    def file_name(self, obj):
+        return obj.file.name or "-"
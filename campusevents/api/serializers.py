@@ -5,8 +5,11 @@ Serializers for the campusevents app.
 
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.urls import reverse
 from django.utils import timezone
-from ..models import User, Organization, Event, Ticket
+from ..exports import available_export_formats
+from ..models import User, Organization, Event, Ticket, ExportJob
+from ..qr import parse_qr_payload
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -255,6 +258,9 @@ class EventSerializer(serializers.ModelSerializer):
     org_name = serializers.CharField(source='org.name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     remaining_capacity = serializers.ReadOnlyField()
+    # only with a CalendarLinks in the context (see views.utils.event_serializer_context)
+    gcal_url = serializers.SerializerMethodField()
+    ics_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Event
@@ -262,10 +268,22 @@ class EventSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'category', 'location',
             'start_at', 'end_at', 'capacity', 'remaining_capacity',
             'ticket_type', 'status', 'org', 'org_name', 'created_by',
-            'created_by_name'
+            'created_by_name', 'gcal_url', 'ics_url'
         ]
         read_only_fields = ['id', 'created_by']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'calendar_links' not in self.context:
+            self.fields.pop('gcal_url')
+            self.fields.pop('ics_url')
+
+    def get_gcal_url(self, obj):
+        return self.context['calendar_links'].gcal_url(obj)
+
+    def get_ics_url(self, obj):
+        return self.context['calendar_links'].ics_url(obj)
+
     def validate(self, attrs):
         """Validate event data."""
         start_at = attrs.get('start_at')
@@ -382,11 +400,69 @@ class TicketIssueSerializer(serializers.Serializer):
 class TicketValidationSerializer(serializers.Serializer):
     """Serializer for validating tickets."""
 
-    ticket_id = serializers.CharField(max_length=50)
+    # Either a ticket id or a raw scanned QR payload (compact or legacy JSON).
+    ticket_id = serializers.CharField(max_length=1000)
 
     def validate_ticket_id(self, value):
-        """Validate that the ticket exists."""
-        try:
-            return value
-        except Ticket.DoesNotExist:
-            raise serializers.ValidationError("Ticket does not exist.")
+        """Reduce a scanned payload to its ticket id."""
+        ticket_id = parse_qr_payload(value)
+        if not ticket_id or len(ticket_id) > 50:
+            raise serializers.ValidationError("Invalid ticket code.")
+        return ticket_id
+
+
+class OfflineCheckInSerializer(serializers.Serializer):
+    """One check-in recorded by a door device while offline."""
+
+    # ticket id or the raw scanned payload
+    ticket_id = serializers.CharField(max_length=1000)
+    used_at = serializers.DateTimeField(required=False, allow_null=True)
+
+
+class OfflineCheckInSyncSerializer(serializers.Serializer):
+    """Batch of offline check-ins uploaded in one sync."""
+
+    check_ins = OfflineCheckInSerializer(many=True, allow_empty=False, max_length=5000)
+
+
+class ExportJobCreateSerializer(serializers.Serializer):
+    """Request for a background attendee export of one or more events."""
+
+    events = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=100)
+    format = serializers.ChoiceField(choices=[choice for choice, _ in ExportJob.FORMAT_CHOICES], default="csv")
+    ticket_status = serializers.ChoiceField(choices=Ticket.STATUS_CHOICES, required=False, allow_blank=True)
+
+    def validate_events(self, value):
+        events = Event.objects.in_bulk(set(value))
+        missing = sorted(set(value) - set(events))
+        if missing:
+            raise serializers.ValidationError(f"Unknown event ids: {missing}")
+        return list(events.values())
+
+    def validate_format(self, value):
+        if value not in available_export_formats():
+            raise serializers.ValidationError(f"The {value} format is not available on this server.")
+        return value
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Export job status, progress and, once done, its download link."""
+
+    progress = serializers.FloatField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id", "events", "format", "ticket_status", "status",
+            "rows_total", "rows_written", "progress", "error",
+            "created_at", "finished_at", "download_url",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.DONE:
+            return None
+        url = reverse("export_job_download", kwargs={"pk": obj.pk})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
@@ -7,6 +7,13 @@ class CampuseventsConfig(AppConfig):
     name = "campusevents"
 
     def ready(self):
+        # dashboard cache invalidation receivers (safe everywhere, no side effects)
+        from . import stats  # noqa: F401
+        # event search index maintenance receivers
+        from . import search  # noqa: F401
+        # calendar week-bucket index maintenance
+        from . import calendar_index  # noqa: F401
+
         # DO NOT import .signals in tests (prevents double emails & Celery usage)
 
         if os.environ.get("RUN_TICKET_SIGNAL") == "1" and "pytest" not in sys.modules:
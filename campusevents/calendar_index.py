@@ -0,0 +1,127 @@
+# campusevents/calendar_index.py
+"""
+Week-bucket interval index for calendar window queries over approved events.
+
+The overlap predicate ``end_at >= start AND start_at <= end`` can use only
+one bound of a B-tree index, so a window lookup reads every event that ends
+after the window starts: a cost that grows with the event history. Here each
+approved event gets one ``EventTimeBucket`` row per UTC week its [start_at, end_at]
+touches, carrying copies of both times. A window reads only the index entries
+of the weeks it overlaps, applies the exact overlap predicate there, and
+fetches the matching events by primary key. Neither the bounds nor the
+status are repeated on Event: given an indexed Event predicate, planners go
+back to scanning Event and probing the subquery per row.
+
+Events spanning more than MAX_EVENT_BUCKETS weeks are filed under the single
+SPANNING_BUCKET instead, which every lookup includes.
+
+Buckets follow Event saves (dates and approval) through the receiver below;
+deletes cascade. Writes that bypass signals (``bulk_create``, ``QuerySet.update``)
+can be repaired with ``manage.py rebuild_event_buckets``.
+"""
+
+from datetime import date, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Event, EventTimeBucket
+
+MAX_EVENT_BUCKETS = 104
+SPANNING_BUCKET = date(1, 1, 1)
+
+
+def week_of(value):
+    """Monday (UTC) of the week containing datetime ``value``."""
+    day = value.astimezone(dt_timezone.utc).date()
+    return day - timedelta(days=day.weekday())
+
+
+def event_buckets(start_at, end_at):
+    """Bucket dates for an event running from ``start_at`` to ``end_at``."""
+    first = week_of(start_at)
+    last = week_of(max(start_at, end_at or start_at))
+    weeks = (last - first).days // 7 + 1
+    if weeks > MAX_EVENT_BUCKETS:
+        return [SPANNING_BUCKET]
+    return [first + timedelta(weeks=i) for i in range(weeks)]
+
+
+def _bucket_rows(bucket_model, pk, start_at, end_at):
+    return [
+        bucket_model(bucket=bucket, event_id=pk, start_at=start_at, end_at=end_at or start_at)
+        for bucket in event_buckets(start_at, end_at)
+    ]
+
+
+def _aware(event, name):
+    # instances may still hold what they were created with (ISO strings, naive values)
+    value = Event._meta.get_field(name).to_python(getattr(event, name))
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def sync_event_buckets(event):
+    """Make the buckets of ``event`` match its status and dates (two queries)."""
+    if event.status != Event.APPROVED:
+        EventTimeBucket.objects.filter(event_id=event.pk).delete()
+        return
+    rows = _bucket_rows(EventTimeBucket, event.pk, _aware(event, "start_at"), _aware(event, "end_at"))
+    EventTimeBucket.objects.filter(event_id=event.pk).exclude(bucket__in=[row.bucket for row in rows]).delete()
+    EventTimeBucket.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["bucket", "event"],
+        update_fields=["start_at", "end_at"],
+    )
+
+
+def rebuild_event_buckets(event_model=Event, bucket_model=EventTimeBucket, using="default", batch_size=2000):
+    """
+    Rebuild every bucket row from scratch; returns how many were written.
+    The migration passes its historical models.
+    """
+    bucket_model.objects.using(using).all().delete()
+    rows = (
+        event_model.objects.using(using)
+        .filter(status=Event.APPROVED)
+        .order_by("pk")
+        .values_list("pk", "start_at", "end_at")
+        .iterator(chunk_size=batch_size)
+    )
+    total = 0
+    batch = []
+    for pk, start_at, end_at in rows:
+        batch.extend(_bucket_rows(bucket_model, pk, start_at, end_at))
+        if len(batch) >= batch_size:
+            bucket_model.objects.using(using).bulk_create(batch)
+            total += len(batch)
+            batch = []
+    bucket_model.objects.using(using).bulk_create(batch)
+    return total + len(batch)
+
+
+def window_event_ids(start_dt, end_dt):
+    """Subquery of ids of events overlapping [start_dt, end_dt] (may repeat)."""
+    return EventTimeBucket.objects.filter(
+        Q(bucket__range=(week_of(start_dt), week_of(end_dt))) | Q(bucket=SPANNING_BUCKET),
+        end_at__gte=start_dt,
+        start_at__lte=end_dt,
+    ).values("event_id")
+
+
+def approved_events_between(start_dt, end_dt):
+    """Approved events overlapping [start_dt, end_dt], found through the buckets."""
+    return Event.objects.filter(id__in=window_event_ids(start_dt, end_dt))
+
+
+@receiver(post_save, sender=Event, dispatch_uid="calendar-event-buckets")
+def _bucket_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {"status", "start_at", "end_at"} & set(update_fields):
+        return
+    sync_event_buckets(instance)
@@ -1,11 +1,19 @@
 # campusevents/calendar_utils.py
 
+import threading
 import urllib.parse
+from collections import OrderedDict
+from datetime import timezone as dt_timezone
+
 from icalendar import Calendar, Event as ICalEvent
+from django.core.cache import cache
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
 from django.http import HttpResponse
 from django.urls import reverse
 
+from .models import Event, User
+
 
 def generate_ics_file(event, request):
     """
@@ -80,35 +88,178 @@ def generate_google_calendar_link(event, request):
         request: Django request object (for building absolute URL)
     
     Returns:
-        str: Google Calendar URL
+        str: Google Calendar URL (times in UTC, so no ``ctz`` is needed)
     """
-    # Build base URL
-    base_url = 'https://calendar.google.com/calendar/render'
+    return CalendarLinks(request).gcal_url(event)
+
+
+# --- Subscribable .ics feeds -------------------------------------------------
+#
+# Feeds are polled by calendar clients, so they are assembled from per-event
+# VEVENT bytes cached under the event's updated_at (an edited event gets a
+# new key; the old entry just expires). DTSTAMP is the event's updated_at
+# rather than "now", which keeps the bytes and therefore the feed's ETag
+# stable between edits.
+
+ICS_FEED_PAST_DAYS = 30
+ICS_VEVENT_CACHE_TTL = 7 * 24 * 3600
+ICS_FEED_REFRESH = 'PT1H'  # refresh interval suggested to clients
+ICS_FEED_FIELDS = ('id', 'title', 'description', 'location', 'start_at', 'end_at', 'status', 'updated_at')
+_FEED_TOKEN_SALT = 'campusevents.ics-feed'
+
+
+def make_feed_token(user):
+    """
+    Secret path segment of ``user``'s personal feed. It is derived from the
+    password hash, so changing the password revokes old subscription URLs.
+    """
+    digest = salted_hmac(_FEED_TOKEN_SALT, f'{user.pk}:{user.password}').hexdigest()[:24]
+    return f'{user.pk}-{digest}'
+
+
+def user_for_feed_token(token):
+    """The active user ``token`` belongs to, or None."""
+    pk, _, digest = token.partition('-')
+    if not pk.isdigit():
+        return None
+    user = User.objects.filter(pk=pk, is_active=True).first()
+    if user is None or not constant_time_compare(make_feed_token(user), f'{pk}-{digest}'):
+        return None
+    return user
+
+
+def _vevent_key(request, event_id, updated_at):
+    return f'ics-vevent:{request.scheme}://{request.get_host()}:{event_id}:{updated_at.timestamp()}'
+
+
+def render_vevent(event, request):
+    """VEVENT bytes for ``event`` (a dict with ICS_FEED_FIELDS) with a stable UID."""
+    ical_event = ICalEvent()
+    ical_event.add('uid', f"campusevent-{event['id']}@{request.get_host()}")
+    ical_event.add('summary', event['title'])
+    ical_event.add('description', event['description'])
+    ical_event.add('location', event['location'])
+    ical_event.add('dtstart', event['start_at'])
+    ical_event.add('dtend', event['end_at'])
+    ical_event.add('dtstamp', event['updated_at'])
+    ical_event.add('last-modified', event['updated_at'])
+    ical_event.add('url', request.build_absolute_uri(reverse('event_detail', args=[event['id']])))
+    ical_event.add('status', 'CONFIRMED' if event['status'] == 'approved' else 'TENTATIVE')
+    return ical_event.to_ical()
+
+
+def feed_vevents(versions, request):
+    """
+    VEVENT bytes for ``versions`` (``[(event id, updated_at)]``, in feed
+    order): cached components where present, the rest rendered in one query.
+    """
+    keys = [_vevent_key(request, pk, updated_at) for pk, updated_at in versions]
+    cached = cache.get_many(keys)
+    missing = {pk: key for (pk, _), key in zip(versions, keys) if key not in cached}
+    if missing:
+        fresh = {}
+        for event in Event.objects.filter(pk__in=missing).values(*ICS_FEED_FIELDS):
+            component = render_vevent(event, request)
+            # cached under the version just read, in case the event changed since
+            fresh[_vevent_key(request, event['id'], event['updated_at'])] = component
+            cached[missing[event['id']]] = component
+        cache.set_many(fresh, timeout=ICS_VEVENT_CACHE_TTL)
+    # an event deleted between the two queries is simply left out
+    return [cached[key] for key in keys if key in cached]
 
-    # Build event URL
-    event_url = request.build_absolute_uri(
-        reverse('event_detail', args=[event.id])
-    )
 
-    # Format dates for Google Calendar (YYYYMMDDTHHmmssZ)
-    start_date = event.start_at.strftime('%Y%m%dT%H%M%S')
-    end_date = event.end_at.strftime('%Y%m%dT%H%M%S')
+def assemble_ics(name, components):
+    """A VCALENDAR named ``name`` wrapping already-serialized VEVENTs."""
+    cal = Calendar()
+    cal.add('prodid', '-//Campus Events//Campus Events Calendar//EN')
+    cal.add('version', '2.0')
+    cal.add('calscale', 'GREGORIAN')
+    cal.add('method', 'PUBLISH')
+    cal.add('x-wr-calname', name)
+    cal.add('x-published-ttl', ICS_FEED_REFRESH)
+    head = cal.to_ical()
+    end = b'END:VCALENDAR\r\n'
+    return head[:-len(end)] + b''.join(components) + end
+
+
+# --- Batched calendar links for event listings --------------------------------
+
+GOOGLE_CALENDAR_URL = 'https://calendar.google.com/calendar/render'
+CALENDAR_LINK_MEMO_SIZE = 10000
+
+
+def _utc_stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+class _LinkMemo:
+    """Small thread-safe LRU of Google Calendar query strings per (event id, updated_at)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, build):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                return value
+        value = build()
+        with self.lock:
+            self.entries[key] = value
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return value
 
-    # URL encode parameters (Google Calendar accepts multiple sprop parameters)
-    params = [
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_gcal_memo = _LinkMemo(CALENDAR_LINK_MEMO_SIZE)
+
+
+def _gcal_query(event):
+    # host-independent part of the link; the website sprop is appended per request
+    return urllib.parse.urlencode([
         ('action', 'TEMPLATE'),
         ('text', event.title),
-        ('dates', f'{start_date}/{end_date}'),
+        ('dates', f'{_utc_stamp(event.start_at)}/{_utc_stamp(event.end_at)}'),
         ('details', event.description),
         ('location', event.location),
-        ('ctz', 'America/Toronto'),  # Timezone
         ('sprop', 'name:Campus Events'),
-        ('sprop', f'website:{event_url}')
-    ]
+    ], safe='/', quote_via=urllib.parse.quote)
+
+
+def _id_url_template(request, url_name):
+    """(prefix, suffix) of the absolute URL of ``url_name`` around an event id."""
+    prefix, _, suffix = request.build_absolute_uri(reverse(url_name, args=[0])).rpartition('/0/')
+    return prefix + '/', '/' + suffix
+
+
+class CalendarLinks:
+    """
+    Google Calendar and .ics links for many events of one request.
+
+    URL prefixes are resolved once per instance, and the event-dependent
+    part of each Google link is memoized per ``(event.id, updated_at)``, so
+    long listings mostly pay one dict lookup and a concatenation per event.
+    """
 
-    # Build query string with proper URL encoding
-    query_string = '&'.join([f'{k}={urllib.parse.quote(str(v))}' for k, v in params])
-    url = f'{base_url}?{query_string}'
+    def __init__(self, request):
+        self.event_prefix, self.event_suffix = _id_url_template(request, 'event_detail')
+        self.ics_prefix, self.ics_suffix = _id_url_template(request, 'event_ics')
+        self.website_prefix = urllib.parse.quote('website:' + self.event_prefix)
+        self.website_suffix = urllib.parse.quote(self.event_suffix)
 
-    return url
+    def gcal_url(self, event):
+        query = _gcal_memo.get((event.pk, event.updated_at), lambda: _gcal_query(event))
+        return (
+            f'{GOOGLE_CALENDAR_URL}?{query}'
+            f'&sprop={self.website_prefix}{event.pk}{self.website_suffix}'
+        )
 
+    def ics_url(self, event):
+        return f'{self.ics_prefix}{event.pk}{self.ics_suffix}'
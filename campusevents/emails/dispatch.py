@@ -0,0 +1,190 @@
+# campusevents/emails/dispatch.py
+"""
+Batched dispatch of queued ``EmailLog`` rows.
+
+Senders only queue a row (see ``queue_ticket_confirmation``); the
+``dispatch_email_queue`` task drains the queue in batches. Each batch goes
+out over one backend connection (one SMTP login / TLS handshake instead of
+one per email), and no more than EMAIL_RATE_PER_MINUTE emails are sent in
+any trailing minute: what is over the cap stays queued for the next run.
+
+Rows are claimed by moving them to "sending" (under ``SELECT ... FOR UPDATE
+SKIP LOCKED`` where the database has it), so concurrent workers don't send
+the same email twice. A failed send goes back to "queued" until it has used
+EMAIL_MAX_ATTEMPTS attempts, then becomes "failed". Rows left in "sending"
+by a worker that died mid-batch can be requeued from the EmailLog admin.
+"""
+
+from datetime import timedelta
+from email.utils import make_msgid
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from ..models import EmailLog, Ticket
+from .emails import build_confirmation_message, make_send_key
+
+CLAIM_CONFIRMATION_TEMPLATE = "campusevents/email/claim_confirmation.html"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# --- Queueing -----------------------------------------------------------------
+
+def confirmation_context(ticket):
+    event, user = ticket.event, ticket.user
+    return {
+        "user_name": user.get_full_name() or user.email,
+        "event_title": event.title,
+        "event_dt": event.start_at,
+        "location": event.location,
+        "ticket_id": ticket.ticket_id,
+        "seat": ticket.seat_number or None,
+        "organizer": event.org.name if event.org_id else "",
+        "support_email": _setting("DEFAULT_FROM_EMAIL", "support@example.com"),
+    }
+
+
+def queue_ticket_confirmation(ticket):
+    """Queue the confirmation email of ``ticket``; returns the EmailLog row."""
+    user = ticket.user
+    return EmailLog.objects.create(
+        to=user.email,
+        subject=f"Your ticket for {ticket.event.title}",
+        template=CLAIM_CONFIRMATION_TEMPLATE,
+        context_json=confirmation_context(ticket),
+        status=EmailLog.QUEUED,
+        user=user,
+        event_id=str(ticket.event_id),
+        ticket_id=str(ticket.id),
+        send_key=make_send_key(user.email, ticket.ticket_id, CLAIM_CONFIRMATION_TEMPLATE),
+    )
+
+
+# --- Building messages -------------------------------------------------------------
+
+def _template_message(log):
+    """Render ``log.template`` (HTML) and its .txt sibling from the stored context."""
+    html_body = render_to_string(log.template, log.context_json)
+    text_body = None
+    if log.template.endswith(".html"):
+        try:
+            text_body = render_to_string(log.template[:-len(".html")] + ".txt", log.context_json)
+        except TemplateDoesNotExist:
+            pass
+    msg = EmailMultiAlternatives(
+        subject=log.subject, body=text_body or html_body,
+        from_email=settings.DEFAULT_FROM_EMAIL, to=[log.to],
+    )
+    if text_body is not None:
+        msg.attach_alternative(html_body, "text/html")
+    return msg
+
+
+def _build_messages(logs):
+    """{log id: message}; confirmations are rebuilt from their ticket (with the QR attachment)."""
+    ticket_ids = [
+        int(log.ticket_id) for log in logs
+        if log.template == CLAIM_CONFIRMATION_TEMPLATE and log.ticket_id.isdigit()
+    ]
+    tickets = Ticket.objects.select_related("event__org", "user").in_bulk(ticket_ids)
+    messages = {}
+    for log in logs:
+        ticket = tickets.get(int(log.ticket_id)) if log.ticket_id.isdigit() else None
+        if log.template == CLAIM_CONFIRMATION_TEMPLATE and ticket is not None:
+            msg = build_confirmation_message(to_email=log.to, **confirmation_context(ticket))
+        else:
+            msg = _template_message(log)
+        msg.extra_headers.setdefault("Message-ID", make_msgid("campusevents"))
+        messages[log.pk] = msg
+    return messages
+
+
+# --- Dispatch -----------------------------------------------------------------
+
+def _claim(limit, skip=()):
+    with transaction.atomic():
+        queued = (
+            EmailLog.objects.filter(status=EmailLog.QUEUED)
+            .exclude(pk__in=skip)
+            .order_by("created_at", "id")
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True)
+        ids = list(queued.values_list("id", flat=True)[:limit])
+        if not ids:
+            return []
+        EmailLog.objects.filter(pk__in=ids).update(status=EmailLog.SENDING, attempts=F("attempts") + 1)
+    return list(EmailLog.objects.filter(pk__in=ids).order_by("created_at", "id"))
+
+
+def _send_batch(logs):
+    """Send ``logs`` over one connection and record each outcome; returns how many were sent."""
+    max_attempts = _setting("EMAIL_MAX_ATTEMPTS", 5)
+    errors = {}
+    try:
+        messages = _build_messages(logs)
+    except Exception as exc:  # rendering failed for the whole batch
+        messages, errors = {}, {log.pk: exc for log in logs}
+
+    if messages:
+        try:
+            with get_connection() as conn:
+                for log in logs:
+                    if log.pk not in messages:
+                        continue
+                    try:
+                        conn.send_messages([messages[log.pk]])
+                    except Exception as exc:
+                        errors[log.pk] = exc
+        except Exception as exc:  # could not open (or close) the connection
+            errors.update({log.pk: exc for log in logs if log.pk not in errors})
+
+    now, sent = timezone.now(), 0
+    for log in logs:
+        if log.pk in errors:
+            log.status = EmailLog.FAILED if log.attempts >= max_attempts else EmailLog.QUEUED
+            log.last_error = f"{type(errors[log.pk]).__name__}: {errors[log.pk]}"
+        else:
+            log.status, log.sent_at, log.last_error = EmailLog.SENT, now, ""
+            log.message_id = messages[log.pk].extra_headers["Message-ID"]
+            sent += 1
+    EmailLog.objects.bulk_update(logs, ["status", "sent_at", "message_id", "last_error"])
+    return sent
+
+
+def dispatch_queued_emails(batch_size=None, rate_per_minute=None):
+    """
+    Send queued emails in batches until the queue is empty or the per-minute
+    cap is reached. Returns ``{"sent", "errors", "remaining"}``; ``errors``
+    counts failed sends, whether requeued or given up on.
+    """
+    batch_size = batch_size or _setting("EMAIL_DISPATCH_BATCH_SIZE", 100)
+    rate_per_minute = rate_per_minute or _setting("EMAIL_RATE_PER_MINUTE", 600)
+    sent = errors = 0
+    retry_later = set()  # failed in this run: retried by the next one, not this loop
+    while True:
+        recent = EmailLog.objects.filter(
+            status=EmailLog.SENT, sent_at__gte=timezone.now() - timedelta(minutes=1)
+        ).count()
+        allowance = min(batch_size, rate_per_minute - recent)
+        if allowance <= 0:
+            break
+        logs = _claim(allowance, retry_later)
+        if not logs:
+            break
+        batch_sent = _send_batch(logs)
+        sent += batch_sent
+        errors += len(logs) - batch_sent
+        if batch_sent == 0:
+            break  # every send failed (server down?): stop until the next run
+        retry_later.update(log.pk for log in logs if log.status != EmailLog.SENT)
+    remaining = EmailLog.objects.filter(status=EmailLog.QUEUED).count()
+    return {"sent": sent, "errors": errors, "remaining": remaining}
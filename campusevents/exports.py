@@ -0,0 +1,247 @@
+# campusevents/exports.py
+"""
+Attendee export shared by the session and API download views.
+
+Rows come from a ``values_list()`` queryset read with ``.iterator()``, so no
+Ticket/User instances are built and the database cursor is consumed in
+chunks: memory stays flat however many attendees an event has. The CSV
+generator yields the header before touching the database, so a streaming
+response starts sending right away.
+
+Large or multi-event exports run as an ``ExportJob`` in the background
+(``run_export_job`` task): the same rows, written batch by batch to a file
+under EXPORTS_ROOT (private, outside MEDIA_ROOT) as CSV, JSON Lines, XLSX
+or Parquet, with progress saved after every batch.
+"""
+
+import csv
+import json
+import os
+import re
+import uuid
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import ExportJob, Ticket
+
+try:  # optional: only needed for Parquet exports
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - depends on the environment
+    pyarrow = None
+
+# (CSV header, values_list lookup) in output order.
+ATTENDEE_COLUMNS = (
+    ("ticket_id", "ticket_id"),
+    ("ticket_status", "status"),
+    ("user_email", "user__email"),
+    ("first_name", "user__first_name"),
+    ("last_name", "user__last_name"),
+    ("student_id", "user__student_id"),
+    ("phone_number", "user__phone_number"),
+    ("seat_number", "seat_number"),
+    ("issued_at", "issued_at"),
+    ("used_at", "used_at"),
+)
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _attendee_values(events, status=None):
+    tickets = Ticket.objects.filter(event__in=events).order_by("event_id", "issued_at", "pk")
+    if status:
+        tickets = tickets.filter(status=status)
+    return tickets.values_list(*(lookup for _, lookup in ATTENDEE_COLUMNS))
+
+
+def attendee_rows(event, status=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one list of cell values per ticket of ``event``, oldest first."""
+    for row in _attendee_values([event], status).iterator(chunk_size=chunk_size):
+        yield [_cell(value) for value in row]
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line back."""
+
+    def write(self, value):
+        return value
+
+
+def attendee_csv_lines(event, status=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the attendee CSV of ``event`` line by line, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _ in ATTENDEE_COLUMNS])
+    for row in attendee_rows(event, status, chunk_size):
+        yield writer.writerow(row)
+
+
+def attendee_csv_response(event, status=None):
+    """StreamingHttpResponse downloading the attendee CSV of ``event``."""
+    response = StreamingHttpResponse(
+        attendee_csv_lines(event, status),
+        content_type="text/csv; charset=utf-8",
+    )
+    response["Content-Disposition"] = f'attachment; filename="attendees_event_{event.id}.csv"'
+    return response
+
+
+# --- Background export jobs ---------------------------------------------------
+
+def _write_csv(path, batches):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow([header for header, _ in ATTENDEE_COLUMNS])
+        for batch in batches:
+            writer.writerows([_cell(value) for value in row] for row in batch)
+
+
+def _write_jsonl(path, batches):
+    headers = [header for header, _ in ATTENDEE_COLUMNS]
+    with open(path, "w", encoding="utf-8") as fh:
+        for batch in batches:
+            fh.writelines(
+                json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + "\n"
+                for row in batch
+            )
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Attendees" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+
+# C0 controls other than tab, LF and CR can't appear in XML 1.0 at all, even
+# escaped; one in a user's name would make Excel refuse the whole workbook.
+_XML_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_row(cells):
+    return "<row>" + "".join(
+        f'<c t="inlineStr"><is><t>{escape(_XML_INVALID_CHARS.sub("", str(cell)))}</t></is></c>'
+        for cell in cells
+    ) + "</row>"
+
+
+def _write_xlsx(path, batches):
+    """Minimal single-sheet workbook (inline strings), streamed into the zip."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in _XLSX_PARTS.items():
+            zf.writestr(name, xml)
+        with zf.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header for header, _ in ATTENDEE_COLUMNS).encode("utf-8"))
+            for batch in batches:
+                sheet.write("".join(
+                    _xlsx_row(_cell(value) for value in row) for row in batch
+                ).encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+
+
+def _write_parquet(path, batches):
+    """One row group per batch; every column is a string, as in the CSV."""
+    headers = [header for header, _ in ATTENDEE_COLUMNS]
+    schema = pyarrow.schema([(header, pyarrow.string()) for header in headers])
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        for batch in batches:
+            columns = [[str(_cell(value)) for value in column] for column in zip(*batch)]
+            writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+
+
+# format -> (file extension, writer)
+EXPORT_WRITERS = {
+    "csv": ("csv", _write_csv),
+    "jsonl": ("jsonl", _write_jsonl),
+    "xlsx": ("xlsx", _write_xlsx),
+    "parquet": ("parquet", _write_parquet),
+}
+
+
+def available_export_formats():
+    """Formats this install can write (Parquet needs pyarrow)."""
+    return [fmt for fmt in EXPORT_WRITERS if fmt != "parquet" or pyarrow is not None]
+
+
+def _tracked_batches(job, rows, chunk_size):
+    """Group ``rows`` into lists of ``chunk_size`` and record progress after each."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == chunk_size:
+            yield batch
+            ExportJob.objects.filter(pk=job.pk).update(rows_written=F("rows_written") + len(batch))
+            batch = []
+    if batch:
+        yield batch
+        ExportJob.objects.filter(pk=job.pk).update(rows_written=F("rows_written") + len(batch))
+
+
+def run_export(job, chunk_size=EXPORT_CHUNK_SIZE):
+    """Write the file for ``job`` and mark it done (or failed). Returns the job."""
+    extension, writer = EXPORT_WRITERS[job.format]
+    # random file name as well as private storage: never derivable from the job id
+    name = f"attendees_export_{job.pk}_{uuid.uuid4().hex}.{extension}"
+    try:
+        values = _attendee_values(job.events.all(), job.ticket_status)
+        job.status, job.rows_total, job.rows_written = ExportJob.RUNNING, values.count(), 0
+        job.save(update_fields=["status", "rows_total", "rows_written"])
+
+        path = job.file.storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        writer(path, _tracked_batches(job, values.iterator(chunk_size=chunk_size), chunk_size))
+    except Exception as exc:
+        job.file.storage.delete(name)  # drop the partial file; a no-op if none was written
+        job.refresh_from_db(fields=["rows_written"])
+        job.status, job.error = ExportJob.FAILED, str(exc)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
+        return job
+
+    job.refresh_from_db(fields=["rows_written"])
+    job.status, job.file.name, job.finished_at = ExportJob.DONE, name, timezone.now()
+    job.save(update_fields=["status", "file", "finished_at"])
+    return job
@@ -0,0 +1,39 @@
+# campusevents/management/commands/backfill_daily_stats.py
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+
+from campusevents.models import DailyStats, Event
+from campusevents.stats import rollup_days, utc_today
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyStats / DailyEventCheckins rollup for all closed days."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-days",
+            type=int,
+            default=90,
+            help="Days recomputed per transaction (default: 90).",
+        )
+
+    def handle(self, *args, **options):
+        chunk = timedelta(days=max(1, options["chunk_days"]))
+        first = Event.objects.order_by("created_at").values_list("created_at", flat=True).first()
+        if first is None:
+            self.stdout.write("No events yet; nothing to roll up.")
+            return
+
+        start = first.astimezone(dt_timezone.utc).date()
+        today = utc_today()
+        DailyStats.objects.filter(day__lt=start).delete()
+
+        total = 0
+        while start < today:
+            end = min(start + chunk, today)
+            total += rollup_days(start, end)
+            self.stdout.write(f"  rolled up {start} .. {end - timedelta(days=1)}")
+            start = end
+
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {total} day(s)."))
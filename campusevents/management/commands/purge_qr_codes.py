@@ -0,0 +1,27 @@
+# campusevents/management/commands/purge_qr_codes.py
+from django.core.management.base import BaseCommand
+
+from campusevents.models import Ticket
+
+QR_CODE_DIR = "qr_codes"
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the ticket QR PNGs stored under MEDIA_ROOT/qr_codes. QR images are "
+        "rendered on the fly from qr_code_data, so nothing reads these files."
+    )
+
+    def handle(self, *args, **options):
+        storage = Ticket._meta.get_field("qr_code").storage
+        # clear the references first: a rerun after a crash just deletes the rest
+        cleared = Ticket.objects.exclude(qr_code__isnull=True).exclude(qr_code="").update(qr_code=None)
+        try:
+            _, files = storage.listdir(QR_CODE_DIR)
+        except FileNotFoundError:
+            files = []
+        for name in files:
+            storage.delete(f"{QR_CODE_DIR}/{name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Cleared {cleared} ticket(s) and deleted {len(files)} stored QR image(s)."
+        ))
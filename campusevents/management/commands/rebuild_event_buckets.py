@@ -0,0 +1,12 @@
+# campusevents/management/commands/rebuild_event_buckets.py
+from django.core.management.base import BaseCommand
+
+from campusevents.calendar_index import rebuild_event_buckets
+
+
+class Command(BaseCommand):
+    help = "Rebuild the week-bucket index used by calendar window queries."
+
+    def handle(self, *args, **options):
+        written = rebuild_event_buckets()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} bucket row(s)."))
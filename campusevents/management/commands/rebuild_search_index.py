@@ -0,0 +1,15 @@
+# campusevents/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from campusevents.search import rebuild_search_index, search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the event full-text search index (SQLite FTS5 / PostgreSQL tsvector)."
+
+    def handle(self, *args, **options):
+        if search_backend() is None:
+            self.stdout.write("This database has no search index; searches use the in-process index, which rebuilds itself.")
+            return
+        indexed = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} event(s)."))
@@ -0,0 +1,24 @@
+# campusevents/management/commands/rebuild_ticket_counters.py
+from django.core.management.base import BaseCommand
+
+from campusevents.models import Event
+
+
+class Command(BaseCommand):
+    help = "Recompute Event.issued_count / used_count / cancelled_count from the Ticket table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event",
+            type=int,
+            action="append",
+            dest="event_ids",
+            help="Only rebuild the given event id (repeatable). Defaults to all events.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Event.objects.all()
+        if options["event_ids"]:
+            queryset = queryset.filter(pk__in=options["event_ids"])
+        updated = Event.rebuild_ticket_counters(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ticket counters for {updated} event(s)."))
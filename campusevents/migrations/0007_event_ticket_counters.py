@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Event = apps.get_model('campusevents', 'Event')
+    Ticket = apps.get_model('campusevents', 'Ticket')
+
+    def _count(status):
+        tickets = (
+            Ticket.objects
+            .filter(event=OuterRef('pk'), status=status)
+            .order_by()
+            .values('event')
+            .annotate(n=Count('pk'))
+            .values('n')
+        )
+        return Coalesce(Subquery(tickets), Value(0))
+
+    Event.objects.update(
+        issued_count=_count('issued'),
+        used_count=_count('used'),
+        cancelled_count=_count('cancelled'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusevents', '0006_emaillog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='cancelled_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='issued_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='used_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
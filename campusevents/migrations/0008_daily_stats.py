@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusevents', '0007_event_ticket_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyEventCheckins',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('checkins', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['day', 'event'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('events_created', models.PositiveIntegerField(default=0)),
+                ('tickets_issued', models.PositiveIntegerField(default=0)),
+                ('tickets_used', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'daily stats',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_at'], name='event_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['issued_at'], name='ticket_issued_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['used_at'], name='ticket_used_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailyeventcheckins',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_checkins', to='campusevents.event'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyeventcheckins',
+            constraint=models.UniqueConstraint(fields=('day', 'event'), name='uniq_daily_event_checkins'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusevents', '0008_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-used_count', '-start_at'], name='event_used_count_idx'),
+        ),
+    ]
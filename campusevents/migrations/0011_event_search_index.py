@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# Frozen copy of the index schema in campusevents.search at the time of this
+# migration, so later edits there can't change what it creates.
+SQLITE_TABLE = "campusevents_event_fts"
+POSTGRES_TABLE = "campusevents_event_search"
+# FTS5 column order, with the tsvector weight of each column
+SEARCH_FIELDS = (
+    ("title", "A"),
+    ("description", "D"),
+    ("location", "C"),
+    ("org_name", "B"),
+    ("category", "B"),
+)
+
+
+def _source_sql(apps):
+    """SELECT of (event id, *SEARCH_FIELDS) for every event, NULLs as ''."""
+    event_table = apps.get_model("campusevents", "Event")._meta.db_table
+    org_table = apps.get_model("campusevents", "Organization")._meta.db_table
+    return (
+        "SELECT e.id, COALESCE(e.title, ''), COALESCE(e.description, ''), "
+        "COALESCE(e.location, ''), COALESCE(o.name, ''), COALESCE(e.category, '') "
+        f"FROM {event_table} e LEFT JOIN {org_table} o ON o.id = e.org_id"
+    )
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        columns = ", ".join(name for name, _ in SEARCH_FIELDS)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+            f"{columns}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f"DELETE FROM {SQLITE_TABLE}")
+        schema_editor.execute(
+            f"INSERT INTO {SQLITE_TABLE} (rowid, {columns}) {_source_sql(apps)}"
+        )
+    elif vendor == "postgresql":
+        event_table = apps.get_model("campusevents", "Event")._meta.db_table
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+            f"event_id bigint PRIMARY KEY REFERENCES {event_table}(id) "
+            f"ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            f"document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_gin ON {POSTGRES_TABLE} USING gin (document)"
+        )
+        vector = " || ".join(
+            f"setweight(to_tsvector('english', src.f{i}), '{weight}')"
+            for i, (_, weight) in enumerate(SEARCH_FIELDS, start=1)
+        )
+        schema_editor.execute(f"DELETE FROM {POSTGRES_TABLE}")
+        schema_editor.execute(
+            f"INSERT INTO {POSTGRES_TABLE} (event_id, document) "
+            f"SELECT src.id, {vector} FROM ({_source_sql(apps)}) AS src(id, f1, f2, f3, f4, f5)"
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campusevents", "0010_export_job"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_buckets(apps, schema_editor):
+    from campusevents.calendar_index import rebuild_event_buckets
+
+    rebuild_event_buckets(
+        apps.get_model("campusevents", "Event"),
+        apps.get_model("campusevents", "EventTimeBucket"),
+        schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusevents', '0012_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventTimeBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateField()),
+                ('start_at', models.DateTimeField()),
+                ('end_at', models.DateTimeField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_buckets', to='campusevents.event')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', 'end_at', 'start_at', 'event'], name='event_bucket_window_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'event'), name='uniq_event_time_bucket')],
+            },
+        ),
+        migrations.RunPython(fill_buckets, migrations.RunPython.noop),
+    ]
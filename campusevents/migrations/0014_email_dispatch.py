@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:21
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusevents', '0013_event_time_buckets'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emaillog',
+            name='context_json',
+            field=models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name='emaillog',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='emaillog',
+            index=models.Index(fields=['status', 'sent_at'], name='emaillog_status_sent_idx'),
+        ),
+    ]
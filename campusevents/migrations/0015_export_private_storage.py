@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:45
+
+import campusevents.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusevents', '0014_email_dispatch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(blank=True, storage=campusevents.models.PrivateExportStorage(), upload_to=''),
+        ),
+    ]
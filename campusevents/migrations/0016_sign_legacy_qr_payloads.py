@@ -0,0 +1,47 @@
+# Replace legacy (unsigned JSON) ticket QR payloads with signed CE1 ones.
+
+import base64
+
+from django.db import migrations
+from django.utils.crypto import salted_hmac
+
+# Frozen copy of the CE1 format in campusevents.qr, so later changes there
+# don't change what this migration writes.
+PREFIX = "CE1"
+SALT = "campusevents.qr.CE1"
+SIGNATURE_BYTES = 10
+
+
+def _ce1_payload(ticket_id):
+    digest = salted_hmac(SALT, ticket_id, algorithm="sha256").digest()
+    signature = base64.b32encode(digest[:SIGNATURE_BYTES]).decode("ascii").rstrip("=")
+    return f"{PREFIX}/{ticket_id}/{signature}"
+
+
+def sign_legacy_payloads(apps, schema_editor):
+    Ticket = apps.get_model("campusevents", "Ticket")
+    legacy = (
+        Ticket.objects.using(schema_editor.connection.alias)
+        .exclude(qr_code_data__startswith=f"{PREFIX}/")
+        .only("id", "ticket_id")
+    )
+    batch = []
+    for ticket in legacy.iterator(chunk_size=2000):
+        ticket.qr_code_data = _ce1_payload(ticket.ticket_id)
+        batch.append(ticket)
+        if len(batch) == 2000:
+            Ticket.objects.bulk_update(batch, ["qr_code_data"])
+            batch = []
+    if batch:
+        Ticket.objects.bulk_update(batch, ["qr_code_data"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campusevents', '0015_export_private_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(sign_legacy_payloads, migrations.RunPython.noop),
+    ]
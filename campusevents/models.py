@@ -1,15 +1,20 @@
 # campusevents/models.py
-import io
-import json
+import os
 import uuid
-import qrcode
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.core.files.storage import FileSystemStorage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
 from django.utils import timezone
 from django.conf import settings
 
+from .qr import make_qr_payload, qr_version
 
 
 class CustomUserManager(BaseUserManager):
@@ -119,19 +124,72 @@ class Event(models.Model):
     admin_comment = models.TextField(blank=True, null=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    # denormalized ticket counters, maintained by the Ticket lifecycle
+    issued_count = models.PositiveIntegerField(default=0, editable=False)
+    used_count = models.PositiveIntegerField(default=0, editable=False)
+    cancelled_count = models.PositiveIntegerField(default=0, editable=False)
+
     # timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    COUNTER_FIELDS = ("issued_count", "used_count", "cancelled_count")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], name="event_created_at_idx"),
+            # top-events-by-check-ins is a range scan of this index
+            models.Index(fields=["-used_count", "-start_at"], name="event_used_count_idx"),
+            # discovery and the calendar feed: approved events ending after a time.
+            # Not partial on status: queries bind the status as a parameter,
+            # which planners can't match against a partial index predicate.
+            models.Index(fields=["status", "end_at", "start_at"], name="event_status_end_idx"),
+            # organizer's events, newest first
+            models.Index(fields=["created_by", "-start_at"], name="event_creator_start_idx"),
+            # moderation queues: one status, newest first
+            models.Index(fields=["status", "-created_at"], name="event_status_created_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Counters are only written through F() updates; a plain save of a
+        # (possibly stale) instance must never overwrite them.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            skipped = set(self.COUNTER_FIELDS) | self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                f.attname for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def remaining_capacity(self):
-        issued = 0
-        if hasattr(self, "tickets"):
-            issued = self.tickets.filter(status="issued").count()
-        return max(0, self.capacity - issued)
+        return max(0, self.capacity - self.issued_count)
+
+    @classmethod
+    def rebuild_ticket_counters(cls, queryset=None):
+        """Recompute the ticket counters from the Ticket table in one UPDATE."""
+        if queryset is None:
+            queryset = cls.objects.all()
+
+        def _count(status):
+            tickets = (
+                Ticket.objects
+                .filter(event=OuterRef("pk"), status=status)
+                .order_by()
+                .values("event")
+                .annotate(n=Count("pk"))
+                .values("n")
+            )
+            return Coalesce(Subquery(tickets), Value(0))
+
+        return queryset.update(
+            issued_count=_count(Ticket.ISSUED),
+            used_count=_count(Ticket.USED),
+            cancelled_count=_count(Ticket.CANCELLED),
+        )
 
 
 class Ticket(models.Model):
@@ -149,11 +207,19 @@ class Ticket(models.Model):
         (EXPIRED, "Expired"),
     ]
 
+    # Event counter column that tracks each status (EXPIRED is not counted)
+    STATUS_COUNTERS = {
+        ISSUED: "issued_count",
+        USED: "used_count",
+        CANCELLED: "cancelled_count",
+    }
+
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="tickets")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tickets")
 
     ticket_id = models.CharField(max_length=50, unique=True, db_index=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=ISSUED)
+    # legacy stored PNG, no longer written; see the purge_qr_codes command
     qr_code = models.ImageField(upload_to="qr_codes/", blank=True, null=True)
     qr_code_data = models.TextField(blank=True)
     issued_at = models.DateTimeField(auto_now_add=True)
@@ -165,42 +231,82 @@ class Ticket(models.Model):
     class Meta:
         ordering = ["-issued_at"]
         unique_together = ["event", "user"]
+        indexes = [
+            # range scans of the daily stats rollup; most tickets are never used
+            models.Index(fields=["issued_at"], name="ticket_issued_at_idx"),
+            models.Index(
+                fields=["used_at"],
+                condition=models.Q(used_at__isnull=False),
+                name="ticket_used_at_idx",
+            ),
+            # an event's tickets by status (check-in, manifest, exports)
+            models.Index(fields=["event", "status"], name="ticket_event_status_idx"),
+            # a user's tickets by status
+            models.Index(fields=["user", "status"], name="ticket_user_status_idx"),
+        ]
+
+    # Status currently reflected in the event counters; None until persisted.
+    _counted_status = None
 
     def __str__(self):
         return f"Ticket {self.ticket_id} for {self.event.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted_status = instance.__dict__.get("status")
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.ticket_id:
             self.ticket_id = f"TKT-{uuid.uuid4().hex[:12].upper()}"
         if not self.qr_code_data:
             self.qr_code_data = self.generate_qr_data()
-        if not self.qr_code:
-            self.generate_qr_code()
-        super().save(*args, **kwargs)
+        # No PNG is written here: images are rendered on demand from
+        # qr_code_data (ticket_qr_image), so claiming only writes the row.
 
-    def generate_qr_data(self):
-        data = {
-            "ticket_id": self.ticket_id,
-            "event_id": self.event.id,
-            "user_id": self.user.id,
-            "event_title": self.event.title,
-            "user_name": f"{self.user.first_name} {self.user.last_name}",
-            "issued_at": self.issued_at.isoformat() if self.issued_at else timezone.now().isoformat(),
-        }
-        return json.dumps(data)
-
-
-    def generate_qr_code(self):
-        if not self.qr_code_data:
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "status" not in update_fields:
+            super().save(*args, **kwargs)
+            return
+
+        if not self._state.adding and self._counted_status is None:
+            # Instance wasn't loaded from the DB: find out what is counted now.
+            self._counted_status = (
+                Ticket.objects.filter(pk=self.pk).values_list("status", flat=True).first()
+            )
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._move_counter(self._counted_status, self.status)
+
+    def _move_counter(self, old_status, new_status):
+        """Shift this ticket from one event counter to another with F() updates."""
+        self._counted_status = new_status
+        if old_status == new_status:
             return
-        qr = qrcode.QRCode(version=1, box_size=10, border=4)
-        qr.add_data(self.qr_code_data)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        buf.seek(0)
-        self.qr_code.save(f"ticket_{self.ticket_id}.png", ContentFile(buf.getvalue()), save=False)
+        deltas = {}
+        old_field = self.STATUS_COUNTERS.get(old_status)
+        new_field = self.STATUS_COUNTERS.get(new_status)
+        if old_field:
+            deltas[old_field] = F(old_field) - 1
+        if new_field:
+            deltas[new_field] = F(new_field) + 1
+        if not deltas:
+            return
+        Event.objects.filter(pk=self.event_id).update(**deltas)
+
+        # keep an already-loaded event in step so remaining_capacity stays right
+        if Ticket.event.is_cached(self):
+            event = self.event
+            if old_field:
+                setattr(event, old_field, max(0, getattr(event, old_field) - 1))
+            if new_field:
+                setattr(event, new_field, getattr(event, new_field) + 1)
+
+    def generate_qr_data(self):
+        # Compact signed form (CE1/<ticket_id>/<hmac>); see campusevents.qr.
+        return make_qr_payload(self.ticket_id)
 
     def is_valid(self):
         return (
@@ -223,22 +329,47 @@ class Ticket(models.Model):
 
     @property
     def qr_code_url(self):
-        if self.qr_code:
-            return self.qr_code.url
-        return None
+        """Versioned URL of the on-the-fly QR image (see ticket_qr_image)."""
+        if not self.qr_code_data:
+            return None
+        url = reverse("ticket_qr_png", args=[self.ticket_id])
+        return f"{url}?v={qr_version(self.qr_code_data)}"
+
+
+@receiver(post_delete, sender=Ticket, dispatch_uid="ticket-counters-delete")
+def _release_ticket_counter(sender, instance, origin=None, **kwargs):
+    """
+    Take a deleted ticket off its event's counter. A signal rather than a
+    delete() override, so user cascades and queryset (admin) deletes count
+    too; the deletion collector sends it inside its transaction.
+    """
+    if isinstance(origin, Event) or (isinstance(origin, models.QuerySet) and origin.model is Event):
+        return  # the event goes with its tickets
+    instance._move_counter(instance._counted_status or instance.status, None)
+
+
 class EmailLog(models.Model):
+    """One outgoing email; queued rows are sent by campusevents.emails.dispatch."""
+
+    QUEUED = "queued"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
     STATUS_CHOICES = (
-        ("queued", "Queued"),
-        ("sent", "Sent"),
-        ("failed", "Failed"),
+        (QUEUED, "Queued"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
     )
 
     to = models.EmailField()
     subject = models.CharField(max_length=255)
     template = models.CharField(max_length=255)
-    context_json = models.JSONField(default=dict, blank=True)
+    # DjangoJSONEncoder: contexts carry datetimes (event_dt), stored as ISO strings
+    context_json = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
 
-    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="queued")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
     attempts = models.PositiveIntegerField(default=0)
     last_error = models.TextField(blank=True, default="")
     message_id = models.CharField(max_length=255, blank=True, default="")
@@ -257,7 +388,144 @@ class EmailLog(models.Model):
         indexes = [
             models.Index(fields=["send_key"]),
             models.Index(fields=["status", "created_at"]),
+            # the dispatcher's per-minute rate check
+            models.Index(fields=["status", "sent_at"], name="emaillog_status_sent_idx"),
         ]
 
     def __str__(self):
         return f"{self.subject} → {self.to} [{self.status}]"
+
+
+class DailyStats(models.Model):
+    """
+    Per-day (UTC) rollup of dashboard counters, maintained by
+    campusevents.stats so the dashboard doesn't scan Ticket and Event.
+    """
+
+    day = models.DateField(unique=True)
+    events_created = models.PositiveIntegerField(default=0)
+    tickets_issued = models.PositiveIntegerField(default=0)
+    tickets_used = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["day"]
+        verbose_name_plural = "daily stats"
+
+    def __str__(self):
+        return f"Stats for {self.day}"
+
+
+class DailyEventCheckins(models.Model):
+    """Per-day (UTC) check-in count of one event; rolled up with DailyStats."""
+
+    day = models.DateField()
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="daily_checkins")
+    checkins = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["day", "event"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "event"], name="uniq_daily_event_checkins"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} on {self.day}: {self.checkins}"
+
+
+class EventTimeBucket(models.Model):
+    """
+    One row per (UTC week, approved event) the event's [start_at, end_at]
+    touches, so calendar window lookups read only the weeks they overlap. Maintained by
+    campusevents.calendar_index.
+    """
+
+    bucket = models.DateField()  # Monday of the week (UTC)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="time_buckets")
+    # copies of the event's times, so the exact overlap test runs on this table
+    start_at = models.DateTimeField()
+    end_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bucket", "event"], name="uniq_event_time_bucket"),
+        ]
+        indexes = [
+            # window lookups: a short range over bucket, filtered and answered from the index
+            models.Index(fields=["bucket", "end_at", "start_at", "event"], name="event_bucket_window_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} in week of {self.bucket}"
+
+
+class PrivateExportStorage(FileSystemStorage):
+    """
+    Files under EXPORTS_ROOT, which is not below MEDIA_ROOT and has no URL:
+    attendee exports are only served by ``ExportJobDownloadView``.
+    """
+
+    @property
+    def base_location(self):
+        return settings.EXPORTS_ROOT
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    def url(self, name):
+        raise ValueError("Export files have no public URL; use the export download view.")
+
+
+class ExportJob(models.Model):
+    """
+    Background attendee export of one or more events, written to EXPORTS_ROOT
+    by the ``run_export_job`` task (see campusevents.exports).
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    FORMAT_CHOICES = [
+        ("csv", "CSV"),
+        ("jsonl", "JSON Lines"),
+        ("xlsx", "Excel workbook"),
+        ("parquet", "Parquet"),
+    ]
+
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="export_jobs")
+    events = models.ManyToManyField(Event, related_name="export_jobs")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default="csv")
+    # optional Ticket.status filter, like ?status= on the CSV views
+    ticket_status = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    file = models.FileField(storage=PrivateExportStorage(), blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Export {self.pk} ({self.format}, {self.status})"
+
+    @property
+    def progress(self):
+        """Fraction of rows written, 0.0-1.0."""
+        if self.status == self.DONE:
+            return 1.0
+        if not self.rows_total:
+            return 0.0
+        return min(self.rows_written / self.rows_total, 1.0)
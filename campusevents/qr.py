@@ -0,0 +1,166 @@
+# campusevents/qr.py
+"""
+QR code rendering helpers for tickets.
+
+Ticket QR images are rendered on demand from ``Ticket.qr_code_data`` and
+served by ``/tickets/<ticket_id>/qr.png`` (or ``.svg``). Encoded bytes are
+kept in a bounded in-process LRU, so re-renders of the same ticket come from
+memory and nothing has to be stored per ticket on disk.
+
+Payloads use a compact, versioned format, ``CE1/<ticket_id>/<signature>``,
+where the signature is a truncated HMAC in unpadded base32. Every character
+is in the QR alphanumeric set, so symbols stay at version 2 whatever the
+event title is. Unsigned payloads (the legacy JSON form, bare ticket ids)
+would let anyone who knows a ticket id check it in, so ``parse_qr_payload``
+refuses them unless QR_ACCEPT_UNSIGNED_UNTIL is set and still in the future.
+"""
+
+import base64
+import hashlib
+import io
+import json
+from datetime import date, datetime, time
+from functools import lru_cache
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.dateparse import parse_date, parse_datetime
+
+QR_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+# Roughly 1-2 KB per encoded image, so the default costs ~1 MB per process.
+QR_IMAGE_CACHE_SIZE = getattr(settings, "QR_IMAGE_CACHE_SIZE", 512)
+
+
+QR_PAYLOAD_PREFIX = "CE1"
+QR_PAYLOAD_SALT = "campusevents.qr.CE1"
+# 10 bytes -> 16 base32 characters; plenty against guessing at a door scanner.
+QR_SIGNATURE_BYTES = 10
+
+
+def _sign_ticket_id(ticket_id: str) -> str:
+    digest = salted_hmac(QR_PAYLOAD_SALT, ticket_id, algorithm="sha256").digest()
+    return base64.b32encode(digest[:QR_SIGNATURE_BYTES]).decode("ascii").rstrip("=")
+
+
+def make_qr_payload(ticket_id: str) -> str:
+    """Compact signed payload encoded into a ticket's QR code."""
+    return f"{QR_PAYLOAD_PREFIX}/{ticket_id}/{_sign_ticket_id(ticket_id)}"
+
+
+def accepts_unsigned_payloads(now=None):
+    """True while the QR_ACCEPT_UNSIGNED_UNTIL migration window is open."""
+    until = getattr(settings, "QR_ACCEPT_UNSIGNED_UNTIL", "")
+    if not until:
+        return False
+    if isinstance(until, str):
+        parsed = parse_datetime(until)
+        if parsed is None:
+            day = parse_date(until)
+            if day is None:
+                raise ImproperlyConfigured(f"QR_ACCEPT_UNSIGNED_UNTIL is not a date: {until!r}")
+            parsed = datetime.combine(day, time.min)
+        until = parsed
+    elif isinstance(until, date) and not isinstance(until, datetime):
+        until = datetime.combine(until, time.min)
+    if timezone.is_naive(until):
+        until = timezone.make_aware(until)
+    return (now or timezone.now()) < until
+
+
+def parse_qr_payload(payload, allow_unsigned=None):
+    """
+    Return the ticket id carried by a scanned payload, or None.
+
+    Accepts the compact ``CE1/...`` form (rejected if the signature doesn't
+    match). The legacy JSON form with a ``ticket_id`` key and bare ticket
+    ids are only accepted when ``allow_unsigned`` is true, which defaults to
+    the QR_ACCEPT_UNSIGNED_UNTIL window. Anything that isn't a string (a
+    number or object from a JSON request body) is not a payload.
+    """
+    if not isinstance(payload, str):
+        return None
+    payload = payload.strip()
+    if not payload:
+        return None
+
+    if payload.upper().startswith(QR_PAYLOAD_PREFIX + "/"):
+        parts = payload.upper().split("/")
+        if len(parts) != 3 or not parts[1]:
+            return None
+        _, ticket_id, signature = parts
+        if not constant_time_compare(signature, _sign_ticket_id(ticket_id)):
+            return None
+        return ticket_id
+
+    if allow_unsigned is None:
+        allow_unsigned = accepts_unsigned_payloads()
+    if not allow_unsigned:
+        return None
+
+    if payload.startswith("{"):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return None
+        ticket_id = data.get("ticket_id") if isinstance(data, dict) else None
+        return str(ticket_id) if ticket_id else None
+
+    return payload
+
+
+def _make_qr(data: str, **kwargs) -> qrcode.QRCode:
+    qr = qrcode.QRCode(version=1, box_size=10, border=4, **kwargs)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr
+
+
+def render_qr_png(data: str) -> bytes:
+    """Encode ``data`` as a QR code and return the PNG bytes."""
+    img = _make_qr(data).make_image(fill_color="black", back_color="white")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def render_qr_svg(data: str) -> bytes:
+    """Encode ``data`` as a QR code and return SVG bytes (no Pillow needed)."""
+    img = _make_qr(data, image_factory=qrcode.image.svg.SvgPathImage).make_image()
+    return img.to_string()
+
+
+_RENDERERS = {
+    "png": render_qr_png,
+    "svg": render_qr_svg,
+}
+
+
+@lru_cache(maxsize=QR_IMAGE_CACHE_SIZE)
+def render_qr(data: str, fmt: str = "png") -> bytes:
+    """Render ``data`` in ``fmt`` ("png" or "svg"), memoized in a bounded LRU."""
+    return _RENDERERS[fmt](data)
+
+
+def qr_etag(data: str, fmt: str = "png") -> str:
+    """Strong ETag for the image of ``data``; it only changes if the payload does."""
+    digest = hashlib.sha256(f"{fmt}:{data}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def qr_version(data: str) -> str:
+    """Short content hash used to version QR image URLs."""
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:12]
+
+
+def qr_data_uri(data: str) -> str:
+    """Inline ``data:`` URI of the PNG, for pages that can't use the image endpoint."""
+    encoded = base64.b64encode(render_qr(data, "png")).decode("ascii")
+    return f"data:image/png;base64,{encoded}"
@@ -0,0 +1,237 @@
+# campusevents/search.py
+"""
+Full-text search index for event discovery.
+
+Events are indexed on title, description, location, organization name and
+category in a side table chosen by database backend:
+
+* SQLite: an FTS5 virtual table (rowid = event id), ranked with bm25();
+* PostgreSQL: a weighted tsvector per event with a GIN index, ranked with
+  ts_rank().
+
+Other backends use the process-local BM25 index in campusevents.search_memory,
+as does any deployment with EVENT_SEARCH_BACKEND = "memory". The indexes
+follow Event/Organization saves and deletes through the receivers below;
+writes that bypass signals (``QuerySet.update``, raw SQL) can be repaired
+with ``manage.py rebuild_search_index``.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Event, Organization
+from .search_memory import event_index
+
+SQLITE_TABLE = "campusevents_event_fts"
+POSTGRES_TABLE = "campusevents_event_search"
+# Indexed columns, in FTS5 column order, with their relative weights.
+SEARCH_FIELDS = (
+    ("title", 10.0, "A"),
+    ("description", 1.0, "D"),
+    ("location", 3.0, "C"),
+    ("org_name", 4.0, "B"),
+    ("category", 4.0, "B"),
+)
+
+# Most hits the in-memory index hands to the ORM for one search; the best
+# matches among the events the caller's filters allow, not across the index.
+MEMORY_SEARCH_LIMIT = 1000
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_backend(using=None):
+    """'sqlite', 'postgresql' or None (no index: icontains fallback)."""
+    vendor = (using or connection).vendor
+    return vendor if vendor in ("sqlite", "postgresql") else None
+
+
+def query_backend():
+    """Where searches run: 'sqlite', 'postgresql', 'memory', or None for icontains."""
+    configured = getattr(settings, "EVENT_SEARCH_BACKEND", "auto")
+    if configured == "memory":
+        return "memory"
+    if configured == "database":
+        return search_backend()
+    return search_backend() or "memory"
+
+
+def search_terms(text):
+    """Words of a user query, lower-cased; punctuation and operators dropped."""
+    return [term.lower() for term in _TERM_RE.findall(text or "")]
+
+
+def _fts5_query(terms):
+    # every term must match, each as a prefix ("tech" finds "technology")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _tsquery(terms):
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+# values_list() lookups giving one index row: (event id, *SEARCH_FIELDS)
+ROW_LOOKUPS = ("pk", "title", "description", "location", "org__name", "category")
+
+
+def _event_row(event):
+    org_name = event.org.name if event.org_id else ""
+    return (event.pk, event.title, event.description, event.location, org_name, event.category)
+
+
+# --- Index maintenance -------------------------------------------------------
+
+def index_rows(rows, using=None):
+    """Write index rows ``(event id, title, description, location, org name, category)``."""
+    using = using or connection
+    backend = search_backend(using)
+    rows = [(pk, *(value or "" for value in values)) for pk, *values in rows]
+    if backend is None or not rows:
+        return 0
+    with using.cursor() as cursor:
+        if backend == "sqlite":
+            columns = ", ".join(name for name, _, _ in SEARCH_FIELDS)
+            placeholders = ", ".join(["%s"] * len(SEARCH_FIELDS))
+            cursor.executemany(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [row[:1] for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, {columns}) VALUES (%s, {placeholders})", rows
+            )
+        else:
+            vector = " || ".join(
+                f"setweight(to_tsvector('english', %s), '{weight}')" for _, _, weight in SEARCH_FIELDS
+            )
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (event_id, document) VALUES (%s, {vector}) "
+                f"ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+    return len(rows)
+
+
+def index_events(events):
+    """(Re)index ``events`` (Event instances; load ``org`` to save queries)."""
+    return index_rows(_event_row(event) for event in events)
+
+
+def unindex_event(event_id):
+    backend = search_backend()
+    if backend is None:
+        return
+    table, key = (SQLITE_TABLE, "rowid") if backend == "sqlite" else (POSTGRES_TABLE, "event_id")
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {key} = %s", [event_id])
+
+
+def rebuild_search_index(using=None, batch_size=500):
+    """Reindex every event from scratch; returns how many were indexed."""
+    using = using or connection
+    backend = search_backend(using)
+    if backend is None:
+        return 0
+    with using.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SQLITE_TABLE if backend == 'sqlite' else POSTGRES_TABLE}")
+    rows = (
+        Event.objects.using(using.alias)
+        .order_by("pk")
+        .values_list(*ROW_LOOKUPS)
+        .iterator(chunk_size=batch_size)
+    )
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            total += index_rows(batch, using)
+            batch = []
+    return total + index_rows(batch, using)
+
+
+@receiver(post_save, sender=Event, dispatch_uid="search-event-save")
+def _index_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_events([instance])
+        event_index.note_change(instance.pk)
+
+
+@receiver(post_delete, sender=Event, dispatch_uid="search-event-delete")
+def _unindex_on_delete(sender, instance, **kwargs):
+    unindex_event(instance.pk)
+    event_index.note_change(instance.pk)
+
+
+@receiver(post_save, sender=Organization, dispatch_uid="search-org-save")
+def _reindex_org_events(sender, instance, created=False, raw=False, **kwargs):
+    if not (created or raw):
+        rows = list(instance.event_set.values_list(*ROW_LOOKUPS))
+        index_rows(rows)
+        for row in rows:
+            event_index.note_change(row[0])
+
+
+# --- Querying ----------------------------------------------------------------
+
+def search_events(queryset, text):
+    """
+    Narrow ``queryset`` to events matching ``text`` and annotate
+    ``search_rank`` (lower is more relevant). Returns ``(queryset, ranked)``;
+    ``ranked`` is False only when EVENT_SEARCH_BACKEND = "database" on a
+    database without an index, where matching falls back to icontains.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset, False
+
+    backend = query_backend()
+    if backend == "memory":
+        # ordered hits from the in-process index, fetched by primary key
+        ids = event_index.search(" ".join(terms))
+        if len(ids) > MEMORY_SEARCH_LIMIT:
+            # apply the caller's filters (category, organization, dates) before
+            # the cut, or a narrow search could lose every hit it allows
+            allowed = set(queryset.values_list("pk", flat=True))
+            ids = [pk for pk in ids if pk in allowed][:MEMORY_SEARCH_LIMIT]
+        if not ids:
+            return queryset.none().annotate(search_rank=Value(0)), True
+        rank = Case(
+            *(When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)),
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=ids).annotate(search_rank=rank), True
+    if backend == "sqlite":
+        match = _fts5_query(terms)
+        weights = ", ".join(str(weight) for _, weight, _ in SEARCH_FIELDS)
+        ids = RawSQL(f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s", [match])
+        rank = RawSQL(
+            f"SELECT bm25({SQLITE_TABLE}, {weights}) FROM {SQLITE_TABLE} "
+            f"WHERE {SQLITE_TABLE} MATCH %s AND rowid = {Event._meta.db_table}.id",
+            [match],
+        )
+    elif backend == "postgresql":
+        query = _tsquery(terms)
+        ids = RawSQL(
+            f"SELECT event_id FROM {POSTGRES_TABLE} WHERE document @@ to_tsquery('english', %s)", [query]
+        )
+        rank = RawSQL(
+            f"SELECT -ts_rank(document, to_tsquery('english', %s)) FROM {POSTGRES_TABLE} "
+            f"WHERE event_id = {Event._meta.db_table}.id",
+            [query],
+        )
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(title__icontains=term)
+                | Q(description__icontains=term)
+                | Q(location__icontains=term)
+                | Q(org__name__icontains=term)
+                | Q(category__icontains=term)
+            )
+        return queryset.filter(condition), False
+
+    return queryset.filter(id__in=ids).annotate(search_rank=rank), True
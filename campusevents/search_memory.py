@@ -0,0 +1,210 @@
+# campusevents/search_memory.py
+"""
+Process-local inverted index for event search, for databases without a
+full-text index (see campusevents.search) or with EVENT_SEARCH_BACKEND set
+to "memory".
+
+It holds approved, upcoming events only, tokenized like the database index
+(lower-cased words, accents folded), and scores with BM25 over per-field
+weighted term frequencies. The fields and weights are search.SEARCH_FIELDS,
+applied as FTS5's bm25() applies them: a weight multiplies the term
+frequency in its field, and document length is a plain token count. Query
+terms match as prefixes and all of them must match.
+
+The index is kept current from a change feed: ``Event.updated_at`` (bumped
+by every save) is polled at most every SYNC_INTERVAL seconds, and saves in
+this process are applied on the next query. Deleted or ended events drop
+out because hits are re-fetched through the ORM; a full rebuild every
+REBUILD_INTERVAL seconds also clears them, and picks up organization
+renames made by other processes.
+"""
+
+import bisect
+import math
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Event
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SYNC_INTERVAL = 5.0
+REBUILD_INTERVAL = 600.0
+
+
+def tokenize(text):
+    """Lower-cased words of ``text`` with accents removed."""
+    folded = unicodedata.normalize("NFKD", text or "")
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch)).lower()
+    tokens, word = [], []
+    for ch in folded:
+        if ch.isalnum() or ch == "_":
+            word.append(ch)
+        elif word:
+            tokens.append("".join(word))
+            word = []
+    if word:
+        tokens.append("".join(word))
+    return tokens
+
+
+def indexed_fields():
+    """``(values_list lookup, weight)`` of each of search.SEARCH_FIELDS, in order."""
+    from .search import SEARCH_FIELDS, ROW_LOOKUPS  # search imports this module
+
+    return tuple(zip(ROW_LOOKUPS[1:], (weight for _, weight, _ in SEARCH_FIELDS)))
+
+
+class InvertedIndex:
+    """BM25 inverted index over documents made of weighted text fields."""
+
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {doc id: weighted tf}
+        self.doc_terms = {}                # doc id -> set of terms
+        self.doc_len = {}                  # doc id -> number of tokens
+        self.vocabulary = []               # sorted terms, for prefix lookups
+        self.total_len = 0.0
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_len
+
+    def add(self, doc_id, fields):
+        """Index (or re-index) ``doc_id``; ``fields`` is ``[(text, weight)]``."""
+        self.remove(doc_id)
+        tf = defaultdict(float)
+        length = 0
+        for text, weight in fields:
+            tokens = tokenize(text)
+            length += len(tokens)
+            for token in tokens:
+                tf[token] += weight
+        for term, freq in tf.items():
+            if term not in self.postings:
+                bisect.insort(self.vocabulary, term)
+            self.postings[term][doc_id] = freq
+        self.doc_terms[doc_id] = set(tf)
+        self.doc_len[doc_id] = length
+        self.total_len += length
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self.total_len -= self.doc_len.pop(doc_id)
+        for term in terms:
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, term)]
+
+    def _expand(self, prefix):
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff")
+        return self.vocabulary[start:end]
+
+    def search(self, text, limit=None):
+        """Doc ids matching every term of ``text`` (as prefixes), best first."""
+        terms = tokenize(text)
+        if not terms or not self.doc_len:
+            return []
+        n_docs = len(self.doc_len)
+        avg_len = self.total_len / n_docs or 1.0
+        scores = None
+        for term in terms:
+            # per query term, a document scores its best-matching expansion
+            best = {}
+            for candidate in self._expand(term):
+                posting = self.postings[candidate]
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, freq in posting.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[doc_id] / avg_len)
+                    score = idf * freq * (BM25_K1 + 1) / (freq + norm)
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            if scores is None:
+                scores = best
+            else:
+                scores = {doc_id: scores[doc_id] + s for doc_id, s in best.items() if doc_id in scores}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        return ranked[:limit] if limit else ranked
+
+
+class EventSearchIndex:
+    """The process-wide event index and its change-feed sync."""
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self.lock = threading.Lock()
+        self.loaded_at = None    # monotonic time of the last full build
+        self.checked_at = 0.0    # monotonic time of the last feed poll
+        self.synced_to = None    # Event.updated_at the feed resumes from
+        self.pending = set()     # ids saved in this process since the last sync
+
+    def clear(self):
+        """Drop everything; the next query rebuilds from the database."""
+        with self.lock:
+            self.index, self.loaded_at, self.pending = InvertedIndex(), None, set()
+
+    def note_change(self, event_id):
+        self.pending.add(event_id)
+
+    def _apply(self, rows):
+        """Add or drop each row's event; returns the ids seen."""
+        now = timezone.now()
+        weights = [weight for _, weight in indexed_fields()]
+        seen = set()
+        for pk, status, end_at, updated_at, *texts in rows:
+            if status == Event.APPROVED and end_at and end_at >= now:
+                self.index.add(pk, list(zip(texts, weights)))
+            else:
+                self.index.remove(pk)
+            if updated_at and updated_at > self.synced_to:
+                self.synced_to = updated_at
+            seen.add(pk)
+        return seen
+
+    def _rows(self, queryset):
+        lookups = ("pk", "status", "end_at", "updated_at", *(lookup for lookup, _ in indexed_fields()))
+        return queryset.values_list(*lookups).iterator(chunk_size=2000)
+
+    def sync(self, force=False):
+        """Bring the index up to date; cheap when nothing changed."""
+        with self.lock:
+            now = time.monotonic()
+            if force or self.loaded_at is None or now - self.loaded_at > REBUILD_INTERVAL:
+                self.index = InvertedIndex()
+                # the feed resumes from the start of the load, so saves made
+                # while it runs are picked up by the next poll
+                self.synced_to, self.pending = timezone.now(), set()
+                self._apply(self._rows(
+                    Event.objects.filter(status=Event.APPROVED, end_at__gte=self.synced_to)
+                ))
+                self.loaded_at = self.checked_at = now
+                return
+            if not self.pending and now - self.checked_at < SYNC_INTERVAL:
+                return
+            pending, self.pending = self.pending, set()
+            # >=: several saves can share the newest timestamp
+            changed = Event.objects.filter(Q(pk__in=pending) | Q(updated_at__gte=self.synced_to))
+            for pk in pending - self._apply(self._rows(changed)):
+                self.index.remove(pk)  # saved here, deleted since
+            self.checked_at = now
+
+    def search(self, text, limit=None):
+        self.sync()
+        with self.lock:
+            return self.index.search(text, limit)
+
+
+event_index = EventSearchIndex()
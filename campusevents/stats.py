@@ -0,0 +1,283 @@
+# campusevents/stats.py
+"""
+Daily stats rollup for the admin dashboard.
+
+``DailyStats`` holds per-day (UTC) counts of events created, tickets issued
+and tickets used; ``DailyEventCheckins`` holds per-event check-ins per day.
+Closed days are rolled up by the ``rollup_daily_stats`` beat task (and
+``manage.py backfill_daily_stats`` for history). Dashboard series read the
+rollup and add a live delta for the days it doesn't cover yet (normally
+just today), so their cost doesn't grow with the ticket table.
+
+The assembled dashboard payload is cached on top of that; see
+``cached_dashboard_stats``.
+"""
+
+import time as time_module
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import DailyEventCheckins, DailyStats, Event, Ticket, User
+
+# Closed days re-rolled on every run, so late check-ins (offline sync with a
+# device scan time) still land in the right day.
+ROLLUP_LOOKBACK_DAYS = 2
+
+_COUNTERS = ("events_created", "tickets_issued", "tickets_used")
+
+
+def utc_today():
+    return timezone.now().astimezone(dt_timezone.utc).date()
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def _sources():
+    """(counter, queryset, datetime field) for each DailyStats column."""
+    return (
+        ("events_created", Event.objects.all(), "created_at"),
+        ("tickets_issued", Ticket.objects.all(), "issued_at"),
+        ("tickets_used", Ticket.objects.filter(used_at__isnull=False), "used_at"),
+    )
+
+
+def _in_range(queryset, field, start, end):
+    return queryset.filter(**{f"{field}__gte": _day_start(start), f"{field}__lt": _day_start(end)})
+
+
+def rollup_days(start, end):
+    """
+    Recompute the rollup rows for days in ``[start, end)`` from the source
+    tables: one grouped query per counter plus one for per-event check-ins.
+    Today is never rolled up (it is still changing); ``end`` is clamped.
+    Returns the number of days written.
+    """
+    end = min(end, utc_today())
+    if start >= end:
+        return 0
+    days = {}
+    for counter, queryset, field in _sources():
+        rows = (
+            _in_range(queryset, field, start, end)
+            .annotate(day=TruncDate(field, tzinfo=dt_timezone.utc))
+            .values("day")
+            .annotate(n=Count("id"))
+            .values_list("day", "n")
+        )
+        for day, n in rows:
+            days.setdefault(day, dict.fromkeys(_COUNTERS, 0))[counter] = n
+
+    checkins = (
+        _in_range(Ticket.objects.filter(used_at__isnull=False), "used_at", start, end)
+        .annotate(day=TruncDate("used_at", tzinfo=dt_timezone.utc))
+        .values("day", "event_id")
+        .annotate(n=Count("id"))
+        .values_list("day", "event_id", "n")
+    )
+
+    all_days = [start + timedelta(days=i) for i in range((end - start).days)]
+    with transaction.atomic():
+        # days without activity still get a zero row, which marks them done
+        DailyStats.objects.bulk_create(
+            [DailyStats(day=day, **days.get(day, dict.fromkeys(_COUNTERS, 0))) for day in all_days],
+            update_conflicts=True,
+            unique_fields=["day"],
+            update_fields=[*_COUNTERS, "updated_at"],
+        )
+        DailyEventCheckins.objects.filter(day__gte=start, day__lt=end).delete()
+        DailyEventCheckins.objects.bulk_create(
+            [DailyEventCheckins(day=day, event_id=event_id, checkins=n) for day, event_id, n in checkins]
+        )
+    return len(all_days)
+
+
+def rollup_closed_days(lookback=ROLLUP_LOOKBACK_DAYS):
+    """
+    Incremental rollup: every closed day since the last rolled-up one, plus
+    the last ``lookback`` days again. Today stays live.
+    """
+    today = utc_today()
+    last = DailyStats.objects.order_by("-day").values_list("day", flat=True).first()
+    if last is None:
+        first = Event.objects.order_by("created_at").values_list("created_at", flat=True).first()
+        if first is None:
+            return 0
+        start = first.astimezone(dt_timezone.utc).date()
+    else:
+        start = min(last + timedelta(days=1), today - timedelta(days=lookback))
+    return rollup_days(start, today)
+
+
+def monthly_series(month_starts):
+    """
+    Per-month ``{counter: {"YYYY-MM": n}}`` for the months starting at
+    ``month_starts`` (UTC, oldest first), read from the rollup plus a live
+    delta for days after the last rolled-up one.
+    """
+    window_start = month_starts[0].date()
+    series = {counter: {} for counter in _COUNTERS}
+
+    rolled = (
+        DailyStats.objects
+        .filter(day__gte=window_start)
+        .annotate(month=TruncMonth("day"))
+        .values("month")
+        .annotate(last_day=Max("day"), **{counter: Sum(counter) for counter in _COUNTERS})
+        .order_by()
+    )
+    last_rolled = None
+    for row in rolled:
+        ym = row["month"].strftime("%Y-%m")
+        for counter in _COUNTERS:
+            series[counter][ym] = row[counter] or 0
+        last_rolled = max(last_rolled or row["last_day"], row["last_day"])
+
+    live_from = last_rolled + timedelta(days=1) if last_rolled else window_start
+    for counter, queryset, field in _sources():
+        rows = (
+            queryset
+            .filter(**{f"{field}__gte": _day_start(live_from)})
+            .annotate(month=TruncMonth(field, tzinfo=dt_timezone.utc))
+            .values("month")
+            .annotate(n=Count("id"))
+            .values_list("month", "n")
+        )
+        for month, n in rows:
+            ym = month.strftime("%Y-%m")
+            series[counter][ym] = series[counter].get(ym, 0) + n
+    return series
+
+
+# --- Check-in leaderboard -----------------------------------------------------
+
+# Trailing windows (in UTC days, today included) for top_events_by_checkins.
+LEADERBOARD_WINDOWS = {"week": 7, "month": 30}
+
+
+def windowed_checkins(days):
+    """
+    ``[(event_id, checkins)]`` over the last ``days`` days, most first: rolled
+    up DailyEventCheckins plus a live count for days after the rollup.
+    """
+    since = utc_today() - timedelta(days=days - 1)
+    totals = {}
+    rolled = (
+        DailyEventCheckins.objects
+        .filter(day__gte=since)
+        .values("event_id")
+        .annotate(n=Sum("checkins"))
+        .order_by()
+    )
+    last_rolled = DailyStats.objects.aggregate(last=Max("day"))["last"]
+    for row in rolled:
+        totals[row["event_id"]] = row["n"]
+
+    live_from = max(since, last_rolled + timedelta(days=1)) if last_rolled else since
+    live = (
+        Ticket.objects
+        .filter(used_at__gte=_day_start(live_from))
+        .values("event_id")
+        .annotate(n=Count("id"))
+        .values_list("event_id", "n")
+    )
+    for event_id, n in live:
+        totals[event_id] = totals.get(event_id, 0) + n
+    return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+
+# --- Cached dashboard payload -------------------------------------------------
+#
+# Cache keys embed a version number that Ticket/Event/User writes bump (see
+# the receivers below), so a write is seen by the next request that wins the
+# recompute lock. Requests that lose it meanwhile may still get the previous
+# payload ("last" key) for up to STATS_LOCK_TIMEOUT or DASHBOARD_STATS_CACHE_TTL
+# seconds: the dashboard is eventually consistent, not read-your-writes.
+
+STATS_VERSION_KEY = "dashboard-stats:version"
+DASHBOARD_STATS_CACHE_TTL = getattr(settings, "DASHBOARD_STATS_CACHE_TTL", 30)
+# How long one worker may hold the recompute lock, and how long others wait.
+STATS_LOCK_TIMEOUT = 10
+STATS_LOCK_WAIT = 2.0
+
+
+def stats_version():
+    version = cache.get(STATS_VERSION_KEY)
+    if version is None:
+        cache.add(STATS_VERSION_KEY, 1, timeout=None)
+        version = cache.get(STATS_VERSION_KEY, 1)
+    return version
+
+
+def bump_stats_version():
+    try:
+        cache.incr(STATS_VERSION_KEY)
+    except ValueError:  # key missing or evicted
+        cache.add(STATS_VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_dashboard_stats():
+    """Bump now and again on commit, so a recompute racing the transaction can't stick."""
+    bump_stats_version()
+    transaction.on_commit(bump_stats_version)
+
+
+def cached_dashboard_stats(variant, compute, fresh=False):
+    """
+    Return ``(payload, hit)`` for the dashboard ``variant`` (e.g. "months=12").
+
+    On a miss only the worker that wins ``cache.add`` on the lock key
+    recomputes; the others serve the last payload for this variant if there
+    is one, or wait up to STATS_LOCK_WAIT for the winner. ``fresh`` skips the
+    cache read (admins' ``?fresh=1``) but still stores the result.
+    """
+    key = f"dashboard-stats:v{stats_version()}:{variant}"
+    last_key = f"dashboard-stats:last:{variant}"
+    if not fresh:
+        payload = cache.get(key)
+        if payload is not None:
+            return payload, True
+
+    lock_key = f"{key}:lock"
+    if fresh or cache.add(lock_key, 1, timeout=STATS_LOCK_TIMEOUT):
+        try:
+            payload = compute()
+            cache.set_many({key: payload, last_key: payload}, timeout=DASHBOARD_STATS_CACHE_TTL)
+        finally:
+            if not fresh:
+                cache.delete(lock_key)
+        return payload, False
+
+    stale = cache.get(last_key)
+    if stale is not None:
+        return stale, True
+    deadline = time_module.monotonic() + STATS_LOCK_WAIT
+    while time_module.monotonic() < deadline:
+        time_module.sleep(0.05)
+        payload = cache.get(key)
+        if payload is not None:
+            return payload, True
+    return compute(), False
+
+
+# User saves limited to these fields change nothing the dashboard shows.
+# Every login saves last_login, so bumping on those would empty the cache.
+STATS_IGNORED_USER_FIELDS = frozenset({"last_login"})
+
+
+@receiver([post_save, post_delete], sender=Ticket, dispatch_uid="stats-ticket")
+@receiver([post_save, post_delete], sender=Event, dispatch_uid="stats-event")
+@receiver([post_save, post_delete], sender=User, dispatch_uid="stats-user")
+def _invalidate_on_write(sender, update_fields=None, **kwargs):
+    if sender is User and update_fields and update_fields <= STATS_IGNORED_USER_FIELDS:
+        return
+    invalidate_dashboard_stats()
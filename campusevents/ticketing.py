@@ -0,0 +1,214 @@
+# campusevents/ticketing.py
+"""
+Ticket claiming and check-in services shared by the HTML and API paths.
+
+A seat is reserved with a single conditional UPDATE on the event's
+``issued_count`` before the ticket row is inserted, so concurrent claims can
+never push an event past its capacity and a duplicate claim is reported
+instead of surfacing as an IntegrityError.
+
+Bulk check-in validates a whole batch of ticket ids with one SELECT and marks
+them used with one UPDATE, moving the event counters by the same amount.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Event, Ticket
+from .stats import invalidate_dashboard_stats
+
+
+@dataclass(frozen=True)
+class ClaimResult:
+    """Outcome of :func:`claim_ticket_for`."""
+
+    CLAIMED = "claimed"
+    DUPLICATE = "duplicate"
+    FULL = "full"
+    ENDED = "ended"
+
+    status: str
+    ticket: Optional[Ticket] = None
+
+    @property
+    def claimed(self):
+        return self.status == self.CLAIMED
+
+
+def claim_ticket_for(event, user, **ticket_fields):
+    """
+    Claim a ticket to ``event`` for ``user``.
+
+    Capacity 0 means unlimited. Extra keyword arguments (seat_number, notes,
+    expires_at) are passed through to the new Ticket. Returns a ClaimResult.
+    """
+    if event.end_at and event.end_at <= timezone.now():
+        return ClaimResult(ClaimResult.ENDED)
+
+    # Cheap early exit; the unique (event, user) constraint is the real guard.
+    if Ticket.objects.filter(event=event, user=user).exists():
+        return ClaimResult(ClaimResult.DUPLICATE)
+
+    try:
+        with transaction.atomic():
+            reserved = (
+                Event.objects
+                .filter(pk=event.pk)
+                .filter(Q(capacity=0) | Q(issued_count__lt=F("capacity")))
+                .update(issued_count=F("issued_count") + 1)
+            )
+            if not reserved:
+                return ClaimResult(ClaimResult.FULL)
+
+            ticket = Ticket(event=event, user=user, **ticket_fields)
+            ticket._counted_status = Ticket.ISSUED  # seat already counted above
+            ticket.save(force_insert=True)
+    except IntegrityError:
+        # Lost the race against a parallel claim by the same user.
+        return ClaimResult(ClaimResult.DUPLICATE)
+
+    return ClaimResult(ClaimResult.CLAIMED, ticket)
+
+
+class CheckInResult:
+    """Per-ticket outcomes of :func:`check_in_tickets`."""
+
+    CHECKED_IN = "checked_in"
+    ALREADY_USED = "already_used"
+    INVALID = "invalid"
+    WRONG_EVENT = "wrong_event"
+    NOT_FOUND = "not_found"
+
+
+def mark_ticket_used(ticket, now=None):
+    """
+    Flip ``ticket`` from issued to used with one conditional UPDATE.
+
+    Returns False if it was no longer issued (a second scan of the same code
+    is a no-op). The event counters move only when the row changed.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        changed = (
+            Ticket.objects
+            .filter(pk=ticket.pk, status=Ticket.ISSUED)
+            .update(status=Ticket.USED, used_at=now)
+        )
+        if changed:
+            Event.objects.filter(pk=ticket.event_id).update(
+                issued_count=F("issued_count") - 1,
+                used_count=F("used_count") + 1,
+            )
+    if changed:
+        ticket.status, ticket.used_at = Ticket.USED, now
+        ticket._counted_status = Ticket.USED
+        invalidate_dashboard_stats()
+    return bool(changed)
+
+
+def _check_in_outcome(event, event_ok, now, event_id, status, expires_at):
+    """Outcome of checking in one ticket row; mirrors Ticket.is_valid()."""
+    if event_id != event.pk:
+        return CheckInResult.WRONG_EVENT
+    if status == Ticket.USED:
+        return CheckInResult.ALREADY_USED
+    if status != Ticket.ISSUED or not event_ok or (expires_at and expires_at <= now):
+        return CheckInResult.INVALID
+    return CheckInResult.CHECKED_IN
+
+
+def check_in_tickets(event, ticket_ids):
+    """
+    Mark every valid ticket in ``ticket_ids`` for ``event`` as used.
+
+    Runs one SELECT and at most one UPDATE (plus the counter update) in a
+    single transaction. Returns ``{ticket_id: CheckInResult.*}``.
+    """
+    ticket_ids = set(ticket_ids)
+    outcomes = dict.fromkeys(ticket_ids, CheckInResult.NOT_FOUND)
+    if not ticket_ids:
+        return outcomes
+
+    now = timezone.now()
+    event_ok = event.status == Event.APPROVED
+    with transaction.atomic():
+        rows = (
+            Ticket.objects
+            .select_for_update()
+            .filter(ticket_id__in=ticket_ids)
+            .values_list("pk", "ticket_id", "event_id", "status", "expires_at")
+        )
+        to_use = []
+        for pk, ticket_id, event_id, status, expires_at in rows:
+            outcomes[ticket_id] = _check_in_outcome(event, event_ok, now, event_id, status, expires_at)
+            if outcomes[ticket_id] == CheckInResult.CHECKED_IN:
+                to_use.append(pk)
+
+        if to_use:
+            used = (
+                Ticket.objects
+                .filter(pk__in=to_use, status=Ticket.ISSUED)
+                .update(status=Ticket.USED, used_at=now)
+            )
+            Event.objects.filter(pk=event.pk).update(
+                issued_count=F("issued_count") - used,
+                used_count=F("used_count") + used,
+            )
+            invalidate_dashboard_stats()
+    return outcomes
+
+
+def sync_offline_check_ins(event, check_ins):
+    """
+    Apply check-ins recorded offline by a door device.
+
+    ``check_ins`` is a list of ``(ticket_id, used_at)`` pairs; ``used_at`` is
+    the device's scan time (None means now, future times are clamped). Runs
+    in one transaction: one SELECT, one bulk update and the counter update.
+    Returns one dict per distinct ticket id, in input order. A ticket that
+    was already used, by another device or online, is a conflict and carries
+    the server's ``used_at``.
+    """
+    now = timezone.now()
+    scanned = {}
+    for ticket_id, used_at in check_ins:
+        used_at = min(used_at or now, now)
+        # the same code scanned twice offline: the first scan wins
+        if ticket_id not in scanned or used_at < scanned[ticket_id]:
+            scanned[ticket_id] = used_at
+    report = {
+        ticket_id: {"ticket_id": ticket_id, "result": CheckInResult.NOT_FOUND}
+        for ticket_id in scanned
+    }
+    if not scanned:
+        return []
+
+    event_ok = event.status == Event.APPROVED
+    with transaction.atomic():
+        rows = (
+            Ticket.objects
+            .select_for_update()
+            .filter(ticket_id__in=scanned)
+            .values_list("pk", "ticket_id", "event_id", "status", "expires_at", "used_at")
+        )
+        updates = []
+        for pk, ticket_id, event_id, status, expires_at, server_used_at in rows:
+            outcome = _check_in_outcome(event, event_ok, now, event_id, status, expires_at)
+            report[ticket_id]["result"] = outcome
+            if outcome == CheckInResult.CHECKED_IN:
+                updates.append(Ticket(pk=pk, status=Ticket.USED, used_at=scanned[ticket_id]))
+            elif outcome == CheckInResult.ALREADY_USED:
+                report[ticket_id]["server_used_at"] = server_used_at
+
+        if updates:
+            Ticket.objects.bulk_update(updates, ["status", "used_at"])
+            Event.objects.filter(pk=event.pk).update(
+                issued_count=F("issued_count") - len(updates),
+                used_count=F("used_count") + len(updates),
+            )
+            invalidate_dashboard_stats()
+    return list(report.values())
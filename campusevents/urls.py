@@ -32,6 +32,12 @@ urlpatterns = [
     # Calendar feed for FullCalendar
     path("api/calendar-events/", views.calendar_events_feed, name="calendar_events_feed"),
 
+    # Subscribable .ics feeds (webcal://)
+    path("calendar/feeds/campus.ics", views.campus_ics_feed, name="campus_ics_feed"),
+    path("calendar/feeds/org/<int:org_id>.ics", views.organization_ics_feed, name="organization_ics_feed"),
+    path("calendar/feeds/user/<str:token>.ics", views.user_ics_feed, name="user_ics_feed"),
+    path("api/calendar/feeds/", views.CalendarFeedLinksView.as_view(), name="calendar_feed_links"),
+
     # API endpoints
     path("api/profile/", views.UserProfileView.as_view(), name="user_profile"),
     path("api/register/", views.UserRegistrationView.as_view(), name="user_registration"),
@@ -41,13 +47,23 @@ urlpatterns = [
     path("api/events/", views.EventListView.as_view(), name="event_list"),
     path("api/events/discover/", views.EventDiscoveryView.as_view(), name="event_discovery"),
     path("api/events/<int:pk>/", views.EventDetailView.as_view(), name="event_detail"),
+    path("api/events/<int:pk>/calendar/ics/", views.EventIcsView.as_view(), name="event_ics"),
+    path("api/events/<int:pk>/calendar/google/", views.EventGoogleCalendarView.as_view(), name="event_google_calendar"),
     path(
         "api/events/<int:primary_key>/attendees/csv/",
         views.EventAttendeesCSVListView.as_view(),
         name="event_attendees_csv_api",  # fixed name to avoid clash
     ),
+    path("api/exports/", views.ExportJobListCreateView.as_view(), name="export_jobs"),
+    path("api/exports/<int:pk>/", views.ExportJobDetailView.as_view(), name="export_job_detail"),
+    path("api/exports/<int:pk>/download/", views.ExportJobDownloadView.as_view(), name="export_job_download"),
     path("api/tickets/issue/", views.TicketIssueView.as_view(), name="ticket_issue"),
     path("api/tickets/validate/", views.TicketValidationView.as_view(), name="ticket_validate"),
+    path("api/scanner/check-in/", views.ScannerCheckInView.as_view(), name="scanner_check_in"),
+    path("api/events/<int:pk>/check-in/bulk/", views.BulkCheckInView.as_view(), name="bulk_check_in"),
+    path("api/events/<int:pk>/check-in/manifest/", views.CheckInManifestView.as_view(), name="check_in_manifest"),
+    path("api/events/<int:pk>/check-in/manifest/key/", views.CheckInManifestKeyView.as_view(), name="check_in_manifest_key"),
+    path("api/events/<int:pk>/check-in/sync/", views.CheckInSyncView.as_view(), name="check_in_sync"),
     path("api/tickets/my-tickets/", views.MyTicketsView.as_view(), name="my_tickets"),
     path("api/tickets/<int:pk>/", views.TicketDetailView.as_view(), name="ticket_detail"),
     path("api/logout/", views.logout_view, name="api_logout"),
@@ -59,6 +75,7 @@ urlpatterns = [
     path("dashboard/", views.admin_dashboard_page, name="admin_dashboard_page"),
     path("dashboard/stats/", views.AdminDashboardStatsView.as_view(), name="admin_dashboard_stats"),
     path("api/dashboard/stats/", views.AdminDashboardStatsView.as_view(), name="admin_dashboard_stats_api"),
+    path("api/dashboard/top-events/", views.TopEventsView.as_view(), name="admin_dashboard_top_events"),
     # Convenience (no trailing slash)
     path("dashboard", views.admin_dashboard_page),
     path("dashboard/stats", views.AdminDashboardStatsView.as_view()),
@@ -88,6 +105,8 @@ urlpatterns = [
     ),
     path("tickets/<int:pk>/resend-confirmation/", email_views.resend_confirmation, name="resend_confirmation"),
     path("tickets/view/", email_views.view_ticket_signed, name="view_ticket_signed"),
+    path("tickets/<str:ticket_id>/qr.png", views.ticket_qr_image, {"fmt": "png"}, name="ticket_qr_png"),
+    path("tickets/<str:ticket_id>/qr.svg", views.ticket_qr_image, {"fmt": "svg"}, name="ticket_qr_svg"),
     path("dev/email/preview/claim/<int:pk>/", email_views.preview_claim_email, name="preview_claim_email"),
 
 
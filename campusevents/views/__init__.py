@@ -5,7 +5,10 @@ Re-exports all views from organized submodules.
 """
 
 # Utilities and pagination
-from .utils import EventPagination, build_event_discovery_qs, decode_qr_from_uploaded
+from .utils import (
+    EventPagination, KeysetPagination, get_paginator,
+    build_event_discovery_qs, event_serializer_context, decode_qr_from_uploaded,
+)
 
 # Authentication views
 from .auth_views import (
@@ -39,10 +42,16 @@ from .event_views import (
 from .ticket_views import (
     TicketIssueView,
     TicketValidationView,
+    BulkCheckInView,
+    ScannerCheckInView,
+    CheckInManifestView,
+    CheckInManifestKeyView,
+    CheckInSyncView,
     MyTicketsView,
     TicketDetailView,
     claim_ticket,
     my_events,
+    ticket_qr_image,
 )
 
 # Admin user management views
@@ -69,6 +78,7 @@ from .admin_event_views import (
 # Dashboard views
 from .dashboard_views import (
     AdminDashboardStatsView,
+    TopEventsView,
     admin_dashboard_page,
 )
 
@@ -76,12 +86,21 @@ from .dashboard_views import (
 from .calendar_views import (
     calendar_page,
     calendar_events_feed,
+    campus_ics_feed,
+    organization_ics_feed,
+    user_ics_feed,
+    CalendarFeedLinksView,
+    EventIcsView,
+    EventGoogleCalendarView,
 )
 
 # Export views
 from .export_views import (
     event_attendees_csv,
     EventAttendeesCSVListView,
+    ExportJobListCreateView,
+    ExportJobDetailView,
+    ExportJobDownloadView,
 )
 
 # Organizer views
@@ -94,7 +113,10 @@ from .organizer_views import (
 __all__ = [
     # Utilities
     'EventPagination',
+    'KeysetPagination',
+    'get_paginator',
     'build_event_discovery_qs',
+    'event_serializer_context',
     'decode_qr_from_uploaded',
 
     # Authentication
@@ -124,10 +146,16 @@ __all__ = [
     # Tickets
     'TicketIssueView',
     'TicketValidationView',
+    'BulkCheckInView',
+    'ScannerCheckInView',
+    'CheckInManifestView',
+    'CheckInManifestKeyView',
+    'CheckInSyncView',
     'MyTicketsView',
     'TicketDetailView',
     'claim_ticket',
     'my_events',
+    'ticket_qr_image',
 
     # Admin User Management
     'AdminUserManagementView',
@@ -148,15 +176,25 @@ __all__ = [
 
     # Dashboard
     'AdminDashboardStatsView',
+    'TopEventsView',
     'admin_dashboard_page',
 
     # Calendar
     'calendar_page',
     'calendar_events_feed',
+    'campus_ics_feed',
+    'organization_ics_feed',
+    'user_ics_feed',
+    'CalendarFeedLinksView',
+    'EventIcsView',
+    'EventGoogleCalendarView',
 
     # Export
     'event_attendees_csv',
     'EventAttendeesCSVListView',
+    'ExportJobListCreateView',
+    'ExportJobDetailView',
+    'ExportJobDownloadView',
 
     # Organizer
     'organizer_my_events',
@@ -18,7 +18,7 @@ from ..api.serializers import (
     EventApprovalSerializer,
     EventStatusUpdateSerializer,
 )
-from .utils import EventPagination
+from .utils import EventPagination, get_paginator
 
 
 class AdminEventModerationView(APIView):
@@ -52,9 +52,9 @@ class AdminEventModerationView(APIView):
 
         events = events.select_related("org", "created_by")
         events = events.order_by("-created_at")
-        paginator = self.pagination_class()
+        paginator = get_paginator(request, self.pagination_class)
         page = paginator.paginate_queryset(events, request)
-        serializer = AdminEventSerializer(page or events, many=True)
+        serializer = AdminEventSerializer(page if page is not None else events, many=True)
         if page is not None:
             return paginator.get_paginated_response(serializer.data)
         return Response(serializer.data)
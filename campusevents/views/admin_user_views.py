@@ -19,7 +19,7 @@ from ..api.serializers import (
     UserRoleUpdateSerializer,
     UserStatusUpdateSerializer,
 )
-from .utils import EventPagination
+from .utils import EventPagination, get_paginator
 
 
 class AdminUserManagementView(APIView):
@@ -53,7 +53,7 @@ class AdminUserManagementView(APIView):
             )
 
         users = users.order_by("-created_at")
-        paginator = EventPagination()
+        paginator = get_paginator(request)
         page = paginator.paginate_queryset(users, request)
         if page is not None:
             return paginator.get_paginated_response(AdminUserSerializer(page, many=True).data)
@@ -199,10 +199,10 @@ class AdminPendingOrganizersView(APIView):
             )
 
         # Paginate results
-        paginator = self.pagination_class()
+        paginator = get_paginator(request, self.pagination_class)
         page = paginator.paginate_queryset(pending_organizers, request)
 
-        serializer = AdminUserSerializer(page or pending_organizers, many=True)
+        serializer = AdminUserSerializer(page if page is not None else pending_organizers, many=True)
 
         if page is not None:
             return paginator.get_paginated_response(serializer.data)
@@ -1,17 +1,40 @@
 # campusevents/views/calendar_views.py
 """
-Calendar and event feed views.
+Calendar and event feed views: the FullCalendar JSON feed and the
+subscribable .ics feeds.
 """
 
-from datetime import timedelta
+import hashlib
+import json
+from datetime import timedelta, timezone as dt_timezone
 
-from django.http import JsonResponse
-from django.shortcuts import render
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, Max, Sum, Value
+from django.db.models.functions import Greatest
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.utils import timezone as dj_tz
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
 from django.views.decorators.http import require_GET
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from ..models import Event
+from ..calendar_index import approved_events_between
+from ..calendar_utils import (
+    ICS_FEED_PAST_DAYS,
+    assemble_ics,
+    feed_vevents,
+    generate_google_calendar_link,
+    generate_ics_file,
+    make_feed_token,
+    user_for_feed_token,
+)
+from ..models import Event, Organization, Ticket
 
 
 def calendar_page(request):
@@ -22,6 +45,109 @@ def calendar_page(request):
     return render(request, "calendar.html")
 
 
+# Cached payloads are keyed by the window's validator (see _feed_state), so
+# they are never stale; the TTL only bounds how long an unused window lives.
+CALENDAR_FEED_CACHE_TTL = 300
+
+
+def _day_floor(value):
+    return value.astimezone(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _feed_window(request):
+    """The requested window widened to whole UTC days, so nearby requests share a cache entry."""
+    start_dt = end_dt = None
+    if request.GET.get("start"):
+        start_dt = parse_datetime(request.GET["start"])
+    if request.GET.get("end"):
+        end_dt = parse_datetime(request.GET["end"])
+
+    # If FullCalendar didn't send a window, just show the next 60 days
+    start_dt = start_dt or dj_tz.now() - timedelta(days=1)
+    end_dt = end_dt or dj_tz.now() + timedelta(days=60)
+    if dj_tz.is_naive(start_dt):
+        start_dt = dj_tz.make_aware(start_dt, dj_tz.get_current_timezone())
+    if dj_tz.is_naive(end_dt):
+        end_dt = dj_tz.make_aware(end_dt, dj_tz.get_current_timezone())
+
+    end_day = _day_floor(end_dt)
+    if end_day < end_dt:
+        end_day += timedelta(days=1)
+    return _day_floor(start_dt), end_day
+
+
+def _window_events(start_dt, end_dt):
+    # Overlap query: (event.end >= window.start) & (event.start <= window.end),
+    # answered from the week buckets of the window (see calendar_index)
+    return approved_events_between(start_dt, end_dt)
+
+
+def _feed_state(request):
+    """
+    ``(etag, last_modified, window)`` for this request, from a single
+    aggregate. The ETag covers the newest ``updated_at`` plus the event count
+    (deletes) and issued total (claims move the counters with F() updates,
+    which don't touch updated_at).
+    """
+    start_dt, end_dt = _feed_window(request)
+    agg = _window_events(start_dt, end_dt).aggregate(
+        last=Max("updated_at"), n=Count("id"), issued=Sum("issued_count"),
+    )
+    validator = f"{start_dt:%Y%m%d}-{end_dt:%Y%m%d}:{agg['last'] and agg['last'].timestamp()}:{agg['n']}:{agg['issued']}"
+    etag = hashlib.sha256(validator.encode("ascii")).hexdigest()[:16]
+    return quote_etag(etag), agg["last"], (start_dt, end_dt)
+
+
+def _conditional_response(request, etag, last_modified):
+    """
+    A 304 if the client's ``If-None-Match`` matches ``etag``, else None.
+
+    Last-Modified is still sent, but never decides a 304 on its own: a delete
+    or a counter change leaves the newest ``updated_at`` where it was, so a
+    bare ``If-Modified-Since`` would keep serving the stale copy.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        _set_validators(response, etag, last_modified)
+    return response
+
+
+def _set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+
+def _build_feed(start_dt, end_dt):
+    rows = (
+        _window_events(start_dt, end_dt)
+        .annotate(
+            org_name=F("org__name"),
+            # same as Event.remaining_capacity, computed in the query
+            remaining=Greatest(F("capacity") - F("issued_count"), Value(0)),
+        )
+        .order_by("start_at")
+        .values("id", "title", "start_at", "end_at", "org_name", "location", "category", "remaining")
+    )
+    # Build FullCalendar event dicts
+    return [
+        {
+            "id": e["id"],
+            "title": e["title"],
+            "start": e["start_at"].isoformat(),
+            "end": e["end_at"].isoformat() if e["end_at"] else None,
+            "url": f"/events/?search={e['title']}",
+            "extendedProps": {
+                "organization": e["org_name"] or "",
+                "location": e["location"] or "",
+                "category": e["category"] or "",
+                "remaining": e["remaining"],
+            },
+        }
+        for e in rows
+    ]
+
+
 @require_GET
 def calendar_events_feed(request):
     """
@@ -30,42 +156,125 @@ def calendar_events_feed(request):
     FullCalendar calls with ?start=...&end=... (ISO8601). We return all APPROVED
     events that overlap that window. Anonymous access is fine here since it's just
     public event info.
+
+    Navigation is cheap: one aggregate query decides the ETag/Last-Modified,
+    a matching ``If-None-Match`` gets a 304, and the JSON for each
+    (window, ETag) is cached.
     """
-    start_param = request.GET.get("start")
-    end_param = request.GET.get("end")
+    etag, last_modified, (start_dt, end_dt) = _feed_state(request)
+    response = _conditional_response(request, etag, last_modified)
+    if response is None:
+        key = f"calendar-feed:{etag}"
+        body = cache.get(key)
+        if body is None:
+            body = json.dumps(_build_feed(start_dt, end_dt), cls=DjangoJSONEncoder)
+            cache.set(key, body, timeout=CALENDAR_FEED_CACHE_TTL)
+        response = HttpResponse(body, content_type="application/json")
+        _set_validators(response, etag, last_modified)
+    # public data; clients revalidate on every navigation
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
 
-    # If FullCalendar didn't send a window, just show the next 60 days
-    start_dt = parse_datetime(start_param) if start_param else dj_tz.now() - timedelta(days=1)
-    end_dt = parse_datetime(end_param) if end_param else dj_tz.now() + timedelta(days=60)
 
-    if start_dt and dj_tz.is_naive(start_dt):
-        start_dt = dj_tz.make_aware(start_dt, dj_tz.get_current_timezone())
-    if end_dt and dj_tz.is_naive(end_dt):
-        end_dt = dj_tz.make_aware(end_dt, dj_tz.get_current_timezone())
+# --- Subscribable .ics feeds (webcal://) ---------------------------------------
 
-    # Overlap query: (event.end >= window.start) & (event.start <= window.end)
-    qs = (
-        Event.objects
-        .filter(status=Event.APPROVED, end_at__gte=start_dt, start_at__lte=end_dt)
-        .select_related("org")
-        .order_by("start_at")
+def _ics_feed(request, events, name, public=True):
+    """
+    Serve ``events`` (approved, recent and upcoming) as an .ics feed.
+
+    One query reads ``(id, updated_at)`` of the feed's events; its digest is
+    the ETag, so a client polling an unchanged feed with ``If-None-Match``
+    gets a 304 after that query alone (see _conditional_response). Otherwise
+    the feed is stitched from cached VEVENTs (see calendar_utils.feed_vevents)
+    and only edited events are re-rendered.
+    """
+    since = dj_tz.now() - timedelta(days=ICS_FEED_PAST_DAYS)
+    versions = list(
+        events.filter(status=Event.APPROVED, end_at__gte=since)
+        .order_by("start_at", "id")
+        .values_list("id", "updated_at")
     )
+    digest = hashlib.sha256(name.encode("utf-8"))
+    for pk, updated_at in versions:
+        digest.update(f"{pk}:{updated_at.timestamp()};".encode("ascii"))
+    etag = quote_etag(digest.hexdigest()[:16])
+    last_modified = max((updated_at for _, updated_at in versions), default=None)
 
-    # Build FullCalendar event dicts
-    events = []
-    for e in qs:
-        events.append({
-            "id": e.id,
-            "title": e.title,
-            "start": e.start_at.isoformat(),
-            "end": e.end_at.isoformat() if e.end_at else None,
-            "url": f"/events/?search={e.title}",
-            "extendedProps": {
-                "organization": e.org.name if e.org_id else "",
-                "location": e.location or "",
-                "category": e.category or "",
-                "remaining": e.remaining_capacity,
-            },
+    response = _conditional_response(request, etag, last_modified)
+    if response is None:
+        response = HttpResponse(
+            assemble_ics(name, feed_vevents(versions, request)),
+            content_type="text/calendar; charset=utf-8",
+        )
+        response["Content-Disposition"] = 'inline; filename="events.ics"'
+        _set_validators(response, etag, last_modified)
+    # personal feeds live behind a secret URL: keep them out of shared caches
+    patch_cache_control(response, public=public, private=not public, no_cache=True)
+    return response
+
+
+@require_GET
+def campus_ics_feed(request):
+    """Every approved event, as a subscribable calendar."""
+    return _ics_feed(request, Event.objects.all(), "Campus Events")
+
+
+@require_GET
+def organization_ics_feed(request, org_id):
+    """Approved events of one organization."""
+    org = get_object_or_404(Organization, pk=org_id)
+    return _ics_feed(request, Event.objects.filter(org=org), f"{org.name} · Campus Events")
+
+
+@require_GET
+def user_ics_feed(request, token):
+    """
+    Events the token's owner holds a ticket for. Calendar clients can't send
+    a JWT, so the secret URL is the credential (see make_feed_token).
+    """
+    user = user_for_feed_token(token)
+    if user is None:
+        raise Http404("Unknown calendar feed.")
+    held = Ticket.objects.filter(user=user, status__in=[Ticket.ISSUED, Ticket.USED]).values("event_id")
+    return _ics_feed(request, Event.objects.filter(id__in=held), "My Campus Events", public=False)
+
+
+def _webcal_url(request, path):
+    return "webcal://" + request.get_host() + path
+
+
+class CalendarFeedLinksView(APIView):
+    """The current user's webcal:// subscription links."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        token = make_feed_token(request.user)
+        return Response({
+            "campus": _webcal_url(request, reverse("campus_ics_feed")),
+            "personal": _webcal_url(request, reverse("user_ics_feed", args=[token])),
         })
-    return JsonResponse(events, safe=False)
 
+
+# --- Single-event calendar exports ---------------------------------------------
+
+class EventIcsView(APIView):
+    """Download one event as an .ics file."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        return generate_ics_file(get_object_or_404(Event, pk=pk), request)
+
+
+class EventGoogleCalendarView(APIView):
+    """Link that opens Google Calendar with the event pre-filled."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        event = get_object_or_404(Event, pk=pk)
+        return Response({
+            "google_calendar_link": generate_google_calendar_link(event, request),
+            "message": "Open this link in a new tab to add the event to your Google Calendar",
+        })
@@ -3,10 +3,11 @@
 Admin dashboard and statistics views.
 """
 
-from datetime import timedelta
+from datetime import timedelta, timezone as dt_timezone
 
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Count
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import render
 from django.utils import timezone as dj_tz
 
@@ -17,7 +18,9 @@ from rest_framework.views import APIView
 from rest_framework.authentication import SessionAuthentication
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from ..models import User, Event, Ticket
+from ..models import User, Event
+from ..stats import LEADERBOARD_WINDOWS, cached_dashboard_stats, monthly_series, windowed_checkins
+from .utils import EventPagination
 
 
 class AdminDashboardStatsView(APIView):
@@ -37,54 +40,72 @@ class AdminDashboardStatsView(APIView):
         "pending_organizers": int,
         "pending_events": int
       },
-      "events_per_month": [ {"month": "YYYY-MM", "count": int}, ... ],   # last 12 months
+      "events_per_month": [ {"month": "YYYY-MM", "count": int}, ... ],   # last ?months= months (UTC; default 12, max 60)
       "tickets_per_month": [ {"month": "YYYY-MM", "issued": int, "used": int, "participation_rate": float}, ... ],
       "top_events_by_checkins": [ {"event_id": int, "title": str, "used": int}, ... ]  # top 5
     }
+
+    The payload is cached (DASHBOARD_STATS_CACHE_TTL) and invalidated by any
+    Ticket/Event/User write; ``?fresh=1`` recomputes it. ``X-Cache`` says
+    whether the response came from the cache.
     """
 
+    # Longest trend window the endpoint will compute (?months=).
+    MAX_MONTHS = 60
+
     def get(self, request):
         if not request.user.is_admin():
             return Response({"error": "Only administrators can view dashboard stats"}, status=status.HTTP_403_FORBIDDEN)
 
-        # Totals
-        total_users = User.objects.count()
-        total_events = Event.objects.count()
-        verified_organizers = User.objects.filter(role=User.ROLE_ORGANIZER, is_verified=True).count()
-        pending_organizers = User.objects.filter(role=User.ROLE_ORGANIZER, is_verified=False).count()
-        pending_events = Event.objects.filter(status=Event.PENDING).count()
-
-        tickets_issued_total = Ticket.objects.filter(status=Ticket.ISSUED).count()
-        tickets_used_total = Ticket.objects.filter(status=Ticket.USED).count()
-
-        # Monthly buckets for the last 12 months (including current)
-        now = dj_tz.now()
+        try:
+            months = int(request.query_params.get("months", 12))
+        except (TypeError, ValueError):
+            return Response({"error": "months must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        months = max(1, min(months, self.MAX_MONTHS))
+        fresh = request.query_params.get("fresh") in ("1", "true")
+
+        data, hit = cached_dashboard_stats(f"months={months}", lambda: self._compute(months), fresh=fresh)
+        response = Response(data)
+        response["X-Cache"] = "HIT" if hit else "MISS"
+        return response
+
+    def _compute(self, months):
+        """Build the uncached payload for a `months`-long window."""
+        # Totals: one conditional aggregate per table
+        user_totals = User.objects.aggregate(
+            total_users=Count("id"),
+            verified_organizers=Count("id", filter=Q(role=User.ROLE_ORGANIZER, is_verified=True)),
+            pending_organizers=Count("id", filter=Q(role=User.ROLE_ORGANIZER, is_verified=False)),
+        )
+        # ticket totals come from the denormalized event counters
+        event_totals = Event.objects.aggregate(
+            total_events=Count("id"),
+            pending_events=Count("id", filter=Q(status=Event.PENDING)),
+            tickets_issued_total=Coalesce(Sum("issued_count"), 0),
+            tickets_used_total=Coalesce(Sum("used_count"), 0),
+        )
 
-        # First day of this month at midnight
-        first_of_this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        # Monthly buckets (UTC) for the last `months` months, oldest → newest
+        first_of_this_month = dj_tz.now().astimezone(dt_timezone.utc).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0,
+        )
+        month_starts = [first_of_this_month]
+        for _ in range(months - 1):
+            month_starts.insert(0, (month_starts[0] - timedelta(days=1)).replace(day=1))
 
-        def month_start_n_ago(n: int):
-            dt = first_of_this_month
-            for _ in range(n):
-                dt = (dt - timedelta(days=32)).replace(day=1)
-            return dt
+        # Closed days come from the DailyStats rollup, today from a live delta
+        series = monthly_series(month_starts)
+        events_by_month = series["events_created"]
+        issued_by_month = series["tickets_issued"]
+        used_by_month = series["tickets_used"]
 
         events_per_month = []
         tickets_per_month = []
-
-        # Build oldest → newest (11 months ago .. this month)
-        for n in range(11, -1, -1):
-            start = month_start_n_ago(n)
-            next_month = (start + timedelta(days=32)).replace(day=1)
+        for start in month_starts:
             ym = start.strftime('%Y-%m')
-
-            # Events created in month
-            events_count = Event.objects.filter(created_at__gte=start, created_at__lt=next_month).count()
-            events_per_month.append({"month": ym, "count": events_count})
-
-            # Tickets issued/used in month
-            issued = Ticket.objects.filter(issued_at__gte=start, issued_at__lt=next_month).count()
-            used = Ticket.objects.filter(used_at__isnull=False, used_at__gte=start, used_at__lt=next_month).count()
+            events_per_month.append({"month": ym, "count": events_by_month.get(ym, 0)})
+            issued = issued_by_month.get(ym, 0)
+            used = used_by_month.get(ym, 0)
             participation_rate = float(used / issued) if issued else 0.0
             tickets_per_month.append({
                 "month": ym,
@@ -93,12 +114,8 @@ class AdminDashboardStatsView(APIView):
                 "participation_rate": round(participation_rate, 3),
             })
 
-        # Top events by check-ins (used tickets)
-        top_events_qs = (
-            Event.objects
-            .annotate(used_count=Count('tickets', filter=Q(tickets__status=Ticket.USED)))
-            .order_by('-used_count', '-start_at')[:5]
-        )
+        # Top events by check-ins (used tickets), read from the denormalized counter
+        top_events_qs = Event.objects.only("id", "title", "used_count").order_by('-used_count', '-start_at')[:5]
         top_events_by_checkins = [
             {"event_id": e.id, "title": e.title, "used": e.used_count or 0}
             for e in top_events_qs
@@ -106,19 +123,69 @@ class AdminDashboardStatsView(APIView):
 
         data = {
             "totals": {
-                "total_users": total_users,
-                "total_events": total_events,
-                "tickets_issued_total": tickets_issued_total,
-                "tickets_used_total": tickets_used_total,
-                "verified_organizers": verified_organizers,
-                "pending_organizers": pending_organizers,
-                "pending_events": pending_events,
+                "total_users": user_totals["total_users"],
+                "total_events": event_totals["total_events"],
+                "tickets_issued_total": event_totals["tickets_issued_total"],
+                "tickets_used_total": event_totals["tickets_used_total"],
+                "verified_organizers": user_totals["verified_organizers"],
+                "pending_organizers": user_totals["pending_organizers"],
+                "pending_events": event_totals["pending_events"],
             },
             "events_per_month": events_per_month,
             "tickets_per_month": tickets_per_month,
             "top_events_by_checkins": top_events_by_checkins,
         }
-        return Response(data)
+        return data
+
+
+class TopEventsView(APIView):
+    """
+    Paginated leaderboard of events by check-ins (admins only).
+
+    ``?window=all`` (default) walks the (used_count, start_at) index on
+    Event. ``week``/``month`` cover the last 7/30 UTC days and read the
+    DailyEventCheckins rollup plus a live count for today.
+    """
+    authentication_classes = (SessionAuthentication, JWTAuthentication)
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_admin():
+            return Response({"error": "Only administrators can view dashboard stats"}, status=status.HTTP_403_FORBIDDEN)
+
+        window = request.query_params.get("window", "all")
+        if window != "all" and window not in LEADERBOARD_WINDOWS:
+            choices = ", ".join(["all", *LEADERBOARD_WINDOWS])
+            return Response({"error": f"window must be one of: {choices}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = EventPagination()
+        if window == "all":
+            queryset = (
+                Event.objects
+                .filter(used_count__gt=0)
+                .only("id", "title", "start_at", "used_count")
+                .order_by("-used_count", "-start_at")
+            )
+            page = [(e, e.used_count) for e in paginator.paginate_queryset(queryset, request, view=self)]
+        else:
+            ranked = paginator.paginate_queryset(windowed_checkins(LEADERBOARD_WINDOWS[window]), request, view=self)
+            events = Event.objects.only("id", "title", "start_at").in_bulk([event_id for event_id, _ in ranked])
+            page = [(events[event_id], used) for event_id, used in ranked if event_id in events]
+
+        offset = (paginator.page_number - 1) * paginator.get_page_size(request)
+        results = [
+            {
+                "rank": offset + i,
+                "event_id": event.id,
+                "title": event.title,
+                "start_at": event.start_at,
+                "used": used,
+            }
+            for i, (event, used) in enumerate(page, start=1)
+        ]
+        response = paginator.get_paginated_response(results)
+        response.data["window"] = window
+        return response
 
 
 @login_required(login_url='login')
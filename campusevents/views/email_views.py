@@ -1,5 +1,4 @@
 from django.utils import timezone
-from django.db import transaction
 from django.http import JsonResponse, HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, render
 from django.views.decorators.http import require_POST
@@ -8,9 +7,10 @@ from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
 
 from campusevents.models import Ticket, EmailLog
-from campusevents.tasks import send_confirmation_task  # or your task name
-from campusevents.emails.emails import build_confirmation_message, make_send_key
+from campusevents.emails.dispatch import queue_ticket_confirmation
+from campusevents.emails.emails import build_confirmation_message
 from campusevents.emails.tokens import read_email_token
+from campusevents.qr import qr_data_uri
 
 @login_required
 @require_POST
@@ -30,34 +30,8 @@ def resend_confirmation(request, pk: int):
     if recent >= 3:
         return JsonResponse({"ok": False, "error": "Rate limit: 3 per 24h"}, status=429)
 
-    event = ticket.event
-    ctx = {
-        "user_name": request.user.get_full_name() or request.user.email,
-        "event_title": event.title,
-        "event_dt": event.start_at,
-        "location": event.location,
-        "ticket_id": ticket.ticket_id,
-        "seat": ticket.seat_number or None,
-        "organizer": getattr(event, "org", None).name if hasattr(event, "org") else "",
-        "support_email": getattr(settings, "DEFAULT_FROM_EMAIL", "support@example.com"),
-    }
-    template_path = "campusevents/email/claim_confirmation.html"
-    send_key = make_send_key(request.user.email, ticket.ticket_id, template_path)
-
-    EmailLog.objects.create(
-        to=request.user.email,
-        subject=f"Your ticket for {event.title}",
-        template=template_path,
-        context_json=ctx,
-        status="queued",
-        user=request.user,
-        event_id=str(event.id),
-        ticket_id=str(ticket.id),
-        send_key=send_key,
-    )
-
-    # 👇 key change is here
-    transaction.on_commit(lambda: send_confirmation_task.delay(ticket.id))
+    # sent by the next dispatch_email_queue run (every minute, see CELERY_BEAT_SCHEDULE)
+    queue_ticket_confirmation(ticket)
 
     return JsonResponse({"ok": True})
 
@@ -71,7 +45,12 @@ def view_ticket_signed(request):
     ticket = get_object_or_404(Ticket, ticket_id=ticket_code)
     if to_email and to_email.lower() != ticket.user.email.lower():
         return HttpResponse("Token/email mismatch.", status=403)
-    return render(request, "campusevents/ticket_view.html", {"ticket": ticket, "event": ticket.event})
+    return render(request, "campusevents/ticket_view.html", {
+        "ticket": ticket,
+        "event": ticket.event,
+        # signed links may be opened logged-out, so inline the image
+        "qr_src": qr_data_uri(ticket.qr_code_data) if ticket.qr_code_data else None,
+    })
 
 @staff_member_required
 def preview_claim_email(request, pk: int):
@@ -14,7 +14,7 @@ from rest_framework.views import APIView
 
 from ..models import Event, Organization, Ticket
 from ..api.serializers import EventSerializer, EventCreateSerializer
-from .utils import build_event_discovery_qs, EventPagination
+from .utils import build_event_discovery_qs, event_serializer_context, EventPagination, get_paginator
 
 
 def home(request):
@@ -101,11 +101,16 @@ def event_confirmation(request, pk):
 
 class EventListView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = EventPagination
 
     def get(self, request):
-        events = Event.objects.all()
-        serializer = EventSerializer(events, many=True)
-        return Response(serializer.data)
+        # org/created_by feed org_name and created_by_name; remaining_capacity
+        # reads the event's own counters, so a page is a fixed number of queries
+        events = Event.objects.select_related("org", "created_by").order_by("start_at", "id")
+        paginator = get_paginator(request, self.pagination_class)
+        page = paginator.paginate_queryset(events, request)
+        serializer = EventSerializer(page, many=True, context=event_serializer_context(request))
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         # Only organizers and admins can create events
@@ -128,9 +133,9 @@ class EventDiscoveryView(APIView):
 
     def get(self, request):
         events = build_event_discovery_qs(request)
-        paginator = self.pagination_class()
+        paginator = get_paginator(request, self.pagination_class)
         page = paginator.paginate_queryset(events, request)
-        serializer = EventSerializer(page, many=True)
+        serializer = EventSerializer(page, many=True, context=event_serializer_context(request))
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -147,7 +152,7 @@ class EventDetailView(APIView):
         event = self.get_object(pk)
         if event is None:
             return Response({"error": "Event not found"}, status=status.HTTP_404_NOT_FOUND)
-        return Response(EventSerializer(event).data)
+        return Response(EventSerializer(event, context=event_serializer_context(request)).data)
 
     def put(self, request, pk):
         event = self.get_object(pk)
@@ -183,7 +188,7 @@ class OrganizerEventManagementView(APIView):
             return Response({"error": "Only organizers and administrators can manage events"},
                             status=status.HTTP_403_FORBIDDEN)
         events = Event.objects.filter(created_by=request.user).order_by("-created_at")
-        return Response(EventSerializer(events, many=True).data)
+        return Response(EventSerializer(events, many=True, context=event_serializer_context(request)).data)
 
     def post(self, request):
         if request.user.role not in ["organizer", "admin"]:
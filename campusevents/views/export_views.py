@@ -1,12 +1,11 @@
 # campusevents/views/export_views.py
 """
-CSV export views for event attendees.
+Export views for event attendees: streamed CSV downloads and background
+export jobs (CSV, JSON Lines, XLSX, Parquet).
 """
 
-import csv
-
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.http import require_GET
 
@@ -15,7 +14,10 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..models import Event
+from ..api.serializers import ExportJobCreateSerializer, ExportJobSerializer
+from ..exports import attendee_csv_response
+from ..models import Event, ExportJob
+from ..tasks import run_export_job
 
 
 @login_required(login_url='login')
@@ -31,37 +33,7 @@ def event_attendees_csv(request, primary_key):
     if not (getattr(request.user, "is_admin", lambda: False)() or event.created_by_id == request.user.id):
         return HttpResponse("Forbidden", status=403)
 
-    status_param = request.GET.get("status")
-    tickets_qs = event.tickets.select_related("user").order_by("issued_at")
-    if status_param:
-        tickets_qs = tickets_qs.filter(status=status_param)
-
-    filename = f"attendees_event_{event.id}.csv"
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-
-    writer = csv.writer(response)
-    writer.writerow([
-        "ticket_id","ticket_status","user_email","first_name","last_name",
-        "student_id","phone_number","seat_number","issued_at","used_at"
-    ])
-
-    for t in tickets_qs:
-        u = t.user
-        writer.writerow([
-            t.ticket_id,
-            t.status,
-            u.email or "",
-            u.first_name or "",
-            u.last_name or "",
-            getattr(u, "student_id", "") or "",
-            getattr(u, "phone_number", "") or "",
-            t.seat_number or "",
-            t.issued_at.isoformat() if t.issued_at else "",
-            t.used_at.isoformat() if t.used_at else "",
-        ])
-
-    return response
+    return attendee_csv_response(event, request.GET.get("status"))
 
 
 class EventAttendeesCSVListView(APIView):
@@ -77,32 +49,78 @@ class EventAttendeesCSVListView(APIView):
         if not (request.user.is_admin() or event.created_by == request.user):
             return Response({"error": "You do not have permission to download attendees for this event"}, status=status.HTTP_403_FORBIDDEN)
 
-        status_param = request.query_params.get("status")
-        tickets_qs = event.tickets.select_related("user").order_by("issued_at")
-        if status_param:
-            tickets_qs = tickets_qs.filter(status=status_param)
-
-        filename = f"attendees_event_{event.id}.csv"
-        response = HttpResponse(content_type="text/csv; charset=utf-8")
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        writer.writerow(["ticket_id","ticket_status","user_email","first_name","last_name","student_id","phone_number","seat_number","issued_at","used_at"])
-
-        for t in tickets_qs:
-            u = t.user
-            writer.writerow([
-                t.ticket_id,
-                t.status,
-                u.email or "",
-                u.first_name or "",
-                u.last_name or "",
-                getattr(u, "student_id", "") or "",
-                getattr(u, "phone_number", "") or "",
-                t.seat_number or "",
-                t.issued_at.isoformat() if t.issued_at else "",
-                t.used_at.isoformat() if t.used_at else "",
-            ])
-
-        return response
+        return attendee_csv_response(event, request.query_params.get("status"))
+
+
+
+def _get_export_job(request, pk):
+    """The job, if the requester started it or is an admin; 404 otherwise."""
+    job = get_object_or_404(ExportJob, pk=pk)
+    if not (request.user.is_admin() or job.created_by_id == request.user.id):
+        raise Http404
+    return job
+
+
+class ExportJobListCreateView(APIView):
+    """
+    GET: the requester's export jobs, newest first.
+    POST: start a background export of one or more events' attendees.
+    Same rule as the CSV download: admins, or the creator of every event.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        jobs = ExportJob.objects.filter(created_by=request.user).prefetch_related("events")[:50]
+        return Response(ExportJobSerializer(jobs, many=True, context={"request": request}).data)
+
+    def post(self, request):
+        serializer = ExportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        events = serializer.validated_data["events"]
+
+        if not request.user.is_admin():
+            forbidden = sorted(e.pk for e in events if e.created_by_id != request.user.id)
+            if forbidden:
+                return Response(
+                    {"error": "You do not have permission to export attendees for these events", "events": forbidden},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        job = ExportJob.objects.create(
+            created_by=request.user,
+            format=serializer.validated_data["format"],
+            ticket_status=serializer.validated_data.get("ticket_status", ""),
+        )
+        job.events.set(events)
+        run_export_job.delay(job.pk)
+
+        job.refresh_from_db()
+        return Response(
+            ExportJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ExportJobDetailView(APIView):
+    """Status and progress of one export job."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = _get_export_job(request, pk)
+        return Response(ExportJobSerializer(job, context={"request": request}).data)
+
+
+class ExportJobDownloadView(APIView):
+    """The finished export file, as an attachment."""
+    permission_classes = [IsAuthenticated]
 
+    def get(self, request, pk):
+        job = _get_export_job(request, pk)
+        if job.status != ExportJob.DONE or not job.file:
+            return Response({"error": "Export is not ready", "status": job.status}, status=status.HTTP_409_CONFLICT)
+        try:
+            handle = job.file.open("rb")
+        except FileNotFoundError:
+            return Response({"error": "Export file is no longer available"}, status=status.HTTP_410_GONE)
+        extension = job.file.name.rsplit(".", 1)[-1]
+        return FileResponse(handle, as_attachment=True, filename=f"attendees_export_{job.pk}.{extension}")
@@ -3,8 +3,6 @@
 Organizer-specific views for event management and ticket scanning.
 """
 
-import json
-
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
@@ -12,6 +10,7 @@ from django.utils import timezone
 from django.views.decorators.http import require_POST
 
 from ..models import Event, Ticket
+from ..qr import parse_qr_payload
 from .utils import decode_qr_from_uploaded
 
 
@@ -28,19 +27,17 @@ def organizer_my_events(request):
         Event.objects
         .filter(created_by=request.user)
         .order_by('-start_at')
-        .prefetch_related('tickets')
     )
 
-    event_cards = []
-    for e in events:
-        issued = e.tickets.filter(status=Ticket.ISSUED).count()
-        used = e.tickets.filter(status=Ticket.USED).count()
-        event_cards.append({
+    event_cards = [
+        {
             "obj": e,
-            "issued": issued,
-            "used": used,
+            "issued": e.issued_count,
+            "used": e.used_count,
             "remaining": e.remaining_capacity,
-        })
+        }
+        for e in events
+    ]
 
     return render(request, "organizer_my_events.html", {
         "event_cards": event_cards,
@@ -72,16 +69,10 @@ def scan_ticket_image(request, pk):
         messages.error(request, "No QR code detected in the image.")
         return redirect('organizer_my_events')
 
-    # The QR we generate is JSON with ticket_id, event_id, etc.
-    try:
-        data = json.loads(payload)
-    except Exception:
-        # Some phones might encode the plain ticket_id; try that too
-        data = {"ticket_id": payload}
-
-    ticket_id = data.get("ticket_id")
+    # Compact CE1 payloads, legacy JSON and bare ticket ids are all accepted.
+    ticket_id = parse_qr_payload(payload)
     if not ticket_id:
-        messages.error(request, "QR code doesn't include a ticket_id.")
+        messages.error(request, "QR code doesn't include a valid ticket_id.")
         return redirect('organizer_my_events')
 
     try:
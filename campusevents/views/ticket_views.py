@@ -3,19 +3,37 @@
 Ticket management and validation views.
 """
 
+import os
+import time
+import zipfile
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
-from django.views.decorators.http import require_POST
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET, require_POST
 from rest_framework import status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from campusevents.tasks import send_ticket_confirmation_email
 
 from ..models import Event, Ticket
-from ..api.serializers import TicketSerializer, TicketIssueSerializer, TicketValidationSerializer
+from ..qr import QR_FORMATS, parse_qr_payload, qr_etag, render_qr
+from ..manifest import build_ticket_manifest, event_manifest_key
+from ..ticketing import (
+    CheckInResult, ClaimResult, check_in_tickets, claim_ticket_for, mark_ticket_used, sync_offline_check_ins,
+)
+from ..api.serializers import (
+    TicketSerializer, TicketIssueSerializer, TicketValidationSerializer, OfflineCheckInSyncSerializer,
+)
+from .utils import EventPagination, decode_qr_image, get_paginator, iter_uploaded_images
 
 
 class TicketIssueView(APIView):
@@ -26,18 +44,21 @@ class TicketIssueView(APIView):
         if serializer.is_valid():
             event_id = serializer.validated_data["event_id"]
             event = Event.objects.get(id=event_id)
-            existing_ticket = Ticket.objects.filter(event=event, user=request.user).first()
-            if existing_ticket:
-                return Response({"error": "You already have a ticket for this event"}, status=status.HTTP_400_BAD_REQUEST)
-            ticket = Ticket.objects.create(
-                event=event,
-                user=request.user,
+            result = claim_ticket_for(
+                event,
+                request.user,
                 seat_number=serializer.validated_data.get("seat_number", ""),
                 notes=serializer.validated_data.get("notes", ""),
                 expires_at=serializer.validated_data.get("expires_at"),
             )
-            send_ticket_confirmation_email.delay(ticket.id)
-            return Response(TicketSerializer(ticket).data, status=status.HTTP_201_CREATED)
+            if result.status == ClaimResult.DUPLICATE:
+                return Response({"error": "You already have a ticket for this event"}, status=status.HTTP_400_BAD_REQUEST)
+            if result.status == ClaimResult.FULL:
+                return Response({"error": "Event is at full capacity."}, status=status.HTTP_400_BAD_REQUEST)
+            if result.status == ClaimResult.ENDED:
+                return Response({"error": "This event has already ended."}, status=status.HTTP_400_BAD_REQUEST)
+            send_ticket_confirmation_email.delay(result.ticket.id)
+            return Response(TicketSerializer(result.ticket).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -65,12 +86,239 @@ class TicketValidationView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ScannerCheckInView(APIView):
+    """
+    Check-in endpoint for door scanners that decode QR codes themselves.
+
+    Takes the raw scanned string as ``payload`` (and optionally ``event_id``
+    to reject tickets for other events). The ticket is loaded with one
+    select_related query and flipped to used with a conditional UPDATE, so
+    scanning the same code twice is harmless. The response is deliberately
+    small.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        started = time.perf_counter()
+        ticket_id = parse_qr_payload(request.data.get("payload"))
+        if not ticket_id:
+            return self._respond(started, {"result": "unrecognized"}, status.HTTP_400_BAD_REQUEST)
+
+        ticket = (
+            Ticket.objects
+            .select_related("event", "user")
+            .only(
+                "ticket_id", "status", "expires_at", "used_at", "event_id", "user_id",
+                "event__status", "event__created_by_id",
+                "user__email", "user__first_name", "user__last_name",
+            )
+            .filter(ticket_id=ticket_id)
+            .first()
+        )
+        if ticket is None:
+            return self._respond(started, {"result": CheckInResult.NOT_FOUND}, status.HTTP_404_NOT_FOUND)
+
+        if not _can_check_in(request.user, ticket.event):
+            return self._respond(started, {"error": "You do not have permission to validate this ticket"}, status.HTTP_403_FORBIDDEN)
+
+        body = {
+            "ticket_id": ticket.ticket_id,
+            "event_id": ticket.event_id,
+            "holder": ticket.user.get_full_name() or ticket.user.email,
+        }
+        expected_event = request.data.get("event_id")
+        if expected_event not in (None, "") and str(expected_event) != str(ticket.event_id):
+            return self._respond(started, {"result": CheckInResult.WRONG_EVENT, **body}, status.HTTP_409_CONFLICT)
+
+        if ticket.status == Ticket.USED:
+            result, code = CheckInResult.ALREADY_USED, status.HTTP_200_OK
+        elif not ticket.is_valid():
+            result, code = CheckInResult.INVALID, status.HTTP_400_BAD_REQUEST
+        elif mark_ticket_used(ticket):
+            result, code = CheckInResult.CHECKED_IN, status.HTTP_200_OK
+        else:
+            # a parallel scan of the same code got there first
+            result, code = CheckInResult.ALREADY_USED, status.HTTP_200_OK
+        return self._respond(started, {"result": result, **body}, code)
+
+    @staticmethod
+    def _respond(started, data, code):
+        response = Response(data, status=code)
+        response["Server-Timing"] = f"app;dur={(time.perf_counter() - started) * 1000:.2f}"
+        return response
+
+
+# Threads are enough here: OpenCV releases the GIL while decoding.
+QR_DECODE_WORKERS = getattr(settings, "QR_DECODE_WORKERS", min(8, os.cpu_count() or 1))
+
+
+def _decode_image(name, data, error):
+    if error:
+        return name, [], {}, error
+    try:
+        result = decode_qr_image(data, multi=True)
+    except Exception as ex:
+        return name, [], {}, f"Could not read the image: {ex}"
+    return name, result.payloads, result.timings, None
+
+
+def _decode_images(images):
+    """
+    Decode ``images`` in the thread pool, in order, with at most two images
+    per worker in flight: uploads are read as decoding progresses instead of
+    all up front.
+    """
+    window = QR_DECODE_WORKERS * 2
+    decoded, pending = [], deque()
+    with ThreadPoolExecutor(max_workers=QR_DECODE_WORKERS) as pool:
+        for image in images:
+            pending.append(pool.submit(_decode_image, *image))
+            if len(pending) >= window:
+                decoded.append(pending.popleft().result())
+        decoded.extend(future.result() for future in pending)
+    return decoded
+
+
+class BulkCheckInView(APIView):
+    """
+    Check in every ticket found in a batch of photos.
+
+    Accepts ``images`` as one or more image files and/or zip archives. Images
+    are decoded in a thread pool (several codes per photo are fine), then all
+    tickets are validated and marked used in one bulk query and update.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, pk):
+        event = get_object_or_404(Event, pk=pk)
+        if not _can_check_in(request.user, event):
+            return Response({"error": "You do not have permission to validate tickets for this event"}, status=status.HTTP_403_FORBIDDEN)
+
+        files = request.FILES.getlist("images")
+        if not files:
+            return Response({"error": "Upload one or more images (or a zip of images) as 'images'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # archives are opened here, so a damaged one is a 400 before any decoding
+        try:
+            images = iter_uploaded_images(files)
+        except zipfile.BadZipFile as ex:
+            return Response({"error": f"Could not read the zip archive {ex}"}, status=status.HTTP_400_BAD_REQUEST)
+        decoded = _decode_images(images)
+
+        scans = [
+            (name, [(payload, parse_qr_payload(payload)) for payload in payloads], timings, error)
+            for name, payloads, timings, error in decoded
+        ]
+        outcomes = check_in_tickets(
+            event, {ticket_id for _, codes, _, _ in scans for _, ticket_id in codes if ticket_id}
+        )
+
+        seen = set()
+        summary = Counter()
+        report = []
+        for name, codes, timings, error in scans:
+            entry = {"image": name, "codes": [], "timings_ms": timings}
+            for _, ticket_id in codes:
+                if not ticket_id:
+                    result = "unrecognized"
+                elif ticket_id in seen:
+                    result = "duplicate"  # same code in an earlier photo of this batch
+                else:
+                    result = outcomes[ticket_id]
+                    seen.add(ticket_id)
+                summary[result] += 1
+                entry["codes"].append({"ticket_id": ticket_id, "result": result})
+            if error or not codes:
+                entry["error"] = error or "No QR code detected"
+            report.append(entry)
+
+        return Response({"event_id": event.id, "images": report, "summary": dict(summary)}, status=status.HTTP_200_OK)
+
+
+def _can_check_in(user, event):
+    return user.role in ["organizer", "admin"] or event.created_by_id == user.id
+
+
+class CheckInManifestView(APIView):
+    """Signed manifest of an event's valid and used ticket ids for offline door devices."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        event = get_object_or_404(Event, pk=pk)
+        if not _can_check_in(request.user, event):
+            return Response({"error": "You do not have permission to validate tickets for this event"}, status=status.HTTP_403_FORBIDDEN)
+        response = Response(build_ticket_manifest(event), status=status.HTTP_200_OK)
+        response["Cache-Control"] = "private, no-store"
+        return response
+
+
+class CheckInManifestKeyView(APIView):
+    """The event's manifest signing key, for door devices to verify manifests offline."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        event = get_object_or_404(Event, pk=pk)
+        if not _can_check_in(request.user, event):
+            return Response({"error": "You do not have permission to validate tickets for this event"}, status=status.HTTP_403_FORBIDDEN)
+        response = Response(
+            {"event_id": event.pk, "algorithm": "HMAC-SHA256", "key": event_manifest_key(event.pk)},
+            status=status.HTTP_200_OK,
+        )
+        response["Cache-Control"] = "private, no-store"
+        return response
+
+
+class CheckInSyncView(APIView):
+    """Apply check-ins recorded offline, in one transaction, reporting conflicts."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        event = get_object_or_404(Event, pk=pk)
+        if not _can_check_in(request.user, event):
+            return Response({"error": "You do not have permission to validate tickets for this event"}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = OfflineCheckInSyncSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        check_ins, unrecognized = [], []
+        for item in serializer.validated_data["check_ins"]:
+            # Devices match scans against the id-based manifest and log ticket
+            # ids, so plain ids are accepted here: this is a record upload by
+            # an account allowed to check in, not a code shown at the door.
+            ticket_id = parse_qr_payload(item["ticket_id"], allow_unsigned=True)
+            if ticket_id:
+                check_ins.append((ticket_id, item.get("used_at")))
+            else:
+                unrecognized.append({"ticket_id": item["ticket_id"], "result": "unrecognized"})
+
+        results = sync_offline_check_ins(event, check_ins) + unrecognized
+        applied = sum(1 for r in results if r["result"] == CheckInResult.CHECKED_IN)
+        return Response({
+            "event_id": event.id,
+            "applied": applied,
+            "conflicts": len(results) - applied,
+            "results": results,
+        }, status=status.HTTP_200_OK)
+
+
 class MyTicketsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    pagination_class = EventPagination
+
     def get(self, request):
-        tickets = Ticket.objects.filter(user=request.user).order_by("-issued_at")
-        return Response(TicketSerializer(tickets, many=True).data)
+        # event feeds event_title and is_valid(), user feeds user_name
+        tickets = (
+            Ticket.objects
+            .filter(user=request.user)
+            .select_related("event", "user")
+            .order_by("-issued_at", "id")
+        )
+        paginator = get_paginator(request, self.pagination_class)
+        page = paginator.paginate_queryset(tickets, request)
+        return paginator.get_paginated_response(TicketSerializer(page, many=True).data)
 
 
 class TicketDetailView(APIView):
@@ -107,27 +355,19 @@ class TicketDetailView(APIView):
 @require_POST
 def claim_ticket(request, pk):
     event = get_object_or_404(Event, pk=pk, status=Event.APPROVED)
+    back = request.META.get("HTTP_REFERER", "event_list_page")
 
-    # Already has a ticket?
-    if Ticket.objects.filter(event=event, user=request.user, status=Ticket.ISSUED).exists():
+    result = claim_ticket_for(event, request.user)
+    if result.status == ClaimResult.DUPLICATE:
         messages.info(request, "You already claimed a ticket for this event.")
-        return redirect(request.META.get("HTTP_REFERER", "event_list_page"))
-
-    # Capacity check
-    if event.capacity and event.remaining_capacity <= 0:
+    elif result.status == ClaimResult.FULL:
         messages.error(request, "This event is full.")
-        return redirect(request.META.get("HTTP_REFERER", "event_list_page"))
-
-    # (Optional) block after event ends
-    if event.end_at and event.end_at <= timezone.now():
+    elif result.status == ClaimResult.ENDED:
         messages.error(request, "This event has already ended.")
-        return redirect(request.META.get("HTTP_REFERER", "event_list_page"))
-
-    # Create ticket and queue email
-    ticket = Ticket.objects.create(event=event, user=request.user)
-    send_ticket_confirmation_email.delay(ticket.id)
-    messages.success(request, "Ticket claimed successfully!")
-    return redirect(request.META.get("HTTP_REFERER", "event_list_page"))
+    else:
+        send_ticket_confirmation_email.delay(result.ticket.id)
+        messages.success(request, "Ticket claimed successfully!")
+    return redirect(back)
 
 
 @login_required(login_url='login')
@@ -141,3 +381,30 @@ def my_events(request):
     }
     return render(request, "my_events.html", context)
 
+
+# The image only depends on qr_code_data and its URL carries a content hash,
+# so browsers may keep it for a year without revalidating.
+QR_IMAGE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+@login_required(login_url='login')
+@require_GET
+def ticket_qr_image(request, ticket_id, fmt="png"):
+    """Render a ticket's QR code (PNG or SVG) on demand from its qr_code_data."""
+    row = Ticket.objects.filter(ticket_id=ticket_id).values_list("user_id", "qr_code_data").first()
+    if row is None:
+        raise Http404("Ticket not found")
+    owner_id, data = row
+    if not (owner_id == request.user.id or request.user.role in ["admin", "organizer"]):
+        return HttpResponseForbidden("You do not have permission to view this ticket")
+    if not data:
+        raise Http404("Ticket has no QR payload")
+
+    etag = qr_etag(data, fmt)
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(render_qr(data, fmt), content_type=QR_FORMATS[fmt])
+    response["ETag"] = etag
+    response["Cache-Control"] = QR_IMAGE_CACHE_CONTROL
+    return response
@@ -3,25 +3,198 @@
 Shared utilities and helper functions for views.
 """
 
+import io
+import logging
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Optional
 
 import numpy as np
 import cv2
+from PIL import Image
 
+from django.conf import settings
+from django.core import signing
 from django.db.models import Q
 from django.utils import timezone
 
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
+from ..calendar_utils import CalendarLinks
 from ..models import Event
+from ..search import search_events
+
+logger = logging.getLogger(__name__)
 
 
 class EventPagination(PageNumberPagination):
-    """Custom pagination for events."""
+    """
+    Custom pagination for events. ``?count=false`` skips the COUNT(*): the
+    response then has ``"count": null`` and ``next`` comes from reading one
+    row past the page. ``page_number`` is the 1-based page in both modes.
+    """
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
 
+    def paginate_queryset(self, queryset, request, view=None):
+        self.skip_count = request.query_params.get("count", "").lower() in ("0", "false", "no")
+        if not self.skip_count:
+            rows = super().paginate_queryset(queryset, request, view)
+            self.page_number = self.page.number
+            return rows
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = max(int(request.query_params.get(self.page_query_param, 1)), 1)
+        except ValueError:
+            self.page_number = 1
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_more = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.skip_count:
+            return super().get_paginated_response(data)
+        url = self.request.build_absolute_uri()
+        return Response({
+            "count": None,
+            "next": replace_query_param(url, self.page_query_param, self.page_number + 1) if self.has_more else None,
+            "previous": (
+                (replace_query_param(url, self.page_query_param, self.page_number - 1)
+                 if self.page_number > 2 else remove_query_param(url, self.page_query_param))
+                if self.page_number > 1 else None
+            ),
+            "results": data,
+        })
+
+
+class KeysetPagination:
+    """
+    Cursor (keyset) pagination over the queryset's own ordering, with ``id``
+    appended as a tie-breaker: each page is ``WHERE (sort keys) > (last row)``
+    instead of ``OFFSET n``, so deep pages cost the same as the first, and no
+    COUNT(*) runs. Cursors are signed and opaque. Sort keys must be
+    non-null model fields or annotations.
+    """
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    salt = "campusevents.keyset"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    @staticmethod
+    def _ordering(queryset):
+        ordering = [str(field) for field in queryset.query.order_by]
+        if any(not field.lstrip("-").isidentifier() for field in ordering):
+            raise ValueError(f"keyset pagination needs plain field names, got {ordering}")
+        ordering = ["id" if field == "pk" else "-id" if field == "-pk" else field for field in ordering]
+        if not {"id", "-id"} & set(ordering):
+            ordering.append("id")
+        return ordering
+
+    @staticmethod
+    def _encode(value):
+        return {"dt": value.isoformat()} if isinstance(value, datetime) else value
+
+    @staticmethod
+    def _decode(value):
+        return datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+
+    def _keyset_filter(self, ordering, values, reverse):
+        """Rows after ``values`` in ``ordering`` (before them if ``reverse``)."""
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            term = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+            for prev, value in zip(ordering[:i], values[:i]):
+                term &= Q(**{prev.lstrip("-"): value})
+            condition |= term
+        return condition
+
+    def _make_cursor(self, ordering, obj, reverse):
+        values = [getattr(obj, field.lstrip("-")) for field in ordering]
+        payload = {"o": ordering, "v": [self._encode(v) for v in values], "r": reverse}
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            signing.dumps(payload, salt=self.salt, compress=True),
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        ordering = self._ordering(queryset)
+
+        reverse, values = False, None
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            try:
+                cursor = signing.loads(token, salt=self.salt)
+                if cursor["o"] != ordering:
+                    raise ValueError("cursor is for another ordering")
+                reverse = bool(cursor["r"])
+                values = [self._decode(v) for v in cursor["v"]]
+            except (signing.BadSignature, KeyError, TypeError, ValueError):
+                raise NotFound("Invalid cursor.")
+
+        if reverse:
+            flipped = [field[1:] if field.startswith("-") else f"-{field}" for field in ordering]
+            queryset = queryset.order_by(*flipped)
+        else:
+            queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, values, reverse))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        self.next = self._make_cursor(ordering, rows[-1], False) if rows and has_next else None
+        self.previous = self._make_cursor(ordering, rows[0], True) if rows and has_previous else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next, "previous": self.previous, "results": data})
+
+
+def get_paginator(request, default=EventPagination):
+    """KeysetPagination when the client opts in (``?pagination=cursor`` or a ``cursor``), else ``default``."""
+    params = getattr(request, "query_params", request.GET)
+    if params.get("pagination") == "cursor" or KeysetPagination.cursor_query_param in params:
+        return KeysetPagination()
+    return default()
+
+
+def event_serializer_context(request):
+    """EventSerializer context; ``?calendar_links=true`` adds ``gcal_url``/``ics_url`` per event."""
+    context = {"request": request}
+    params = getattr(request, "query_params", request.GET)
+    if params.get("calendar_links", "").lower() in ("1", "true", "yes"):
+        context["calendar_links"] = CalendarLinks(request)
+    return context
+
 
 def build_event_discovery_qs(request):
     """Build filtered queryset for event discovery."""
@@ -54,25 +227,216 @@ def build_event_discovery_qs(request):
     if date_to and (dtv := parse_date(date_to)):
         qs = qs.filter(start_at__lte=dtv)
     if search:
-        qs = qs.filter(
-            Q(title__icontains=search)
-            | Q(description__icontains=search)
-            | Q(location__icontains=search)
-        )
+        # full-text index (see campusevents.search); best matches first
+        qs, ranked = search_events(qs, search)
+        if ranked:
+            qs = qs.order_by("search_rank", "start_at")
     return qs
 
 
+# Long side, in pixels, of the image the detector works on. A ticket QR is
+# still many pixels per module at this size, even in a 12MP phone photo.
+QR_DECODE_MAX_SIDE = getattr(settings, "QR_DECODE_MAX_SIDE", 1280)
+
+# (factor, imdecode flag) - libjpeg scales during decode, so a reduced read
+# never allocates the full-resolution colour image.
+_REDUCED_GRAYSCALE_READS = (
+    (8, "IMREAD_REDUCED_GRAYSCALE_8"),
+    (4, "IMREAD_REDUCED_GRAYSCALE_4"),
+    (2, "IMREAD_REDUCED_GRAYSCALE_2"),
+)
+
+
+@dataclass
+class QRDecodeResult:
+    """Payloads found in one image, the stage that found them, and timings (ms)."""
+
+    payloads: list = field(default_factory=list)
+    stage: Optional[str] = None
+    timings: dict = field(default_factory=dict)
+
+
+def _image_size(data):
+    """(width, height) from the image header, without decoding pixels."""
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            return im.size
+    except Exception:
+        return None
+
+
+def _reduced_read_flag(size, max_side):
+    """Smallest reduced-grayscale read that brings the long side under max_side."""
+    if not size or max(size) <= max_side:
+        return cv2.IMREAD_GRAYSCALE
+    for factor, name in reversed(_REDUCED_GRAYSCALE_READS):
+        if max(size) / factor <= max_side:
+            return getattr(cv2, name)
+    return getattr(cv2, _REDUCED_GRAYSCALE_READS[0][1])  # then _cap() finishes the job
+
+
+def _cap(img, max_side):
+    height, width = img.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return img
+    return cv2.resize(img, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+
+def _detect(detector, img, multi):
+    if multi:
+        ok, texts, _, _ = detector.detectAndDecodeMulti(img)
+        payloads = [t.strip() for t in (texts if ok else ()) if t and t.strip()]
+        if payloads:
+            return payloads
+    # the single-code detector copes better with one large, skewed code
+    text, _, _ = detector.detectAndDecode(img)
+    return [text.strip()] if text and text.strip() else []
+
+
+def decode_qr_image(data, multi=False, max_side=None):
+    """
+    Decode QR codes from encoded image bytes with a staged pipeline:
+
+    1. ``reduced``: grayscale read, downscaled by libjpeg and capped at
+       ``max_side``;
+    2. ``full``: only if that fails, a grayscale read at up to twice the cap
+       (skipped when step 1 already saw the whole image);
+    3. ``threshold``: only if that fails too, adaptive thresholding of the
+       step 2 image (glare, low contrast).
+
+    Returns a QRDecodeResult; raises ValueError if OpenCV can't read the
+    bytes. ``multi`` also returns every code when a photo holds several.
+    """
+    max_side = max_side or QR_DECODE_MAX_SIDE
+    result = QRDecodeResult()
+    detector = cv2.QRCodeDetector()
+    arr = np.frombuffer(data, dtype=np.uint8)
+    clock = time.perf_counter
+
+    def stage(name, start):
+        result.timings[name] = round((clock() - start) * 1000, 2)
+
+    started = clock()
+    size = _image_size(data)
+    first_read = _reduced_read_flag(size, max_side)
+    img = cv2.imdecode(arr, first_read)
+    if img is None:
+        raise ValueError("not a readable image")
+    img = _cap(img, max_side)
+    result.payloads = _detect(detector, img, multi)
+    stage("reduced", started)
+    if result.payloads:
+        result.stage = "reduced"
+        return result
+
+    larger = img
+    second_read = _reduced_read_flag(size, max_side * 2)
+    if second_read != first_read or (size and max(size) > max_side):
+        started = clock()
+        larger = _cap(cv2.imdecode(arr, second_read), max_side * 2)
+        result.payloads = _detect(detector, larger, multi)
+        stage("full", started)
+        if result.payloads:
+            result.stage = "full"
+            return result
+
+    started = clock()
+    binary = cv2.adaptiveThreshold(
+        larger, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10,
+    )
+    result.payloads = _detect(detector, binary, multi)
+    stage("threshold", started)
+    if result.payloads:
+        result.stage = "threshold"
+    return result
+
+
 def decode_qr_from_uploaded(django_file):
     """
     Try to decode a QR code from an uploaded image.
     Returns the decoded string (payload) or None.
     """
-    data = django_file.read()
-    arr = np.frombuffer(data, dtype=np.uint8)
-    img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-    if img is None:
+    try:
+        result = decode_qr_image(django_file.read())
+    except ValueError:
         return None
-    detector = cv2.QRCodeDetector()
-    text, points, _ = detector.detectAndDecode(img)
-    return text.strip() if text else None
+    logger.debug("QR decode %s in %s", result.stage or "failed", result.timings)
+    return result.payloads[0] if result.payloads else None
+
+
+# Upper bounds for one bulk check-in request (zip members included).
+BULK_SCAN_MAX_IMAGES = 200
+BULK_SCAN_MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+
+# Damaged members: bad CRC or headers, truncated or unsupported compression,
+# password needed.
+_ZIP_MEMBER_ERRORS = (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError)
+
+
+def iter_uploaded_images(files):
+    """
+    Return an iterator of ``(name, bytes or None, error or None)`` over a
+    list of uploaded files, expanding zip archives into their members.
+
+    Archives are opened (central directory read) here, before anything is
+    decoded, so a damaged archive raises ``zipfile.BadZipFile`` right away.
+    Members are then read one at a time as the iterator advances, so only
+    what the caller holds is in memory. Stops after BULK_SCAN_MAX_IMAGES
+    images; images over BULK_SCAN_MAX_IMAGE_BYTES, and members that fail to
+    extract, come with ``None`` and an error message.
+    """
+    opened = []
+    try:
+        for upload in files:
+            archive = None
+            if zipfile.is_zipfile(upload):
+                upload.seek(0)
+                try:
+                    archive = zipfile.ZipFile(upload)
+                except _ZIP_MEMBER_ERRORS as ex:
+                    raise zipfile.BadZipFile(f"{upload.name}: {ex}") from ex
+            opened.append((upload, archive))
+    except zipfile.BadZipFile:
+        for _, archive in opened:
+            if archive is not None:
+                archive.close()
+        raise
+    return _iter_opened_uploads(opened)
+
 
+def _iter_opened_uploads(opened):
+    count = 0
+    try:
+        for upload, archive in opened:
+            if archive is None:
+                if count >= BULK_SCAN_MAX_IMAGES:
+                    return
+                count += 1
+                upload.seek(0)
+                if upload.size and upload.size > BULK_SCAN_MAX_IMAGE_BYTES:
+                    yield upload.name, None, "Image is too large"
+                else:
+                    yield upload.name, upload.read(), None
+                continue
+            for info in archive.infolist():
+                if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                    continue
+                if count >= BULK_SCAN_MAX_IMAGES:
+                    return
+                count += 1
+                name = f"{upload.name}/{info.filename}"
+                if info.file_size > BULK_SCAN_MAX_IMAGE_BYTES:
+                    yield name, None, "Image is too large"
+                    continue
+                try:
+                    data = archive.read(info)
+                except _ZIP_MEMBER_ERRORS as ex:
+                    yield name, None, f"Could not extract the image: {ex}"
+                    continue
+                yield name, data, None
+    finally:
+        for _, archive in opened:
+            if archive is not None:
+                archive.close()
@@ -1,5 +1,6 @@
 # tests/conftest.py
 # Keep lightweight stubs for libs the runner doesn't have, and make tests safe.
+import functools
 import os
 import sys
 import types
@@ -26,13 +27,47 @@ class _FakeQRCodeDetector:
     def detectAndDecode(self, img):
         return ("", None, None)  # "no QR" by default
 
+    def detectAndDecodeMulti(self, img):
+        return (False, (), None, None)
+
 fake_cv2 = types.SimpleNamespace(
     IMREAD_COLOR=1,
+    IMREAD_GRAYSCALE=0,
+    IMREAD_REDUCED_GRAYSCALE_2=16,
+    IMREAD_REDUCED_GRAYSCALE_4=32,
+    IMREAD_REDUCED_GRAYSCALE_8=64,
+    INTER_AREA=3,
+    ADAPTIVE_THRESH_GAUSSIAN_C=1,
+    THRESH_BINARY=0,
     imdecode=_cv2_imdecode,
+    resize=lambda img, size, interpolation=None: img,
+    adaptiveThreshold=lambda img, *a, **k: img,
     QRCodeDetector=_FakeQRCodeDetector,
 )
 sys.modules.setdefault("cv2", fake_cv2)
 
+
+@functools.lru_cache(maxsize=None)
+def real_opencv():
+    """
+    The real ``(cv2, numpy)`` modules behind the stubs above, for the few
+    tests that decode actual images; None when they aren't installed. The
+    stubs stay in sys.modules for everything else.
+    """
+    stubs = {
+        name: sys.modules.pop(name)
+        for name, stub in (("numpy", fake_numpy), ("cv2", fake_cv2))
+        if sys.modules.get(name) is stub
+    }
+    try:
+        import numpy
+        import cv2
+    except ImportError:
+        return None
+    finally:
+        sys.modules.update(stubs)
+    return cv2, numpy
+
 # ----- Stub python-dotenv so campus.settings can import it in CI -----
 if "dotenv" not in sys.modules:
     dotenv = types.ModuleType("dotenv")
@@ -77,8 +112,10 @@ def _settings_overrides(settings):
     settings.CELERY_TASK_ALWAYS_EAGER = True
     # capture emails in memory for assertions; do not touch real SMTP
     settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
-    # keep cache local
+    # keep cache local, and start every test with it empty
     settings.CACHES["default"]["BACKEND"] = "django.core.cache.backends.locmem.LocMemCache"
+    from django.core.cache import cache
+    cache.clear()
     # tests shouldn't rely on DEBUG screens
     settings.DEBUG = False
     # be permissive for host checks inside tests
@@ -1,6 +1,11 @@
 # tests/test_admin_dashboard_stats.py
 
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 
 from campusevents.models import User, Organization, Event, Ticket
@@ -409,3 +414,44 @@ class DashboardOverviewTests(APITestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertIn("totals", response.data)
+
+    # ========== MONTHLY AGGREGATION TESTS ==========
+
+    def test_dashboard_query_count_independent_of_window(self):
+        """Monthly series are grouped queries, not one query per month."""
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("admin_dashboard_stats")
+
+        with CaptureQueriesContext(connection) as short:
+            self.client.get(url, {"months": 3})
+        with CaptureQueriesContext(connection) as long:
+            self.client.get(url, {"months": 48})
+
+        self.assertEqual(len(short), len(long))
+        self.assertLessEqual(len(long), 7)
+
+    def test_dashboard_months_parameter(self):
+        """?months= controls the window, clamped to 1..60."""
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("admin_dashboard_stats")
+
+        self.assertEqual(len(self.client.get(url, {"months": 3}).data["events_per_month"]), 3)
+        self.assertEqual(len(self.client.get(url, {"months": 500}).data["tickets_per_month"]), 60)
+        self.assertEqual(self.client.get(url, {"months": "abc"}).status_code, 400)
+
+    def test_dashboard_monthly_buckets_match_rows(self):
+        """Current-month bucket counts this month's events and tickets."""
+        self.used_ticket.used_at = timezone.now()
+        self.used_ticket.save()
+        Event.objects.filter(pk=self.pending_event2.pk).update(
+            created_at=timezone.now() - timedelta(days=400)
+        )
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get(reverse("admin_dashboard_stats"))
+
+        this_month = response.data["tickets_per_month"][-1]
+        self.assertEqual(this_month["month"], timezone.now().astimezone(dt_timezone.utc).strftime("%Y-%m"))
+        self.assertEqual((this_month["issued"], this_month["used"]), (2, 1))
+        self.assertEqual(this_month["participation_rate"], 0.5)
+        self.assertEqual(response.data["events_per_month"][-1]["count"], 2)
@@ -0,0 +1,190 @@
+# tests/test_bulk_check_in.py
+
+import datetime as dt
+import io
+import unittest
+import zipfile
+from unittest import mock
+
+from PIL import Image
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.qr import render_qr_png
+from campusevents.ticketing import CheckInResult, check_in_tickets
+from campusevents.views import utils
+from campusevents.views.utils import QRDecodeResult
+from conftest import real_opencv
+
+
+def _fake_decode(data, multi=False):
+    """Test images are just newline-separated payloads."""
+    if data == b"garbage":
+        raise ValueError("not a readable image")
+    payloads = [line for line in data.decode().splitlines() if line]
+    return QRDecodeResult(payloads, "reduced" if payloads else None, {"reduced": 1.0})
+
+
+class BulkCheckInTests(TestCase):
+    """Many photos, many codes, one bulk validation."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.students = [
+            User.objects.create_user(email=f"s{i}@example.com", password="pw")
+            for i in range(4)
+        ]
+        org = Organization.objects.create(name="Door Org")
+        now = timezone.now()
+        common = {
+            "org": org,
+            "description": "Door",
+            "location": "Hall",
+            "start_at": now + dt.timedelta(hours=1),
+            "end_at": now + dt.timedelta(hours=3),
+            "capacity": 10,
+            "created_by": self.organizer,
+            "status": Event.APPROVED,
+        }
+        self.event = Event.objects.create(title="Main", **common)
+        self.other_event = Event.objects.create(title="Other", **common)
+        self.tickets = [Ticket.objects.create(event=self.event, user=u) for u in self.students[:3]]
+        self.foreign = Ticket.objects.create(event=self.other_event, user=self.students[3])
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+        self.url = reverse("bulk_check_in", args=[self.event.id])
+
+    def _image(self, name, *payloads):
+        return SimpleUploadedFile(name, "\n".join(payloads).encode(), content_type="image/jpeg")
+
+    def _post(self, files):
+        with mock.patch("campusevents.views.ticket_views.decode_qr_image", side_effect=_fake_decode):
+            return self.client.post(self.url, {"images": files}, format="multipart")
+
+    def _zip(self, *tickets):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as archive:
+            for i, ticket in enumerate(tickets):
+                archive.writestr(f"door/{i}.jpg", ticket.qr_code_data)
+        return buf.getvalue()
+
+    def test_service_uses_one_select_and_one_update(self):
+        ids = [t.ticket_id for t in self.tickets] + [self.foreign.ticket_id, "TKT-MISSING"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            outcomes = check_in_tickets(self.event, ids)
+
+        statements = [q["sql"].split()[0] for q in ctx.captured_queries]
+        self.assertEqual(statements.count("SELECT"), 1)
+        self.assertEqual(statements.count("UPDATE"), 2)  # tickets + event counters
+        self.assertEqual(outcomes[self.foreign.ticket_id], CheckInResult.WRONG_EVENT)
+        self.assertEqual(outcomes["TKT-MISSING"], CheckInResult.NOT_FOUND)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.issued_count, self.event.used_count), (0, 3))
+
+    def test_multi_code_photos_and_per_image_report(self):
+        t0, t1, t2 = self.tickets
+        t2.use_ticket()
+        files = [
+            self._image("a.jpg", t0.qr_code_data, t1.qr_code_data),
+            self._image("b.jpg", t2.qr_code_data, self.foreign.qr_code_data),
+            self._image("c.jpg", t0.qr_code_data),
+            self._image("d.jpg"),
+            SimpleUploadedFile("e.jpg", b"garbage", content_type="image/jpeg"),
+        ]
+
+        response = self._post(files)
+
+        self.assertEqual(response.status_code, 200)
+        images = {img["image"]: img for img in response.data["images"]}
+        self.assertEqual([c["result"] for c in images["a.jpg"]["codes"]], ["checked_in", "checked_in"])
+        self.assertEqual([c["result"] for c in images["b.jpg"]["codes"]], ["already_used", "wrong_event"])
+        self.assertEqual(images["c.jpg"]["codes"][0]["result"], "duplicate")
+        self.assertEqual(images["d.jpg"]["error"], "No QR code detected")
+        self.assertIn("Could not read", images["e.jpg"]["error"])
+        self.assertEqual(images["a.jpg"]["timings_ms"], {"reduced": 1.0})
+        self.assertEqual(response.data["summary"]["checked_in"], 2)
+        t0.refresh_from_db()
+        self.assertEqual(t0.status, Ticket.USED)
+
+    def test_zip_upload(self):
+        upload = SimpleUploadedFile("batch.zip", self._zip(*self.tickets), content_type="application/zip")
+
+        response = self._post([upload])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["images"]), 3)
+        self.assertEqual(response.data["summary"], {"checked_in": 3})
+
+    def test_damaged_zip_directory_is_rejected(self):
+        # the end record still says "zip", but the central directory is gone
+        damaged = self._zip(self.tickets[0]).replace(b"PK\x01\x02", b"XX\x01\x02")
+        upload = SimpleUploadedFile("batch.zip", damaged, content_type="application/zip")
+
+        response = self._post([upload])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("batch.zip", response.data["error"])
+        self.tickets[0].refresh_from_db()
+        self.assertEqual(self.tickets[0].status, Ticket.ISSUED)
+
+    def test_damaged_member_is_reported_per_image(self):
+        payload = self.tickets[0].qr_code_data.encode()
+        # same length, so the archive still parses but the first member fails its CRC
+        damaged = self._zip(self.tickets[0], self.tickets[1]).replace(payload, b"x" * len(payload))
+        upload = SimpleUploadedFile("batch.zip", damaged, content_type="application/zip")
+
+        response = self._post([upload])
+
+        self.assertEqual(response.status_code, 200)
+        first, second = response.data["images"]
+        self.assertIn("Could not extract", first["error"])
+        self.assertEqual(second["codes"][0]["result"], "checked_in")
+
+    @unittest.skipIf(real_opencv() is None, "needs opencv-python and numpy")
+    def test_real_photo_is_checked_in(self):
+        cv2, numpy = real_opencv()
+        code = Image.open(io.BytesIO(render_qr_png(self.tickets[0].qr_code_data))).convert("L")
+        photo = Image.new("L", (2400, 1800), color=235)
+        photo.paste(code.resize((700, 700), Image.NEAREST), (850, 550))
+        buf = io.BytesIO()
+        photo.save(buf, format="JPEG", quality=85)
+        upload = SimpleUploadedFile("door.jpg", buf.getvalue(), content_type="image/jpeg")
+
+        with mock.patch.object(utils, "cv2", cv2), mock.patch.object(utils, "np", numpy):
+            response = self.client.post(self.url, {"images": [upload]}, format="multipart")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["summary"], {"checked_in": 1})
+        self.tickets[0].refresh_from_db()
+        self.assertEqual(self.tickets[0].status, Ticket.USED)
+
+    def test_forged_code_is_unrecognized(self):
+        forged = f"CE1/{self.tickets[0].ticket_id}/AAAAAAAAAAAAAAAA"
+
+        response = self._post([self._image("a.jpg", forged)])
+
+        self.assertEqual(response.data["images"][0]["codes"][0]["result"], "unrecognized")
+        self.tickets[0].refresh_from_db()
+        self.assertEqual(self.tickets[0].status, Ticket.ISSUED)
+
+    def test_students_are_forbidden(self):
+        self.client.force_authenticate(self.students[0])
+
+        response = self._post([self._image("a.jpg", self.tickets[0].qr_code_data)])
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_no_files_is_400(self):
+        response = self.client.post(self.url, {}, format="multipart")
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,109 @@
+# tests/test_calendar_feed.py
+
+import datetime as dt
+import json
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.ticketing import claim_ticket_for
+
+
+class CalendarFeedTests(TestCase):
+    """Single-query, cached, conditional FullCalendar feed."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.org = Organization.objects.create(name="Calendar Org")
+        start = timezone.now() + dt.timedelta(days=2)
+        self.events = [
+            Event.objects.create(
+                org=self.org,
+                title=f"Calendar {i}",
+                description="Feed",
+                location="Room",
+                start_at=start + dt.timedelta(hours=i),
+                end_at=start + dt.timedelta(hours=i + 1),
+                capacity=5,
+                created_by=self.organizer,
+                status=Event.APPROVED,
+            )
+            for i in range(3)
+        ]
+        self.client = Client()
+        self.url = reverse("calendar_events_feed")
+        now = timezone.now()
+        self.window = {"start": now.isoformat(), "end": (now + dt.timedelta(days=7)).isoformat()}
+
+    def _get(self, params=None, **headers):
+        return self.client.get(self.url, params or self.window, **headers)
+
+    def test_feed_is_one_aggregate_plus_one_select(self):
+        Ticket.objects.create(event=self.events[0], user=User.objects.create_user(email="s@example.com", password="pw"))
+
+        with self.assertNumQueries(2):
+            response = self._get()
+
+        data = json.loads(response.content)
+        self.assertEqual([e["title"] for e in data], ["Calendar 0", "Calendar 1", "Calendar 2"])
+        self.assertEqual(data[0]["extendedProps"]["remaining"], 4)
+        self.assertEqual(data[0]["extendedProps"]["organization"], "Calendar Org")
+        self.assertTrue(response.has_header("ETag"))
+        self.assertTrue(response.has_header("Last-Modified"))
+
+    def test_repeat_requests_in_the_same_days_hit_the_cache(self):
+        self._get()
+        shifted = {
+            "start": (timezone.now() + dt.timedelta(seconds=1)).isoformat(),
+            "end": self.window["end"],
+        }
+
+        with self.assertNumQueries(1):
+            response = self._get(shifted)
+
+        self.assertEqual(len(json.loads(response.content)), 3)
+
+    def test_conditional_requests_get_304(self):
+        first = self._get()
+
+        with self.assertNumQueries(1):
+            by_etag = self._get(HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_etag["ETag"], first["ETag"])
+
+    def test_if_modified_since_alone_never_gets_304(self):
+        first = self._get()
+
+        # a delete leaves the newest updated_at unchanged
+        self.events[2].delete()
+        by_date = self._get(HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        self.assertEqual(by_date.status_code, 200)
+        self.assertEqual(len(json.loads(by_date.content)), 2)
+
+    def test_changes_produce_a_new_etag(self):
+        etag = self._get()["ETag"]
+
+        # claims move counters with F() updates, not updated_at
+        claim_ticket_for(self.events[1], User.objects.create_user(email="c@example.com", password="pw"))
+        after_claim = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(after_claim.status_code, 200)
+        self.assertEqual(json.loads(after_claim.content)[1]["extendedProps"]["remaining"], 4)
+
+        self.events[2].delete()
+        after_delete = self._get(HTTP_IF_NONE_MATCH=after_claim["ETag"])
+        self.assertEqual(len(json.loads(after_delete.content)), 2)
+
+        self.events[0].title = "Renamed"
+        self.events[0].save()
+        after_save = self._get(
+            HTTP_IF_NONE_MATCH=after_delete["ETag"],
+            HTTP_IF_MODIFIED_SINCE=http_date(timezone.now().timestamp() - 3600),
+        )
+        self.assertEqual(json.loads(after_save.content)[0]["title"], "Renamed")
@@ -0,0 +1,90 @@
+# tests/test_calendar_links.py
+
+import datetime as dt
+import urllib.parse
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents import calendar_utils
+from campusevents.models import User, Organization, Event
+
+
+class CalendarLinkTests(TestCase):
+    """Opt-in gcal_url / ics_url on event listings."""
+
+    def setUp(self):
+        calendar_utils._gcal_memo.clear()
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.org = Organization.objects.create(name="Links Org")
+        montreal = dt.timezone(dt.timedelta(hours=-5))
+        self.event = Event.objects.create(
+            org=self.org, title="Hack & Pizza", description="Bring a laptop/charger",
+            location="H-110", start_at=dt.datetime(2030, 3, 1, 18, tzinfo=montreal),
+            end_at=dt.datetime(2030, 3, 1, 21, tzinfo=montreal),
+            created_by=self.organizer, status=Event.APPROVED,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+
+    def _params(self, url):
+        return urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+
+    def test_links_are_opt_in(self):
+        plain = self.client.get(reverse("event_list")).json()["results"][0]
+        self.assertNotIn("gcal_url", plain)
+        self.assertNotIn("ics_url", plain)
+
+        linked = self.client.get(reverse("event_list"), {"calendar_links": "true"}).json()["results"][0]
+        self.assertEqual(linked["ics_url"], f"http://testserver/api/events/{self.event.id}/calendar/ics/")
+        self.assertTrue(linked["gcal_url"].startswith("https://calendar.google.com/calendar/render?"))
+
+    def test_google_link_uses_utc_times(self):
+        data = self.client.get(reverse("event_detail", args=[self.event.id]), {"calendar_links": "1"}).json()
+        params = self._params(data["gcal_url"])
+
+        self.assertEqual(params["dates"], ["20300301T230000Z/20300302T020000Z"])
+        self.assertEqual(params["text"], ["Hack & Pizza"])
+        self.assertEqual(params["details"], ["Bring a laptop/charger"])
+        self.assertNotIn("ctz", params)
+        self.assertEqual(
+            params["sprop"],
+            ["name:Campus Events", f"website:http://testserver/api/events/{self.event.id}/"],
+        )
+
+    def test_links_are_memoized_until_the_event_changes(self):
+        with mock.patch.object(calendar_utils, "_gcal_query", wraps=calendar_utils._gcal_query) as build:
+            self.client.get(reverse("event_discovery"), {"calendar_links": "true"})
+            self.client.get(reverse("event_discovery"), {"calendar_links": "true"})
+            self.assertEqual(build.call_count, 1)
+
+            self.event.title = "Hack & Tacos"
+            self.event.save()
+            data = self.client.get(reverse("event_discovery"), {"calendar_links": "true"}).json()
+
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(self._params(data["results"][0]["gcal_url"])["text"], ["Hack & Tacos"])
+
+    def test_links_add_no_queries(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse("event_list"))
+        with self.assertNumQueries(2):
+            self.client.get(reverse("event_list"), {"calendar_links": "true"})
+
+    def test_single_event_ics_and_google_endpoints(self):
+        response = self.client.get(reverse("event_ics", args=[self.event.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/calendar"))
+        self.assertIn(b"SUMMARY:Hack & Pizza", response.content)
+
+        data = self.client.get(reverse("event_google_calendar", args=[self.event.id])).json()
+        self.assertEqual(self._params(data["google_calendar_link"])["dates"], ["20300301T230000Z/20300302T020000Z"])
+
+        self.assertEqual(self.client.get(reverse("event_ics", args=[9999])).status_code, 404)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(reverse("event_ics", args=[self.event.id])).status_code, 401)
@@ -0,0 +1,101 @@
+# tests/test_daily_stats.py
+
+import datetime as dt
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents.models import User, Organization, Event, Ticket, DailyStats, DailyEventCheckins
+from campusevents.stats import monthly_series, rollup_closed_days, rollup_days, utc_today
+from campusevents.tasks import rollup_daily_stats
+
+
+class DailyStatsRollupTests(TestCase):
+    """Closed days come from the rollup, today from a live delta."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com", password="pw")
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.students = [
+            User.objects.create_user(email=f"s{i}@example.com", password="pw")
+            for i in range(3)
+        ]
+        self.today = utc_today()
+        self.three_days_ago = self._at(3)
+        now = timezone.now()
+        self.event = Event.objects.create(
+            org=Organization.objects.create(name="Stats Org"),
+            title="Stats Event",
+            description="Stats",
+            location="Room",
+            start_at=now + dt.timedelta(days=1),
+            end_at=now + dt.timedelta(days=1, hours=2),
+            capacity=10,
+            created_by=self.organizer,
+            status=Event.APPROVED,
+        )
+        Event.objects.filter(pk=self.event.pk).update(created_at=self.three_days_ago)
+        tickets = [Ticket.objects.create(event=self.event, user=u) for u in self.students]
+        tickets[0].use_ticket()
+        tickets[2].use_ticket()  # issued and used today
+        Ticket.objects.filter(pk__in=[t.pk for t in tickets[:2]]).update(issued_at=self.three_days_ago)
+        Ticket.objects.filter(pk=tickets[0].pk).update(used_at=self._at(2))
+
+    def _at(self, days_ago):
+        day = self.today - dt.timedelta(days=days_ago)
+        return dt.datetime.combine(day, dt.time(12), tzinfo=dt.timezone.utc)
+
+    def test_rollup_counts_per_day_and_per_event(self):
+        written = rollup_days(self.today - dt.timedelta(days=5), self.today + dt.timedelta(days=1))
+
+        self.assertEqual(written, 5)  # today is clamped off
+        day3 = DailyStats.objects.get(day=self.today - dt.timedelta(days=3))
+        self.assertEqual((day3.events_created, day3.tickets_issued, day3.tickets_used), (1, 2, 0))
+        day2 = DailyStats.objects.get(day=self.today - dt.timedelta(days=2))
+        self.assertEqual(day2.tickets_used, 1)
+        self.assertFalse(DailyStats.objects.filter(day=self.today).exists())
+        self.assertEqual(
+            list(DailyEventCheckins.objects.values_list("day", "event_id", "checkins")),
+            [(self.today - dt.timedelta(days=2), self.event.pk, 1)],
+        )
+
+    def test_series_match_source_tables(self):
+        month_starts = [dt.datetime.combine(self.today.replace(day=1), dt.time.min, tzinfo=dt.timezone.utc)]
+        if self.three_days_ago.date() < self.today.replace(day=1):
+            month_starts.insert(0, self.three_days_ago.replace(day=1, hour=0))
+        live_only = monthly_series(month_starts)
+
+        rollup_closed_days()
+        with self.assertNumQueries(4):  # rollup + 3 live-delta queries
+            rolled = monthly_series(month_starts)
+
+        self.assertEqual(rolled, live_only)
+        self.assertEqual(sum(rolled["tickets_issued"].values()), 3)
+        self.assertEqual(sum(rolled["tickets_used"].values()), 2)
+
+    def test_dashboard_reads_rollup_for_closed_days(self):
+        rollup_closed_days()
+        DailyStats.objects.filter(day=self.today - dt.timedelta(days=3)).update(tickets_issued=40)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.get(reverse("admin_dashboard_stats"), {"months": 2})
+
+        self.assertEqual(sum(m["issued"] for m in response.data["tickets_per_month"]), 41)
+
+    def test_incremental_task_only_revisits_lookback(self):
+        self.assertEqual(rollup_daily_stats(), {"days": 3})
+
+        self.assertEqual(rollup_daily_stats(), {"days": 2})
+
+    def test_backfill_command(self):
+        call_command("backfill_daily_stats", chunk_days=1, stdout=io.StringIO())
+
+        self.assertEqual(DailyStats.objects.count(), 3)
+        self.assertEqual(sum(DailyStats.objects.values_list("tickets_issued", flat=True)), 2)
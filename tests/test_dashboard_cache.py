@@ -0,0 +1,117 @@
+# tests/test_dashboard_cache.py
+
+import datetime as dt
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents import stats
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.stats import cached_dashboard_stats, stats_version
+from campusevents.ticketing import check_in_tickets
+
+
+class DashboardStatsCacheTests(TestCase):
+    """Versioned cache with stampede protection in front of the stats payload."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com", password="pw")
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.student = User.objects.create_user(email="s1@example.com", password="pw")
+        now = timezone.now()
+        self.event = Event.objects.create(
+            org=Organization.objects.create(name="Cache Org"),
+            title="Cache Event",
+            description="Cache",
+            location="Room",
+            start_at=now + dt.timedelta(days=1),
+            end_at=now + dt.timedelta(days=1, hours=1),
+            capacity=10,
+            created_by=self.organizer,
+            status=Event.APPROVED,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse("admin_dashboard_stats")
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+
+    def test_ticket_write_invalidates(self):
+        self.client.get(self.url)
+
+        Ticket.objects.create(event=self.event, user=self.student)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["totals"]["tickets_issued_total"], 1)
+
+    def test_bulk_check_in_invalidates(self):
+        ticket = Ticket.objects.create(event=self.event, user=self.student)
+        version = stats_version()
+
+        check_in_tickets(self.event, [ticket.ticket_id])
+
+        self.assertGreater(stats_version(), version)
+
+    def test_login_does_not_invalidate(self):
+        self.client.get(self.url)
+
+        self.assertTrue(self.client.login(email="s1@example.com", password="pw"))
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+        self.student.role = User.ROLE_ORGANIZER
+        self.student.save()
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+
+    def test_fresh_bypasses_cache(self):
+        self.client.get(self.url)
+
+        response = self.client.get(self.url, {"fresh": "1"})
+
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_windows_are_cached_separately(self):
+        self.client.get(self.url, {"months": 3})
+
+        self.assertEqual(self.client.get(self.url, {"months": 6})["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(self.url, {"months": 3})["X-Cache"], "HIT")
+
+
+class StampedeProtectionTests(TestCase):
+    """Only the lock holder recomputes; others get the last payload or wait."""
+
+    def setUp(self):
+        self.compute = mock.Mock(return_value={"n": 2})
+        key = f"dashboard-stats:v{stats_version()}:demo"
+        cache.add(f"{key}:lock", 1)  # another worker is recomputing
+
+    def test_waiters_get_last_payload(self):
+        cache.set("dashboard-stats:last:demo", {"n": 1})
+
+        payload, hit = cached_dashboard_stats("demo", self.compute)
+
+        self.assertEqual(payload, {"n": 1})
+        self.assertTrue(hit)
+        self.compute.assert_not_called()
+
+    def test_waiter_computes_after_timeout(self):
+        with mock.patch.object(stats, "STATS_LOCK_WAIT", 0.1):
+            payload, hit = cached_dashboard_stats("demo", self.compute)
+
+        self.assertEqual(payload, {"n": 2})
+        self.assertFalse(hit)
+        self.compute.assert_called_once()
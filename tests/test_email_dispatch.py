@@ -0,0 +1,157 @@
+# tests/test_email_dispatch.py
+
+import datetime as dt
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from campusevents.emails import dispatch
+from campusevents.emails.dispatch import dispatch_queued_emails, queue_ticket_confirmation
+from campusevents.models import EmailLog, Event, Organization, Ticket, User
+from campusevents.tasks import send_ticket_confirmation_email
+
+
+class _FlakyConnection:
+    """locmem connection that refuses some recipients."""
+
+    def __init__(self, refuse):
+        self.inner = get_connection()
+        self.refuse = refuse
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.refuse:
+                raise OSError("mailbox unavailable")
+        return self.inner.send_messages(messages)
+
+
+class EmailDispatchTests(TestCase):
+    """Queued EmailLog rows sent in batches over pooled connections."""
+
+    def setUp(self):
+        organizer = User.objects.create_user(email="org@example.com", password="pw", role=User.ROLE_ORGANIZER)
+        org = Organization.objects.create(name="Mail Club")
+        self.event = Event.objects.create(
+            org=org, title="Launch Party", description="", location="Atrium",
+            start_at=dt.datetime(2030, 5, 1, 18, tzinfo=dt.timezone.utc),
+            end_at=dt.datetime(2030, 5, 1, 20, tzinfo=dt.timezone.utc),
+            capacity=50, created_by=organizer, status=Event.APPROVED,
+        )
+        self.students = [
+            User.objects.create_user(email=f"student{i}@example.com", password="pw", first_name=f"S{i}")
+            for i in range(5)
+        ]
+        self.tickets = [Ticket.objects.create(event=self.event, user=user) for user in self.students]
+
+    def _queue_all(self):
+        return [queue_ticket_confirmation(ticket) for ticket in self.tickets]
+
+    def test_queue_stores_a_json_safe_context(self):
+        log = queue_ticket_confirmation(self.tickets[0])
+        log.refresh_from_db()
+
+        self.assertEqual(log.status, EmailLog.QUEUED)
+        self.assertEqual(parse_datetime(log.context_json["event_dt"]), self.event.start_at)
+        self.assertEqual(log.context_json["organizer"], "Mail Club")
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_batch_shares_one_connection_and_records_delivery(self):
+        logs = self._queue_all()
+
+        with mock.patch.object(dispatch, "get_connection", wraps=get_connection) as connect:
+            result = dispatch_queued_emails(batch_size=10)
+
+        self.assertEqual(result, {"sent": 5, "errors": 0, "remaining": 0})
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].attachments[0][0], "ticket_qr.png")
+        for log in logs:
+            log.refresh_from_db()
+            self.assertEqual(log.status, EmailLog.SENT)
+            self.assertEqual(log.attempts, 1)
+            self.assertIsNotNone(log.sent_at)
+            self.assertTrue(log.message_id.startswith("<"))
+        self.assertEqual({m.extra_headers["Message-ID"] for m in mail.outbox}, {log.message_id for log in logs})
+
+    def test_each_batch_opens_one_connection(self):
+        self._queue_all()
+
+        with mock.patch.object(dispatch, "get_connection", wraps=get_connection) as connect:
+            dispatch_queued_emails(batch_size=2)
+
+        self.assertEqual(connect.call_count, 3)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_rate_cap_leaves_the_rest_queued(self):
+        self._queue_all()
+
+        self.assertEqual(dispatch_queued_emails(rate_per_minute=3), {"sent": 3, "errors": 0, "remaining": 2})
+        # still inside the same minute: nothing more goes out
+        self.assertEqual(dispatch_queued_emails(rate_per_minute=3)["sent"], 0)
+
+        EmailLog.objects.filter(status=EmailLog.SENT).update(sent_at=timezone.now() - dt.timedelta(minutes=2))
+        self.assertEqual(dispatch_queued_emails(rate_per_minute=3), {"sent": 2, "errors": 0, "remaining": 0})
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=2)
+    def test_failed_sends_are_retried_then_given_up(self):
+        self._queue_all()
+        flaky = lambda: _FlakyConnection({"student1@example.com"})
+
+        with mock.patch.object(dispatch, "get_connection", side_effect=flaky):
+            self.assertEqual(dispatch_queued_emails(), {"sent": 4, "errors": 1, "remaining": 1})
+            log = EmailLog.objects.get(to="student1@example.com")
+            self.assertEqual((log.status, log.attempts), (EmailLog.QUEUED, 1))
+            self.assertIn("mailbox unavailable", log.last_error)
+
+            dispatch_queued_emails()
+
+        log.refresh_from_db()
+        self.assertEqual((log.status, log.attempts), (EmailLog.FAILED, 2))
+        self.assertIsNone(log.sent_at)
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_ticket_confirmation_task_only_queues(self):
+        result = send_ticket_confirmation_email(self.tickets[0].id)
+
+        log = EmailLog.objects.get(pk=result["email_log_id"])
+        self.assertEqual(log.status, EmailLog.QUEUED)
+        self.assertEqual(len(mail.outbox), 0)
+
+        dispatch_queued_emails()
+        log.refresh_from_db()
+        self.assertEqual(log.status, EmailLog.SENT)
+        self.assertEqual(mail.outbox[0].to, ["student0@example.com"])
+
+    def test_claims_share_one_dispatch_run(self):
+        with mock.patch("campusevents.tasks.dispatch_queued_emails") as dispatch_run:
+            for ticket in self.tickets:
+                send_ticket_confirmation_email(ticket.id)
+
+        dispatch_run.assert_not_called()
+        self.assertEqual(dispatch_queued_emails()["sent"], 5)
+
+    def test_resend_view_goes_through_the_queue(self):
+        self.client.force_login(self.students[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("resend_confirmation", args=[self.tickets[0].id]))
+
+        self.assertEqual(response.status_code, 200)
+        log = EmailLog.objects.get()
+        self.assertEqual((log.status, log.ticket_id), (EmailLog.QUEUED, str(self.tickets[0].id)))
+        self.assertEqual(len(mail.outbox), 0)
+
+        dispatch_queued_emails()
+        self.assertEqual(len(mail.outbox), 1)
@@ -1,8 +1,11 @@
 # tests/test_event_attendees_csv.py
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 
+from campusevents.exports import attendee_csv_lines
 from campusevents.models import User, Organization, Event, Ticket
 
 
@@ -98,6 +101,10 @@ class EventAttendeesCSVTests(APITestCase):
 
         self.client = APIClient()
 
+    def _content(self, response):
+        # downloads are streamed
+        return b"".join(response.streaming_content).decode("utf-8")
+
     # ------------------------------------------------------------
     #                      ACCESS TESTS
     # ------------------------------------------------------------
@@ -111,7 +118,7 @@ class EventAttendeesCSVTests(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("text/csv", response["Content-Type"])
 
-        content = response.content.decode("utf-8")
+        content = self._content(response)
         self.assertIn("student1@example.com", content)
         self.assertIn("student2@example.com", content)
 
@@ -122,7 +129,7 @@ class EventAttendeesCSVTests(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, 200)
-        content = response.content.decode("utf-8")
+        content = self._content(response)
 
         self.assertIn("Alice", content)
         self.assertIn("Bob", content)
@@ -159,7 +166,7 @@ class EventAttendeesCSVTests(APITestCase):
         url = reverse("event_attendees_csv_api", kwargs={"primary_key": self.event.id})
 
         response = self.client.get(url)
-        content = response.content.decode("utf-8")
+        content = self._content(response)
 
         headers = [
             "ticket_id", "ticket_status", "user_email",
@@ -175,7 +182,7 @@ class EventAttendeesCSVTests(APITestCase):
         url = reverse("event_attendees_csv_api", kwargs={"primary_key": self.event.id})
 
         response = self.client.get(url)
-        content = response.content.decode("utf-8")
+        content = self._content(response)
         lines = content.strip().split("\n")
 
         # header + 2 tickets
@@ -196,7 +203,7 @@ class EventAttendeesCSVTests(APITestCase):
         url = reverse("event_attendees_csv_api", kwargs={"primary_key": self.event.id})
 
         response = self.client.get(url, {"status": "issued"})
-        content = response.content.decode("utf-8")
+        content = self._content(response)
 
         self.assertIn("student1@example.com", content)
         self.assertNotIn("student2@example.com", content)
@@ -206,7 +213,7 @@ class EventAttendeesCSVTests(APITestCase):
         url = reverse("event_attendees_csv_api", kwargs={"primary_key": self.event.id})
 
         response = self.client.get(url, {"status": "used"})
-        content = response.content.decode("utf-8")
+        content = self._content(response)
 
         self.assertIn("student2@example.com", content)
         self.assertNotIn("student1@example.com", content)
@@ -241,7 +248,7 @@ class EventAttendeesCSVTests(APITestCase):
         url = reverse("event_attendees_csv_api", kwargs={"primary_key": empty_event.id})
 
         response = self.client.get(url)
-        content = response.content.decode("utf-8")
+        content = self._content(response)
         lines = content.strip().split("\n")
 
         self.assertEqual(len(lines), 1)  # only header
@@ -253,3 +260,39 @@ class EventAttendeesCSVTests(APITestCase):
 
         response = self.client.get(url)
         self.assertEqual(response.status_code, 404)
+
+    # ------------------------------------------------------------
+    #                       STREAMING TESTS
+    # ------------------------------------------------------------
+
+    def test_csv_is_streamed(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("event_attendees_csv_api", kwargs={"primary_key": self.event.id})
+
+        response = self.client.get(url)
+
+        self.assertTrue(response.streaming)
+
+    def test_header_is_sent_before_querying_tickets(self):
+        lines = attendee_csv_lines(self.event, chunk_size=1)
+
+        with self.assertNumQueries(0):
+            header = next(lines)
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(lines)
+
+        self.assertTrue(header.startswith("ticket_id,ticket_status,user_email"))
+        self.assertEqual(len(rows), 2)
+        # one joined SELECT for all rows, not one per ticket or user
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_session_export_uses_the_same_exporter(self):
+        self.client.force_login(self.org_user)
+        url = reverse("event_attendees_csv", kwargs={"primary_key": self.event.id})
+
+        response = self.client.get(url, {"status": "issued"})
+        content = self._content(response)
+
+        self.assertTrue(response.streaming)
+        self.assertIn("student1@example.com", content)
+        self.assertNotIn("student2@example.com", content)
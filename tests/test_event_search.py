@@ -0,0 +1,110 @@
+# tests/test_event_search.py
+
+import datetime as dt
+import importlib
+import io
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents.models import User, Organization, Event
+from campusevents.search import SQLITE_TABLE, search_backend
+
+
+class EventSearchTests(TestCase):
+    """Discovery search goes through the full-text index and is ranked."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.robotics = Organization.objects.create(name="Robotics Club")
+        self.music = Organization.objects.create(name="Music Society")
+        self.fair = self._event("Technology Career Fair", "Meet employers", org=self.robotics, category="Career")
+        self.talk = self._event("Evening Talk", "A talk about technology in music", org=self.music)
+        self.jam = self._event("Jam Session", "Bring an instrument", org=self.music, category="Music")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email="s@example.com", password="pw"))
+        self.url = reverse("event_discovery")
+
+    def _event(self, title, description, org, category=""):
+        start = timezone.now() + dt.timedelta(days=3)
+        return Event.objects.create(
+            org=org,
+            title=title,
+            description=description,
+            category=category,
+            location="Hall H",
+            start_at=start,
+            end_at=start + dt.timedelta(hours=2),
+            capacity=50,
+            created_by=self.organizer,
+            status=Event.APPROVED,
+        )
+
+    def _search(self, text):
+        response = self.client.get(self.url, {"search": text})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_prefix_terms_match_and_title_ranks_first(self):
+        # "tech" matches both; the title hit outranks the description hit
+        self.assertEqual(self._search("tech"), [self.fair.id, self.talk.id])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._search("technology music"), [self.talk.id])
+
+    def test_organization_and_category_are_indexed(self):
+        self.assertEqual(self._search("robotics"), [self.fair.id])
+        self.assertEqual(self._search("Music"), [self.jam.id, self.talk.id])
+
+    def test_punctuation_only_query_does_not_filter(self):
+        self.assertEqual(len(self._search('"*')), 3)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.jam.title = "Quantum Jam"
+        self.jam.save()
+        self.assertEqual(self._search("quantum"), [self.jam.id])
+
+        self.robotics.name = "Drone Club"
+        self.robotics.save()
+        self.assertEqual(self._search("drone"), [self.fair.id])
+        self.assertEqual(self._search("robotics"), [])
+
+        self.fair.delete()
+        self.assertEqual(self._search("tech"), [self.talk.id])
+
+    def test_discovery_page_uses_the_index(self):
+        response = self.client.get(reverse("event_list_page"), {"search": "instrument"})
+
+        self.assertEqual([e.id for e in response.context["page_obj"].object_list], [self.jam.id])
+
+    def test_rebuild_command_repairs_the_index(self):
+        if search_backend() != "sqlite":
+            self.skipTest("checks the SQLite FTS5 table")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+        self.assertEqual(self._search("tech"), [])
+
+        call_command("rebuild_search_index", stdout=io.StringIO())
+
+        self.assertEqual(self._search("tech"), [self.fair.id, self.talk.id])
+
+    def test_migration_backfills_existing_events(self):
+        if search_backend() != "sqlite":
+            self.skipTest("checks the SQLite FTS5 table")
+        migration = importlib.import_module("campusevents.migrations.0011_event_search_index")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+
+        # the migration only needs .connection and .execute(); entering the
+        # SQLite schema editor isn't allowed inside the test transaction
+        migration.create_index(apps, connection.SchemaEditorClass(connection))
+
+        self.assertEqual(self._search("tech"), [self.fair.id, self.talk.id])
+        self.assertEqual(self._search("robotics"), [self.fair.id])
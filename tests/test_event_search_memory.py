@@ -0,0 +1,123 @@
+# tests/test_event_search_memory.py
+
+import datetime as dt
+from unittest import mock
+
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents import search
+from campusevents.models import User, Organization, Event
+from campusevents.search_memory import InvertedIndex, event_index, indexed_fields, tokenize
+
+
+class InvertedIndexTests(SimpleTestCase):
+    """Tokenizing, prefix matching and BM25 ordering of the in-memory index."""
+
+    def setUp(self):
+        self.index = InvertedIndex()
+        self.index.add(1, [("Technology Career Fair", 3.0), ("Meet employers", 1.0)])
+        self.index.add(2, [("Evening Talk", 3.0), ("Technology in music, technology in art", 1.0)])
+        self.index.add(3, [("Café Social", 3.0), ("Coffee and music", 1.0)])
+
+    def test_tokenize_folds_case_and_accents(self):
+        self.assertEqual(tokenize("Café, CRÊPES & tea!"), ["cafe", "crepes", "tea"])
+
+    def test_prefix_match_with_field_weights(self):
+        # the title hit outweighs two description hits
+        self.assertEqual(self.index.search("tech"), [1, 2])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.index.search("tech music"), [2])
+        self.assertEqual(self.index.search("cafe"), [3])
+        self.assertEqual(self.index.search("tech nothing"), [])
+
+    def test_remove_drops_unused_terms(self):
+        self.index.add(3, [("Board Games", 3.0)])  # re-index replaces
+        self.index.remove(1)
+
+        self.assertEqual(self.index.search("cafe"), [])
+        self.assertNotIn("career", self.index.vocabulary)
+        self.assertEqual(len(self.index), 2)
+
+
+@override_settings(EVENT_SEARCH_BACKEND="memory")
+class MemorySearchDiscoveryTests(TestCase):
+    """build_event_discovery_qs with the in-memory index."""
+
+    def setUp(self):
+        event_index.clear()
+        self.addCleanup(event_index.clear)
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.org = Organization.objects.create(name="Robotics Club")
+        self.fair = self._event("Technology Career Fair", "Meet employers")
+        self.talk = self._event("Evening Talk", "A talk about technology")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email="s@example.com", password="pw"))
+
+    def _event(self, title, description, status=Event.APPROVED):
+        start = timezone.now() + dt.timedelta(days=3)
+        return Event.objects.create(
+            org=self.org,
+            title=title,
+            description=description,
+            location="Hall H",
+            start_at=start,
+            end_at=start + dt.timedelta(hours=2),
+            capacity=50,
+            created_by=self.organizer,
+            status=status,
+        )
+
+    def _search(self, text, **filters):
+        response = self.client.get(reverse("event_discovery"), {"search": text, **filters})
+        return [row["id"] for row in response.data["results"]]
+
+    def test_weights_are_the_database_index_weights(self):
+        self.assertEqual(
+            indexed_fields(),
+            (("title", 10.0), ("description", 1.0), ("location", 3.0), ("org__name", 4.0), ("category", 4.0)),
+        )
+        self.assertEqual([w for _, w in indexed_fields()], [w for _, w, _ in search.SEARCH_FIELDS])
+
+    def test_filters_apply_before_the_hit_limit(self):
+        self.talk.category = "music"
+        self.talk.save()
+
+        with mock.patch.object(search, "MEMORY_SEARCH_LIMIT", 1):
+            # the fair ranks first overall, but only the talk is in "music"
+            self.assertEqual(self._search("tech", category="music"), [self.talk.id])
+            self.assertEqual(self._search("tech"), [self.fair.id])
+
+    def test_ranked_results_fetched_by_primary_key(self):
+        self.assertEqual(self._search("tech"), [self.fair.id, self.talk.id])
+        self.assertCountEqual(self._search("robot"), [self.fair.id, self.talk.id])  # organization name
+        self.assertEqual(self._search("employers"), [self.fair.id])
+
+    def test_saves_in_this_process_apply_on_next_query(self):
+        self._search("tech")  # build the index
+
+        pending = self._event("Quantum Night", "Physics", status=Event.PENDING)
+        self.assertEqual(self._search("quantum"), [])
+        pending.status = Event.APPROVED
+        pending.save()
+        self.talk.delete()
+
+        self.assertEqual(self._search("quantum"), [pending.id])
+        self.assertNotIn(self.talk.id, event_index.index)
+
+    def test_change_feed_picks_up_writes_from_other_processes(self):
+        self._search("tech")
+        # as another worker would: no signal reaches this process
+        Event.objects.filter(pk=self.talk.pk).update(
+            title="Robot Wars", updated_at=timezone.now() + dt.timedelta(seconds=1),
+        )
+        self.assertEqual(self._search("wars"), [])  # polled at most every SYNC_INTERVAL
+
+        event_index.checked_at = 0.0
+
+        self.assertEqual(self._search("wars"), [self.talk.id])
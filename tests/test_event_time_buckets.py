@@ -0,0 +1,134 @@
+# tests/test_event_time_buckets.py
+
+import datetime as dt
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from campusevents.calendar_index import (
+    MAX_EVENT_BUCKETS,
+    SPANNING_BUCKET,
+    approved_events_between,
+    event_buckets,
+    rebuild_event_buckets,
+    week_of,
+)
+from campusevents.models import Event, EventTimeBucket, Organization, User
+
+UTC = dt.timezone.utc
+
+
+def at(day, hour=12):
+    return dt.datetime(2026, 3, day, hour, tzinfo=UTC)
+
+
+class EventTimeBucketTests(TestCase):
+    """Week buckets kept in step with events, and window lookups through them."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.org = Organization.objects.create(name="Bucket Org")
+
+    def _event(self, start, end, status=Event.APPROVED, title="Bucketed"):
+        return Event.objects.create(
+            org=self.org, title=title, description="", location="Hall",
+            start_at=start, end_at=end, created_by=self.organizer, status=status,
+        )
+
+    def _buckets(self, event):
+        return sorted(event.time_buckets.values_list("bucket", flat=True))
+
+    def test_week_of_is_monday_utc(self):
+        # 2026-03-04 is a Wednesday; Sunday evening in Montreal is Monday in UTC
+        self.assertEqual(week_of(at(4)), dt.date(2026, 3, 2))
+        montreal = dt.timezone(dt.timedelta(hours=-5))
+        self.assertEqual(week_of(dt.datetime(2026, 3, 8, 22, tzinfo=montreal)), dt.date(2026, 3, 9))
+
+    def test_event_gets_one_bucket_per_week_it_touches(self):
+        event = self._event(at(6), at(17))  # Friday to the Tuesday after next
+
+        self.assertEqual(
+            self._buckets(event),
+            [dt.date(2026, 3, 2), dt.date(2026, 3, 9), dt.date(2026, 3, 16)],
+        )
+
+    def test_moving_an_event_moves_its_buckets(self):
+        event = self._event(at(3), at(3, 14))
+        event.start_at, event.end_at = at(10), at(11)
+        event.save()
+
+        self.assertEqual(self._buckets(event), [dt.date(2026, 3, 9)])
+        self.assertEqual(set(event.time_buckets.values_list("start_at", "end_at")), {(at(10), at(11))})
+
+    def test_only_approved_events_are_bucketed(self):
+        event = self._event(at(3), at(3, 14), status=Event.PENDING)
+        self.assertEqual(self._buckets(event), [])
+
+        event.status = Event.APPROVED
+        event.save()
+        self.assertEqual(self._buckets(event), [dt.date(2026, 3, 2)])
+
+        event.status = Event.REJECTED
+        event.save()
+        self.assertEqual(self._buckets(event), [])
+
+    def test_deleting_an_event_drops_its_buckets(self):
+        event = self._event(at(3), at(3, 14))
+        event.delete()
+
+        self.assertFalse(EventTimeBucket.objects.exists())
+
+    def test_very_long_events_share_the_spanning_bucket(self):
+        start = at(2)
+        self.assertEqual(event_buckets(start, start + dt.timedelta(weeks=MAX_EVENT_BUCKETS + 1)), [SPANNING_BUCKET])
+
+        semester_long = self._event(start, start + dt.timedelta(weeks=MAX_EVENT_BUCKETS + 1))
+        self.assertIn(semester_long, approved_events_between(at(20), at(21)))
+
+    def test_window_matches_the_plain_overlap_query(self):
+        events = [
+            self._event(at(1), at(2)),           # before the window
+            self._event(at(9, 10), at(9, 11)),   # same week, ends before the window
+            self._event(at(9, 22), at(10, 9)),   # runs into the window
+            self._event(at(11), at(11, 14)),     # inside
+            self._event(at(12, 20), at(20)),     # runs past the end
+            self._event(at(14), at(14, 14)),     # same week, starts after the window
+            self._event(at(11), at(11, 14), status=Event.DRAFT),
+        ]
+        start, end = at(10, 0), at(13, 0)
+
+        expected = set(
+            Event.objects.filter(status=Event.APPROVED, end_at__gte=start, start_at__lte=end)
+            .values_list("id", flat=True)
+        )
+        found = list(approved_events_between(start, end).values_list("id", flat=True))
+
+        self.assertEqual(sorted(found), sorted(expected))
+        self.assertEqual(expected, {events[2].id, events[3].id, events[4].id})
+
+    def test_rebuild_restores_buckets_skipped_by_bulk_writes(self):
+        Event.objects.bulk_create([
+            Event(org=self.org, title="Bulk", description="", location="Hall",
+                  start_at=at(6), end_at=at(10), created_by=self.organizer, status=Event.APPROVED),
+        ])
+        self.assertFalse(EventTimeBucket.objects.exists())
+
+        out = StringIO()
+        call_command("rebuild_event_buckets", stdout=out)
+
+        self.assertIn("Wrote 2 bucket row(s).", out.getvalue())
+        self.assertEqual(rebuild_event_buckets(), 2)
+        self.assertEqual(approved_events_between(at(9, 0), at(9, 23)).get().title, "Bulk")
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN output is SQLite's")
+    def test_window_reads_the_bucket_index_not_an_event_range(self):
+        plan = approved_events_between(at(10), at(13)).values_list("id").explain()
+
+        self.assertIn("event_bucket_window_idx", plan)
+        self.assertIn("INTEGER PRIMARY KEY", plan)
+        self.assertNotIn("event_status_end_idx", plan)
@@ -0,0 +1,189 @@
+# tests/test_export_jobs.py
+
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+from xml.etree import ElementTree
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+
+from campusevents import exports
+from campusevents.exports import run_export
+from campusevents.models import User, Organization, Event, Ticket, ExportJob
+
+
+class ExportJobTests(APITestCase):
+    """Background attendee exports: formats, progress, download and access."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.exports_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.exports_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root, EXPORTS_ROOT=self.exports_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.other_organizer = User.objects.create_user(
+            email="other@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        org = Organization.objects.create(name="Export Org")
+        self.events = [
+            Event.objects.create(
+                org=org,
+                title=f"Event {i}",
+                description="Export",
+                location="Room",
+                start_at="2030-10-10T10:00:00Z",
+                end_at="2030-10-10T12:00:00Z",
+                capacity=100,
+                created_by=self.organizer,
+                status=Event.APPROVED,
+            )
+            for i in range(2)
+        ]
+        self.students = [
+            User.objects.create_user(
+                email=f"student{i}@example.com", password="pw", first_name=f"S{i}", student_id=f"100{i}",
+            )
+            for i in range(3)
+        ]
+        Ticket.objects.create(event=self.events[0], user=self.students[0])
+        Ticket.objects.create(event=self.events[0], user=self.students[1], status="used")
+        Ticket.objects.create(event=self.events[1], user=self.students[2])
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+        self.url = reverse("export_jobs")
+
+    def _start(self, **data):
+        data.setdefault("events", [e.id for e in self.events])
+        return self.client.post(self.url, data, format="json")
+
+    def _download(self, response):
+        download = self.client.get(response.data["download_url"])
+        self.assertEqual(download.status_code, 200)
+        return b"".join(download.streaming_content)
+
+    def test_csv_export_of_several_events(self):
+        response = self._start(format="csv")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], ExportJob.DONE)
+        self.assertEqual(response.data["rows_written"], 3)
+        self.assertEqual(response.data["progress"], 1.0)
+        lines = self._download(response).decode("utf-8").strip().splitlines()
+        self.assertEqual(lines[0].split(","), [header for header, _ in exports.ATTENDEE_COLUMNS])
+        self.assertEqual(len(lines), 4)
+        self.assertIn("student2@example.com", lines[3])
+
+    def test_jsonl_export_with_status_filter(self):
+        response = self._start(format="jsonl", ticket_status="used")
+
+        rows = [json.loads(line) for line in self._download(response).decode("utf-8").splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["user_email"], "student1@example.com")
+        self.assertEqual(rows[0]["ticket_status"], "used")
+
+    def test_xlsx_export_is_a_workbook(self):
+        response = self._start(format="xlsx")
+
+        with zipfile.ZipFile(ExportJob.objects.get(pk=response.data["id"]).file.path) as zf:
+            self.assertIn("xl/workbook.xml", zf.namelist())
+            sheet = zf.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        self.assertEqual(sheet.count("<row>"), 4)
+        self.assertIn("student0@example.com", sheet)
+
+    def test_xlsx_strips_xml_invalid_characters(self):
+        self.students[0].first_name = "Bad\x00Na\x0bme\x1f\tok"
+        self.students[0].save(update_fields=["first_name"])
+
+        response = self._start(format="xlsx")
+
+        with zipfile.ZipFile(ExportJob.objects.get(pk=response.data["id"]).file.path) as zf:
+            sheet = zf.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        ElementTree.fromstring(sheet)  # well-formed
+        self.assertIn("<t>BadName\tok</t>", sheet)
+
+    def test_progress_is_recorded_per_batch(self):
+        job = ExportJob.objects.create(created_by=self.organizer, format="csv")
+        job.events.set(self.events)
+
+        with self.assertNumQueries(8):
+            # count + status, one SELECT read in chunks, a progress update per
+            # single-row batch, then re-read progress and mark done
+            run_export(job, chunk_size=1)
+
+        self.assertEqual((job.rows_total, job.rows_written, job.status), (3, 3, ExportJob.DONE))
+
+    def test_export_file_is_private_and_unguessable(self):
+        response = self._start(format="csv")
+        job = ExportJob.objects.get(pk=response.data["id"])
+
+        self.assertTrue(os.path.realpath(job.file.path).startswith(os.path.realpath(self.exports_root)))
+        self.assertEqual(os.listdir(self.media_root), [])
+        self.assertNotEqual(job.file.name, f"attendees_export_{job.pk}.csv")
+        with self.assertRaises(ValueError):
+            job.file.url
+
+        download = self.client.get(response.data["download_url"])
+        self.assertIn(f'filename="attendees_export_{job.pk}.csv"', download["Content-Disposition"])
+
+    def test_failure_before_writing_marks_the_job_failed(self):
+        job = ExportJob.objects.create(created_by=self.organizer, format="csv")
+        job.events.set(self.events)
+
+        with mock.patch.object(exports, "_attendee_values", side_effect=RuntimeError("database went away")):
+            run_export(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (ExportJob.FAILED, "database went away"))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failure_while_writing_removes_the_partial_file(self):
+        job = ExportJob.objects.create(created_by=self.organizer, format="csv")
+        job.events.set(self.events)
+
+        def fail_midway(path, batches):
+            with open(path, "w") as fh:
+                fh.write("partial")
+            raise OSError("disk full")
+
+        with mock.patch.dict(exports.EXPORT_WRITERS, {"csv": ("csv", fail_midway)}):
+            run_export(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error, job.file.name), (ExportJob.FAILED, "disk full", ""))
+        self.assertEqual(os.listdir(self.exports_root), [])
+
+    def test_parquet_requires_pyarrow(self):
+        if exports.pyarrow is not None:
+            self.skipTest("pyarrow is installed")
+
+        response = self._start(format="parquet")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("format", response.data)
+
+    def test_other_organizer_cannot_export_or_see_jobs(self):
+        response = self._start()
+
+        self.client.force_authenticate(self.other_organizer)
+        self.assertEqual(self._start().status_code, 403)
+        detail = reverse("export_job_detail", kwargs={"pk": response.data["id"]})
+        self.assertEqual(self.client.get(detail).status_code, 404)
+        self.assertEqual(self.client.get(self.url).data, [])
+
+    def test_unknown_event_is_rejected(self):
+        response = self._start(events=[self.events[0].id, 99999])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("events", response.data)
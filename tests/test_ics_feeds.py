@@ -0,0 +1,138 @@
+# tests/test_ics_feeds.py
+
+import datetime as dt
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+from icalendar import Calendar
+from rest_framework.test import APIClient
+
+from campusevents.calendar_utils import make_feed_token
+from campusevents.models import User, Organization, Event, Ticket
+
+
+class IcsFeedTests(TestCase):
+    """Subscribable campus, organization and personal .ics feeds."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.student = User.objects.create_user(email="student@example.com", password="pw")
+        self.org = Organization.objects.create(name="Robotics Club")
+        self.other_org = Organization.objects.create(name="Chess Club")
+        self.start = timezone.now() + dt.timedelta(days=3)
+        self.robots = self._event("Robot Wars", self.org)
+        self.chess = self._event("Blitz Night", self.other_org, hours=2)
+        self._event("Pending Talk", self.org, status=Event.PENDING)
+        self._event("Old Meetup", self.org, days=-90)
+        self.client = Client()
+
+    def _event(self, title, org, hours=0, days=0, status=Event.APPROVED):
+        start = self.start + dt.timedelta(days=days, hours=hours)
+        return Event.objects.create(
+            org=org, title=title, description="Feed test", location="Hall B",
+            start_at=start, end_at=start + dt.timedelta(hours=1),
+            created_by=self.organizer, status=status,
+        )
+
+    def _summaries(self, response):
+        cal = Calendar.from_ical(response.content)
+        return [str(component["summary"]) for component in cal.walk("VEVENT")]
+
+    def test_campus_feed_lists_recent_and_upcoming_approved_events(self):
+        response = self.client.get(reverse("campus_ics_feed"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/calendar"))
+        self.assertEqual(self._summaries(response), ["Robot Wars", "Blitz Night"])
+        cal = Calendar.from_ical(response.content)
+        self.assertEqual(str(cal["x-wr-calname"]), "Campus Events")
+        uids = [str(c["uid"]) for c in cal.walk("VEVENT")]
+        self.assertEqual(uids[0], f"campusevent-{self.robots.id}@testserver")
+
+    def test_organization_feed_only_has_that_organization(self):
+        response = self.client.get(reverse("organization_ics_feed", args=[self.other_org.id]))
+
+        self.assertEqual(self._summaries(response), ["Blitz Night"])
+        self.assertEqual(self.client.get(reverse("organization_ics_feed", args=[9999])).status_code, 404)
+
+    def test_unchanged_feed_is_a_304_after_one_query(self):
+        first = self.client.get(reverse("campus_ics_feed"))
+        self.assertTrue(first.has_header("ETag"))
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        with self.assertNumQueries(1):
+            again = self.client.get(reverse("campus_ics_feed"), HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+    def test_deleted_event_is_not_hidden_behind_if_modified_since(self):
+        first = self.client.get(reverse("campus_ics_feed"))
+
+        self.chess.delete()
+        again = self.client.get(reverse("campus_ics_feed"), HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(self._summaries(again), ["Robot Wars"])
+
+    def test_only_edited_events_are_rendered_again(self):
+        first = self.client.get(reverse("campus_ics_feed"))
+        with self.assertNumQueries(1):
+            cached = self.client.get(reverse("campus_ics_feed"))
+        self.assertEqual(cached.content, first.content)
+
+        self.robots.title = "Robot Wars II"
+        self.robots.save()
+
+        with self.assertNumQueries(2):
+            edited = self.client.get(reverse("campus_ics_feed"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(edited.status_code, 200)
+        self.assertNotEqual(edited["ETag"], first["ETag"])
+        self.assertEqual(self._summaries(edited), ["Robot Wars II", "Blitz Night"])
+
+    def test_feed_survives_a_cold_cache(self):
+        first = self.client.get(reverse("campus_ics_feed"))
+        cache.clear()
+
+        self.assertEqual(self.client.get(reverse("campus_ics_feed")).content, first.content)
+
+    def test_personal_feed_follows_held_tickets(self):
+        Ticket.objects.create(event=self.chess, user=self.student)
+        url = reverse("user_ics_feed", args=[make_feed_token(self.student)])
+
+        response = self.client.get(url)
+
+        self.assertEqual(self._summaries(response), ["Blitz Night"])
+        self.assertIn("private", response["Cache-Control"])
+
+        ticket = self.student.tickets.get()
+        ticket.status = Ticket.CANCELLED
+        ticket.save()
+        self.assertEqual(self._summaries(self.client.get(url)), [])
+
+    def test_bad_or_revoked_tokens_are_404(self):
+        token = make_feed_token(self.student)
+        self.assertEqual(self.client.get(reverse("user_ics_feed", args=["1-deadbeef"])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("user_ics_feed", args=["nope"])).status_code, 404)
+
+        self.student.set_password("new-password")
+        self.student.save()
+
+        self.assertEqual(self.client.get(reverse("user_ics_feed", args=[token])).status_code, 404)
+
+    def test_links_endpoint_returns_webcal_urls(self):
+        api = APIClient()
+        self.assertEqual(api.get(reverse("calendar_feed_links")).status_code, 401)
+
+        api.force_authenticate(self.student)
+        data = api.get(reverse("calendar_feed_links")).json()
+
+        self.assertEqual(data["campus"], "webcal://testserver/calendar/feeds/campus.ics")
+        self.assertEqual(
+            data["personal"],
+            f"webcal://testserver/calendar/feeds/user/{make_feed_token(self.student)}.ics",
+        )
@@ -0,0 +1,122 @@
+# tests/test_keyset_pagination.py
+
+import datetime as dt
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+
+from campusevents.models import User, Organization, Event
+
+
+class KeysetPaginationTests(APITestCase):
+    """Opt-in cursor pagination and count-free page numbers."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com", password="pw")
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        org = Organization.objects.create(name="Cursor Org")
+        base = timezone.now() + dt.timedelta(days=1)
+        self.events = []
+        for i in range(7):
+            # pairs share a start time, so the id tie-breaker matters
+            start = base + dt.timedelta(hours=i // 2)
+            self.events.append(Event.objects.create(
+                org=org,
+                title=f"Cursor Event {i}",
+                description="Paged",
+                location="Room",
+                start_at=start,
+                end_at=start + dt.timedelta(hours=1),
+                capacity=10,
+                created_by=self.organizer,
+                status=Event.APPROVED if i < 6 else Event.PENDING,
+            ))
+        # identical created_at for the moderation ordering too
+        Event.objects.update(created_at=timezone.now())
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _walk(self, url, params):
+        """Follow ``next`` links; returns (ids, responses)."""
+        ids, responses = [], []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            responses.append(response)
+            ids += [row["id"] for row in response.data["results"]]
+            if not response.data["next"]:
+                return ids, responses
+            response = self.client.get(response.data["next"])
+
+    def test_discovery_cursor_pages_follow_start_at_then_id(self):
+        ids, responses = self._walk(reverse("event_discovery"), {"pagination": "cursor", "page_size": 4})
+
+        self.assertEqual(ids, [e.id for e in self.events[:6]])
+        self.assertEqual(len(responses), 2)
+        self.assertNotIn("count", responses[0].data)
+
+    def test_previous_cursor_returns_the_page_before(self):
+        url = reverse("event_discovery")
+        first = self.client.get(url, {"pagination": "cursor", "page_size": 2})
+        second = self.client.get(first.data["next"])
+        self.assertIsNone(first.data["previous"])
+
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertEqual(back.data["next"], first.data["next"])
+
+    def test_cursor_page_runs_no_count_or_offset(self):
+        first = self.client.get(reverse("event_discovery"), {"pagination": "cursor", "page_size": 2})
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data["next"])
+
+        sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_moderation_orders_by_created_at_desc_then_id(self):
+        ids, _ = self._walk(reverse("dashboard_events"), {"pagination": "cursor", "page_size": 3})
+
+        self.assertEqual(ids, sorted(e.id for e in self.events))
+
+    def test_user_admin_lists_support_cursors(self):
+        ids, _ = self._walk(reverse("dashboard_users"), {"pagination": "cursor", "page_size": 1})
+        self.assertCountEqual(ids, [self.admin.id, self.organizer.id])
+
+        User.objects.filter(pk=self.organizer.pk).update(is_verified=False)
+        ids, _ = self._walk(reverse("dashboard_pending_organizers"), {"pagination": "cursor"})
+        self.assertEqual(ids, [self.organizer.id])
+
+    def test_search_results_page_by_rank(self):
+        ranked = self.client.get(reverse("event_discovery"), {"search": "cursor", "page_size": 100})
+        ids, _ = self._walk(
+            reverse("event_discovery"), {"search": "cursor", "pagination": "cursor", "page_size": 4},
+        )
+        self.assertEqual(ids, [row["id"] for row in ranked.data["results"]])
+
+    def test_tampered_cursor_is_rejected(self):
+        first = self.client.get(reverse("event_discovery"), {"pagination": "cursor", "page_size": 2})
+
+        response = self.client.get(first.data["next"].replace("cursor=", "cursor=x"))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_numbers_without_count(self):
+        url = reverse("event_discovery")
+        with CaptureQueriesContext(connection) as ctx:
+            page = self.client.get(url, {"count": "false", "page_size": 4})
+        last = self.client.get(page.data["next"])
+
+        self.assertIsNone(page.data["count"])
+        self.assertEqual(len(page.data["results"]), 4)
+        self.assertFalse(any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries))
+        self.assertEqual(len(last.data["results"]), 2)
+        self.assertIsNone(last.data["next"])
+        self.assertIn("page", page.data["next"])
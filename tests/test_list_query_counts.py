@@ -0,0 +1,80 @@
+# tests/test_list_query_counts.py
+
+import datetime as dt
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+
+from campusevents.models import User, Organization, Event, Ticket
+
+
+class ListQueryCountTests(APITestCase):
+    """EventListView and MyTicketsView: paginated, fixed query count per page."""
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            email="student@example.com", password="pw", first_name="Stu", last_name="Dent",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _add_events(self, n):
+        start = timezone.now() + dt.timedelta(days=2)
+        for _ in range(n):
+            i = Event.objects.count()
+            organizer = User.objects.create_user(
+                email=f"org{i}@example.com", password="pw", first_name="Org", last_name=str(i),
+                role=User.ROLE_ORGANIZER,
+            )
+            event = Event.objects.create(
+                org=Organization.objects.create(name=f"Org {i}"),
+                title=f"Event {i}",
+                description="Listed",
+                location="Room",
+                start_at=start + dt.timedelta(hours=i),
+                end_at=start + dt.timedelta(hours=i + 1),
+                capacity=20,
+                created_by=organizer,
+                status=Event.APPROVED,
+            )
+            Ticket.objects.create(event=event, user=self.student)
+
+    def _assert_constant(self, url, expected_queries):
+        self._add_events(2)
+        with self.assertNumQueries(expected_queries):
+            small = self.client.get(url, {"page_size": 50})
+        self._add_events(10)
+        with self.assertNumQueries(expected_queries):
+            large = self.client.get(url, {"page_size": 50})
+        return small, large
+
+    def test_event_list_is_paginated(self):
+        self._add_events(3)
+
+        response = self.client.get(reverse("event_list"), {"page_size": 2})
+
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual([e["title"] for e in response.data["results"]], ["Event 0", "Event 1"])
+        self.assertEqual(response.data["results"][0]["org_name"], "Org 0")
+        self.assertEqual(response.data["results"][0]["created_by_name"], "Org 0")
+        self.assertEqual(response.data["results"][0]["remaining_capacity"], 19)
+
+    def test_event_list_query_count_does_not_grow(self):
+        # COUNT(*) + one joined SELECT
+        _, large = self._assert_constant(reverse("event_list"), 2)
+        self.assertEqual(len(large.data["results"]), 12)
+
+    def test_my_tickets_is_paginated(self):
+        self._add_events(3)
+
+        response = self.client.get(reverse("my_tickets"), {"page_size": 2})
+
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][0]["user_name"], "Stu Dent")
+        self.assertTrue(response.data["results"][0]["is_valid"])
+
+    def test_my_tickets_query_count_does_not_grow(self):
+        _, large = self._assert_constant(reverse("my_tickets"), 2)
+        self.assertEqual({t["event_title"] for t in large.data["results"]}, {f"Event {i}" for i in range(12)})
@@ -0,0 +1,158 @@
+# tests/test_offline_check_in.py
+
+import datetime as dt
+import hashlib
+import hmac
+import json
+import uuid
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents.manifest import build_ticket_manifest, unpack_ticket_ids, verify_ticket_manifest
+from campusevents.models import User, Organization, Event, Ticket
+
+
+class OfflineCheckInTests(TestCase):
+    """Manifest download and offline check-in sync."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.students = [
+            User.objects.create_user(email=f"s{i}@example.com", password="pw")
+            for i in range(5)
+        ]
+        org = Organization.objects.create(name="Offline Org")
+        now = timezone.now()
+        common = {
+            "org": org,
+            "description": "Offline",
+            "location": "Field",
+            "start_at": now + dt.timedelta(hours=1),
+            "end_at": now + dt.timedelta(hours=5),
+            "capacity": 10,
+            "created_by": self.organizer,
+            "status": Event.APPROVED,
+        }
+        self.event = Event.objects.create(title="Main", **common)
+        self.other_event = Event.objects.create(title="Other", **common)
+        self.issued = [Ticket.objects.create(event=self.event, user=u) for u in self.students[:3]]
+        self.used = Ticket.objects.create(event=self.event, user=self.students[3])
+        self.used.use_ticket()
+        self.cancelled = Ticket.objects.create(event=self.event, user=self.students[4])
+        self.cancelled.cancel_ticket()
+        self.foreign = Ticket.objects.create(event=self.other_event, user=self.students[0])
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+
+    def test_manifest_is_sorted_packed_and_signed(self):
+        response = self.client.get(reverse("check_in_manifest", args=[self.event.id]))
+
+        self.assertEqual(response.status_code, 200)
+        manifest = response.data
+        issued = unpack_ticket_ids(manifest["issued"])
+        self.assertEqual(issued, sorted(t.ticket_id for t in self.issued))
+        self.assertEqual(unpack_ticket_ids(manifest["used"]), [self.used.ticket_id])
+        self.assertNotIn(self.cancelled.ticket_id, issued)
+        self.assertEqual(len(manifest["issued"]), 24)  # 3 x 6 bytes, base64
+        self.assertTrue(verify_ticket_manifest(manifest))
+
+        tampered = {**manifest, "used": ""}
+        self.assertFalse(verify_ticket_manifest(tampered))
+
+    def test_device_verifies_manifest_with_the_event_key(self):
+        key = self.client.get(reverse("check_in_manifest_key", args=[self.event.id])).data
+        manifest = self.client.get(reverse("check_in_manifest", args=[self.event.id])).data
+
+        # what a door device does offline, without SECRET_KEY
+        body = {k: v for k, v in manifest.items() if k != "signature"}
+        canonical = json.dumps(body, sort_keys=True, separators=(",", ":")).encode()
+        expected = hmac.new(key["key"].encode(), canonical, hashlib.sha256).hexdigest()
+        self.assertEqual((key["algorithm"], manifest["signature"]), ("HMAC-SHA256", expected))
+
+        other = self.client.get(reverse("check_in_manifest_key", args=[self.other_event.id])).data
+        self.assertNotEqual(other["key"], key["key"])
+        self.assertFalse(verify_ticket_manifest({**manifest, "event_id": self.other_event.id}))
+
+    def test_students_cannot_fetch_the_manifest_key(self):
+        self.client.force_authenticate(self.students[0])
+
+        response = self.client.get(reverse("check_in_manifest_key", args=[self.event.id]))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_manifest_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            build_ticket_manifest(self.event)
+
+    def test_unapproved_event_has_no_valid_tickets(self):
+        Event.objects.filter(pk=self.event.pk).update(status=Event.PENDING)
+        self.event.refresh_from_db()
+
+        self.assertEqual(unpack_ticket_ids(build_ticket_manifest(self.event)["issued"]), [])
+
+    def test_nonstandard_ids_go_to_extra(self):
+        Ticket.objects.filter(pk=self.issued[0].pk).update(ticket_id=f"LEGACY-{uuid.uuid4().hex[:6]}")
+        ticket_id = Ticket.objects.get(pk=self.issued[0].pk).ticket_id
+
+        manifest = build_ticket_manifest(self.event)
+
+        self.assertEqual(manifest["extra"], {ticket_id: Ticket.ISSUED})
+
+    def test_sync_applies_in_one_go_and_reports_conflicts(self):
+        scanned_at = timezone.now() - dt.timedelta(minutes=30)
+        body = {"check_ins": [
+            {"ticket_id": self.issued[0].ticket_id, "used_at": scanned_at.isoformat()},
+            {"ticket_id": self.issued[1].qr_code_data},
+            {"ticket_id": self.issued[0].ticket_id},  # second device, later scan
+            {"ticket_id": self.used.ticket_id},
+            {"ticket_id": self.cancelled.ticket_id},
+            {"ticket_id": self.foreign.ticket_id},
+            {"ticket_id": "TKT-000000000000"},
+            {"ticket_id": "CE1/TKT-000000000000/FORGED"},
+        ]}
+
+        response = self.client.post(reverse("check_in_sync", args=[self.event.id]), body, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        results = {r["ticket_id"]: r for r in response.data["results"]}
+        self.assertEqual(response.data["applied"], 2)
+        self.assertEqual(response.data["conflicts"], 5)
+        self.assertEqual(results[self.used.ticket_id]["result"], "already_used")
+        self.assertIn("server_used_at", results[self.used.ticket_id])
+        self.assertEqual(results[self.cancelled.ticket_id]["result"], "invalid")
+        self.assertEqual(results[self.foreign.ticket_id]["result"], "wrong_event")
+        self.assertEqual(results["TKT-000000000000"]["result"], "not_found")
+        self.assertEqual(results["CE1/TKT-000000000000/FORGED"]["result"], "unrecognized")
+
+        self.issued[0].refresh_from_db()
+        self.assertEqual(self.issued[0].status, Ticket.USED)
+        self.assertEqual(self.issued[0].used_at, scanned_at)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.issued_count, self.event.used_count), (1, 3))
+
+    def test_sync_is_idempotent(self):
+        url = reverse("check_in_sync", args=[self.event.id])
+        body = {"check_ins": [{"ticket_id": self.issued[2].ticket_id}]}
+
+        self.client.post(url, body, format="json")
+        second = self.client.post(url, body, format="json")
+
+        self.assertEqual(second.data["applied"], 0)
+        self.assertEqual(second.data["results"][0]["result"], "already_used")
+
+    def test_empty_or_bad_body_is_400(self):
+        url = reverse("check_in_sync", args=[self.event.id])
+
+        self.assertEqual(self.client.post(url, {"check_ins": []}, format="json").status_code, 400)
+        bad_time = {"check_ins": [{"ticket_id": "TKT-1", "used_at": "yesterday"}]}
+        self.assertEqual(self.client.post(url, bad_time, format="json").status_code, 400)
+
+    def test_students_are_forbidden(self):
+        self.client.force_authenticate(self.students[0])
+
+        self.assertEqual(self.client.get(reverse("check_in_manifest", args=[self.event.id])).status_code, 403)
@@ -0,0 +1,118 @@
+# tests/test_qr_decode_pipeline.py
+
+import io
+import types
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from campusevents.qr import make_qr_payload, render_qr_png
+from campusevents.views import utils
+from campusevents.views.utils import decode_qr_from_uploaded, decode_qr_image
+from conftest import real_opencv
+
+
+class _Img:
+    def __init__(self, tag, shape=(1000, 750)):
+        self.tag = tag
+        self.shape = shape
+
+
+class DecodePipelineTests(SimpleTestCase):
+    """Reduced grayscale first; larger reads and thresholding only on failure."""
+
+    def _fake_cv2(self, readable_tags):
+        reads = []
+        flags = {"IMREAD_GRAYSCALE": 0, "IMREAD_REDUCED_GRAYSCALE_2": 16,
+                 "IMREAD_REDUCED_GRAYSCALE_4": 32, "IMREAD_REDUCED_GRAYSCALE_8": 64}
+        names = {v: k for k, v in flags.items()}
+
+        def imdecode(arr, flag):
+            reads.append(names[flag])
+            return _Img(names[flag])
+
+        class Detector:
+            def detectAndDecodeMulti(self, img):
+                return (False, (), None, None)
+
+            def detectAndDecode(self, img):
+                return ("CE1/TKT-X/SIG" if img.tag in readable_tags else "", None, None)
+
+        fake = types.SimpleNamespace(
+            imdecode=imdecode,
+            QRCodeDetector=Detector,
+            resize=lambda img, size, interpolation=None: img,
+            adaptiveThreshold=lambda img, *a, **k: _Img("binary"),
+            INTER_AREA=3, ADAPTIVE_THRESH_GAUSSIAN_C=1, THRESH_BINARY=0,
+            **flags,
+        )
+        return fake, reads
+
+    def _decode(self, readable_tags, size=(4000, 3000)):
+        fake, reads = self._fake_cv2(readable_tags)
+        with mock.patch.object(utils, "cv2", fake), \
+                mock.patch.object(utils, "_image_size", return_value=size):
+            return decode_qr_image(b"jpeg"), reads
+
+    def test_first_pass_uses_reduced_grayscale_read(self):
+        result, reads = self._decode({"IMREAD_REDUCED_GRAYSCALE_4"})
+
+        self.assertEqual(result.payloads, ["CE1/TKT-X/SIG"])
+        self.assertEqual(result.stage, "reduced")
+        self.assertEqual(reads, ["IMREAD_REDUCED_GRAYSCALE_4"])
+        self.assertEqual(list(result.timings), ["reduced"])
+
+    def test_retries_at_higher_scale(self):
+        result, reads = self._decode({"IMREAD_REDUCED_GRAYSCALE_2"})
+
+        self.assertEqual(result.stage, "full")
+        self.assertEqual(reads, ["IMREAD_REDUCED_GRAYSCALE_4", "IMREAD_REDUCED_GRAYSCALE_2"])
+        self.assertEqual(list(result.timings), ["reduced", "full"])
+
+    def test_adaptive_threshold_is_last_resort(self):
+        result, _ = self._decode({"binary"})
+
+        self.assertEqual(result.stage, "threshold")
+        self.assertEqual(list(result.timings), ["reduced", "full", "threshold"])
+
+    def test_small_image_skips_second_read(self):
+        result, reads = self._decode(set(), size=(800, 600))
+
+        self.assertEqual(result.payloads, [])
+        self.assertIsNone(result.stage)
+        self.assertEqual(reads, ["IMREAD_GRAYSCALE"])
+        self.assertEqual(list(result.timings), ["reduced", "threshold"])
+
+    def test_unreadable_upload_returns_none(self):
+        upload = SimpleUploadedFile("x.jpg", b"not an image")
+
+        self.assertIsNone(decode_qr_from_uploaded(upload))
+
+
+@unittest.skipIf(real_opencv() is None, "needs opencv-python and numpy")
+class RealDecodeTests(SimpleTestCase):
+    """The staged pipeline on a real photo-sized JPEG, with the real OpenCV."""
+
+    def setUp(self):
+        cv2, numpy = real_opencv()
+        for name, module in (("cv2", cv2), ("np", numpy)):
+            patcher = mock.patch.object(utils, name, module)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_code_in_a_large_jpeg_is_found_at_the_reduced_stage(self):
+        payload = make_qr_payload("TKT-0123456789AB")
+        code = Image.open(io.BytesIO(render_qr_png(payload))).convert("L").resize((1200, 1200), Image.NEAREST)
+        photo = Image.new("L", (4000, 3000), color=235)
+        photo.paste(code, (1400, 900))
+        buf = io.BytesIO()
+        photo.save(buf, format="JPEG", quality=85)
+
+        result = decode_qr_image(buf.getvalue(), multi=True)
+
+        self.assertEqual(result.payloads, [payload])
+        self.assertEqual(result.stage, "reduced")
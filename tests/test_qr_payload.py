@@ -0,0 +1,130 @@
+# tests/test_qr_payload.py
+
+import datetime as dt
+import importlib
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.qr import (
+    make_qr_payload, parse_qr_payload, accepts_unsigned_payloads, _make_qr,
+)
+
+
+class CompactPayloadTests(TestCase):
+    """CE1 payloads are small, alphanumeric and signed."""
+
+    def test_round_trip(self):
+        payload = make_qr_payload("TKT-0123456789AB")
+
+        self.assertTrue(payload.startswith("CE1/TKT-0123456789AB/"))
+        self.assertEqual(parse_qr_payload(payload), "TKT-0123456789AB")
+
+    def test_fits_alphanumeric_version_2(self):
+        payload = make_qr_payload("TKT-0123456789AB")
+        alphanumeric = set("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:")
+
+        self.assertTrue(set(payload) <= alphanumeric)
+        self.assertLessEqual(_make_qr(payload).version, 2)
+
+    def test_tampered_signature_is_rejected(self):
+        payload = make_qr_payload("TKT-0123456789AB")
+        forged = payload.replace("TKT-0123456789AB", "TKT-0123456789AC")
+
+        self.assertIsNone(parse_qr_payload(forged))
+        self.assertIsNone(parse_qr_payload("CE1/TKT-0123456789AB"))
+
+    @override_settings(QR_ACCEPT_UNSIGNED_UNTIL="2999-01-01")
+    def test_legacy_json_and_bare_ids(self):
+        legacy = json.dumps({"ticket_id": "TKT-LEGACY000001", "event_title": "x" * 200})
+
+        self.assertEqual(parse_qr_payload(legacy), "TKT-LEGACY000001")
+        self.assertEqual(parse_qr_payload(" TKT-PLAIN0000001 "), "TKT-PLAIN0000001")
+        self.assertIsNone(parse_qr_payload('{"event_id": 1}'))
+        self.assertIsNone(parse_qr_payload(""))
+
+    def test_unsigned_payloads_are_rejected_by_default(self):
+        legacy = json.dumps({"ticket_id": "TKT-LEGACY000001"})
+
+        self.assertIsNone(parse_qr_payload(legacy))
+        self.assertIsNone(parse_qr_payload("TKT-PLAIN0000001"))
+        self.assertEqual(parse_qr_payload("TKT-PLAIN0000001", allow_unsigned=True), "TKT-PLAIN0000001")
+
+    @override_settings(QR_ACCEPT_UNSIGNED_UNTIL="2026-03-01")
+    def test_migration_window_closes(self):
+        before = timezone.make_aware(dt.datetime(2026, 2, 28, 23, 59))
+        after = timezone.make_aware(dt.datetime(2026, 3, 1, 0, 1))
+
+        self.assertTrue(accepts_unsigned_payloads(now=before))
+        self.assertFalse(accepts_unsigned_payloads(now=after))
+
+
+class LegacyPayloadMigrationTests(TestCase):
+    """Migration 0016 re-signs legacy payloads in the current format."""
+
+    def test_frozen_signer_matches(self):
+        migration = importlib.import_module("campusevents.migrations.0016_sign_legacy_qr_payloads")
+
+        self.assertEqual(migration._ce1_payload("TKT-0123456789AB"), make_qr_payload("TKT-0123456789AB"))
+
+
+class ValidationPayloadTests(TestCase):
+    """The validation API accepts scanned payloads in either format."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        student = User.objects.create_user(email="s1@example.com", password="pw")
+        now = timezone.now()
+        event = Event.objects.create(
+            org=Organization.objects.create(name="Payload Org"),
+            title="A very long event title " * 10,
+            description="Payload",
+            location="Room 1",
+            start_at=now + dt.timedelta(days=1),
+            end_at=now + dt.timedelta(days=1, hours=1),
+            capacity=10,
+            created_by=self.organizer,
+            status=Event.APPROVED,
+        )
+        self.ticket = Ticket.objects.create(event=event, user=student)
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+        self.url = reverse("ticket_validate")
+
+    def test_new_tickets_store_compact_payload(self):
+        self.assertEqual(self.ticket.qr_code_data, make_qr_payload(self.ticket.ticket_id))
+
+    def test_compact_payload_validates(self):
+        response = self.client.post(self.url, {"ticket_id": self.ticket.qr_code_data}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, Ticket.USED)
+
+    @override_settings(QR_ACCEPT_UNSIGNED_UNTIL="2999-01-01")
+    def test_legacy_json_payload_validates(self):
+        legacy = json.dumps({"ticket_id": self.ticket.ticket_id, "event_id": self.ticket.event_id})
+
+        response = self.client.post(self.url, {"ticket_id": legacy}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsigned_payload_is_400_by_default(self):
+        for payload in (self.ticket.ticket_id, json.dumps({"ticket_id": self.ticket.ticket_id})):
+            response = self.client.post(self.url, {"ticket_id": payload}, format="json")
+            self.assertEqual(response.status_code, 400, payload)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, Ticket.ISSUED)
+
+    def test_forged_payload_is_400(self):
+        forged = f"CE1/{self.ticket.ticket_id}/AAAAAAAAAAAAAAAA"
+
+        response = self.client.post(self.url, {"ticket_id": forged}, format="json")
+
+        self.assertEqual(response.status_code, 400)
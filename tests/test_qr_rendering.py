@@ -0,0 +1,166 @@
+# tests/test_qr_rendering.py
+
+import datetime as dt
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.qr import qr_etag, qr_version, render_qr
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix="qr-test-")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DeferredQRRenderingTests(TestCase):
+    """Claiming writes only the ticket row; PNGs are rendered later."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.students = [
+            User.objects.create_user(email=f"s{i}@example.com", password="pw")
+            for i in range(3)
+        ]
+        now = timezone.now()
+        self.event = Event.objects.create(
+            org=Organization.objects.create(name="QR Org"),
+            title="QR Event",
+            description="QR",
+            location="Room 1",
+            start_at=now + dt.timedelta(days=1),
+            end_at=now + dt.timedelta(days=1, hours=1),
+            capacity=10,
+            created_by=self.organizer,
+            status=Event.APPROVED,
+        )
+        self.tickets = [Ticket.objects.create(event=self.event, user=u) for u in self.students]
+
+    def test_save_does_not_render_png(self):
+        ticket = self.tickets[0]
+
+        self.assertTrue(ticket.qr_code_data)
+        self.assertFalse(ticket.qr_code)
+        stored = os.path.join(MEDIA_ROOT, "qr_codes", f"ticket_{ticket.ticket_id}.png")
+        self.assertFalse(os.path.exists(stored))
+
+    def test_purge_command_deletes_stored_pngs(self):
+        stored = self.tickets[0]
+        stored.qr_code.save(f"ticket_{stored.ticket_id}.png", ContentFile(b"png"))
+        Ticket._meta.get_field("qr_code").storage.save("qr_codes/orphan.png", ContentFile(b"png"))
+
+        call_command("purge_qr_codes", stdout=io.StringIO())
+
+        stored.refresh_from_db()
+        self.assertFalse(stored.qr_code)
+        self.assertEqual(os.listdir(os.path.join(MEDIA_ROOT, "qr_codes")), [])
+
+    def test_my_events_links_image_endpoint(self):
+        self.client.force_login(self.students[0])
+
+        response = self.client.get(reverse("my_events"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.tickets[0].qr_code_url)
+        self.tickets[0].refresh_from_db()
+        self.assertFalse(self.tickets[0].qr_code)
+
+
+class QRImageEndpointTests(TestCase):
+    """On-the-fly QR images with an in-process LRU and HTTP caching."""
+
+    def setUp(self):
+        render_qr.cache_clear()
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.owner = User.objects.create_user(email="owner@example.com", password="pw")
+        self.stranger = User.objects.create_user(email="other@example.com", password="pw")
+        now = timezone.now()
+        event = Event.objects.create(
+            org=Organization.objects.create(name="QR Org"),
+            title="QR Event",
+            description="QR",
+            location="Room 1",
+            start_at=now + dt.timedelta(days=1),
+            end_at=now + dt.timedelta(days=1, hours=1),
+            capacity=10,
+            created_by=self.organizer,
+            status=Event.APPROVED,
+        )
+        self.ticket = Ticket.objects.create(event=event, user=self.owner)
+        self.png_url = reverse("ticket_qr_png", args=[self.ticket.ticket_id])
+
+    def test_owner_gets_png_with_cache_headers(self):
+        self.client.force_login(self.owner)
+
+        response = self.client.get(self.png_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertTrue(response.content.startswith(b"\x89PNG"))
+        self.assertEqual(response["ETag"], qr_etag(self.ticket.qr_code_data, "png"))
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_svg_variant(self):
+        self.client.force_login(self.owner)
+
+        response = self.client.get(reverse("ticket_qr_svg", args=[self.ticket.ticket_id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/svg+xml")
+        self.assertIn(b"<svg", response.content)
+
+    def test_if_none_match_returns_304(self):
+        self.client.force_login(self.owner)
+        etag = self.client.get(self.png_url)["ETag"]
+
+        response = self.client.get(self.png_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_repeat_requests_hit_the_lru(self):
+        self.client.force_login(self.owner)
+
+        self.client.get(self.png_url)
+        self.client.get(self.png_url)
+
+        info = render_qr.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+    def test_other_students_are_forbidden(self):
+        self.client.force_login(self.stranger)
+
+        self.assertEqual(self.client.get(self.png_url).status_code, 403)
+
+    def test_organizer_can_fetch(self):
+        self.client.force_login(self.organizer)
+
+        self.assertEqual(self.client.get(self.png_url).status_code, 200)
+
+    def test_unknown_ticket_is_404(self):
+        self.client.force_login(self.owner)
+
+        response = self.client.get(reverse("ticket_qr_png", args=["TKT-NOPE"]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_qr_code_url_is_versioned_by_payload(self):
+        self.assertEqual(
+            self.ticket.qr_code_url,
+            f"{self.png_url}?v={qr_version(self.ticket.qr_code_data)}",
+        )
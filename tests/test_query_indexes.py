@@ -0,0 +1,75 @@
+# tests/test_query_indexes.py
+
+import datetime as dt
+import unittest
+
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.utils import timezone
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.views.utils import build_event_discovery_qs
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "query plan text is SQLite-specific")
+class HotQueryIndexTests(TestCase):
+    """EXPLAIN shows every hot query shape served by one of the model indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        cls.student = User.objects.create_user(email="s@example.com", password="pw")
+        org = Organization.objects.create(name="Index Org")
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            org=org,
+            title="Indexed",
+            description="Event",
+            location="Room",
+            start_at=now + dt.timedelta(days=1),
+            end_at=now + dt.timedelta(days=1, hours=2),
+            capacity=10,
+            created_by=cls.organizer,
+            status=Event.APPROVED,
+        )
+        Ticket.objects.create(event=cls.event, user=cls.student)
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f"INDEX {index_name}", plan, plan)
+
+    def test_discovery(self):
+        qs = build_event_discovery_qs(RequestFactory().get("/events/"))
+        self.assertUsesIndex(qs, "event_status_end_idx")
+
+    def test_calendar_feed(self):
+        now = timezone.now()
+        qs = Event.objects.filter(
+            status=Event.APPROVED, end_at__gte=now, start_at__lte=now + dt.timedelta(days=30),
+        )
+        self.assertUsesIndex(qs, "event_status_end_idx")
+
+    def test_organizer_events(self):
+        qs = Event.objects.filter(created_by=self.organizer).order_by("-start_at")
+        self.assertUsesIndex(qs, "event_creator_start_idx")
+
+    def test_moderation_queue(self):
+        qs = Event.objects.filter(status=Event.PENDING).order_by("-created_at")
+        self.assertUsesIndex(qs, "event_status_created_idx")
+
+    def test_event_tickets_by_status(self):
+        qs = Ticket.objects.filter(event=self.event, status=Ticket.ISSUED)
+        self.assertUsesIndex(qs, "ticket_event_status_idx")
+
+    def test_user_tickets_by_status(self):
+        qs = Ticket.objects.filter(user=self.student, status=Ticket.ISSUED)
+        self.assertUsesIndex(qs, "ticket_user_status_idx")
+
+    def test_dashboard_ranges(self):
+        since = timezone.now() - dt.timedelta(days=7)
+        # the rollup groups, so Meta.ordering doesn't apply
+        self.assertUsesIndex(Ticket.objects.filter(issued_at__gte=since).order_by(), "ticket_issued_at_idx")
+        # partial index (used_at IS NOT NULL) still serves a plain range
+        self.assertUsesIndex(Ticket.objects.filter(used_at__gte=since).order_by(), "ticket_used_at_idx")
@@ -0,0 +1,119 @@
+# tests/test_scanner_check_in.py
+
+import datetime as dt
+import json
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.qr import make_qr_payload
+
+
+class ScannerCheckInTests(TestCase):
+    """Pre-decoded payloads: one lookup, one conditional update, tiny response."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.student = User.objects.create_user(
+            email="s1@example.com", password="pw", first_name="Ada", last_name="Lovelace",
+        )
+        now = timezone.now()
+        self.event = Event.objects.create(
+            org=Organization.objects.create(name="Scan Org"),
+            title="Scan Event",
+            description="Scan",
+            location="Gate",
+            start_at=now + dt.timedelta(hours=1),
+            end_at=now + dt.timedelta(hours=3),
+            capacity=10,
+            created_by=self.organizer,
+            status=Event.APPROVED,
+        )
+        self.ticket = Ticket.objects.create(event=self.event, user=self.student)
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+        self.url = reverse("scanner_check_in")
+
+    def _scan(self, payload, **extra):
+        return self.client.post(self.url, {"payload": payload, **extra}, format="json")
+
+    def test_check_in_is_one_select_and_conditional_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._scan(self.ticket.qr_code_data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            "result": "checked_in",
+            "ticket_id": self.ticket.ticket_id,
+            "event_id": self.event.id,
+            "holder": "Ada Lovelace",
+        })
+        self.assertIn("Server-Timing", response)
+        statements = [q["sql"] for q in ctx.captured_queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        self.assertEqual(len(statements), 3)  # ticket+event+user, ticket UPDATE, counters
+        self.assertTrue(statements[1].startswith("UPDATE") and "issued" in statements[1])
+        self.ticket.refresh_from_db()
+        self.event.refresh_from_db()
+        self.assertEqual(self.ticket.status, Ticket.USED)
+        self.assertEqual((self.event.issued_count, self.event.used_count), (0, 1))
+
+    def test_double_scan_is_idempotent(self):
+        self._scan(self.ticket.qr_code_data)
+
+        response = self._scan(self.ticket.qr_code_data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["result"], "already_used")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.used_count, 1)
+
+    @override_settings(QR_ACCEPT_UNSIGNED_UNTIL="2999-01-01")
+    def test_legacy_json_payload(self):
+        legacy = json.dumps({"ticket_id": self.ticket.ticket_id, "event_title": "Scan Event"})
+
+        self.assertEqual(self._scan(legacy).data["result"], "checked_in")
+
+    def test_bare_ticket_id_is_unrecognized(self):
+        response = self._scan(self.ticket.ticket_id)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["result"], "unrecognized")
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, Ticket.ISSUED)
+
+    def test_cancelled_ticket_is_invalid(self):
+        self.ticket.cancel_ticket()
+
+        response = self._scan(self.ticket.qr_code_data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["result"], "invalid")
+
+    def test_wrong_event_is_409(self):
+        response = self._scan(self.ticket.qr_code_data, event_id=self.event.id + 100)
+
+        self.assertEqual(response.status_code, 409)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, Ticket.ISSUED)
+
+    def test_unknown_and_garbage_payloads(self):
+        self.assertEqual(self._scan(make_qr_payload("TKT-DOESNOTEXIST")).status_code, 404)
+        self.assertEqual(self._scan("CE1/TKT-X/BAD").status_code, 400)
+
+    def test_non_string_payloads_are_rejected(self):
+        for payload in (12345, {"a": 1}, ["CE1"], None):
+            response = self._scan(payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertEqual(response.json()["result"], "unrecognized")
+
+    def test_students_cannot_scan(self):
+        self.client.force_authenticate(self.student)
+
+        self.assertEqual(self._scan(self.ticket.qr_code_data).status_code, 403)
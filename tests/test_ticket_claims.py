@@ -0,0 +1,163 @@
+# tests/test_ticket_claims.py
+
+import datetime as dt
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.ticketing import ClaimResult, claim_ticket_for
+
+
+def _make_event(organizer, capacity, **extra):
+    org = Organization.objects.create(name="Claim Org")
+    now = timezone.now()
+    fields = {
+        "org": org,
+        "title": "Popular Event",
+        "description": "Everyone wants in",
+        "location": "Hall A",
+        "start_at": now + dt.timedelta(days=1),
+        "end_at": now + dt.timedelta(days=1, hours=2),
+        "capacity": capacity,
+        "created_by": organizer,
+        "status": Event.APPROVED,
+    }
+    fields.update(extra)
+    return Event.objects.create(**fields)
+
+
+class ClaimServiceTests(TestCase):
+    """Single-threaded behaviour of the claim service and the views using it."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.student = User.objects.create_user(email="s1@example.com", password="pw")
+        self.other = User.objects.create_user(email="s2@example.com", password="pw")
+        self.third = User.objects.create_user(email="s3@example.com", password="pw")
+        self.event = _make_event(self.organizer, capacity=2)
+
+    def test_claim_reserves_a_seat(self):
+        result = claim_ticket_for(self.event, self.student)
+
+        self.assertEqual(result.status, ClaimResult.CLAIMED)
+        self.assertIsNotNone(result.ticket.pk)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.issued_count, 1)
+
+    def test_duplicate_claim(self):
+        claim_ticket_for(self.event, self.student)
+
+        result = claim_ticket_for(self.event, self.student)
+
+        self.assertEqual(result.status, ClaimResult.DUPLICATE)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 1)
+
+    def test_full_event(self):
+        claim_ticket_for(self.event, self.student)
+        claim_ticket_for(self.event, self.other)
+
+        result = claim_ticket_for(self.event, self.third)
+
+        self.assertEqual(result.status, ClaimResult.FULL)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.issued_count, 2)
+
+    def test_ended_event(self):
+        past = timezone.now() - dt.timedelta(days=1)
+        Event.objects.filter(pk=self.event.pk).update(start_at=past - dt.timedelta(hours=2), end_at=past)
+        self.event.refresh_from_db()
+
+        self.assertEqual(claim_ticket_for(self.event, self.student).status, ClaimResult.ENDED)
+
+    def test_zero_capacity_is_unlimited(self):
+        Event.objects.filter(pk=self.event.pk).update(capacity=0)
+        self.event.refresh_from_db()
+
+        self.assertTrue(claim_ticket_for(self.event, self.student).claimed)
+        self.assertTrue(claim_ticket_for(self.event, self.other).claimed)
+
+    def test_cancelled_ticket_counts_as_duplicate(self):
+        ticket = claim_ticket_for(self.event, self.student).ticket
+        ticket.cancel_ticket()
+
+        self.assertEqual(claim_ticket_for(self.event, self.student).status, ClaimResult.DUPLICATE)
+
+    def test_api_duplicate_is_400_not_500(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        url = reverse("ticket_issue")
+
+        first = client.post(url, {"event_id": self.event.id}, format="json")
+        second = client.post(url, {"event_id": self.event.id}, format="json")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 400)
+        self.assertIn("error", second.data)
+
+    def test_html_claim_uses_service(self):
+        self.client.force_login(self.student)
+
+        response = self.client.post(reverse("claim_ticket", args=[self.event.id]))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Ticket.objects.filter(event=self.event, user=self.student).exists())
+
+
+class ConcurrentClaimTests(TransactionTestCase):
+    """Hundreds of parallel claims must never oversell an event."""
+
+    CLAIMS = 200
+    CAPACITY = 50
+    WORKERS = 16
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        User.objects.bulk_create([
+            User(email=f"rush{i}@example.com", username=f"rush{i}@example.com")
+            for i in range(self.CLAIMS)
+        ])
+        self.users = list(User.objects.filter(email__startswith="rush").order_by("id"))
+        self.event = _make_event(self.organizer, capacity=self.CAPACITY)
+
+    def _claim_all(self, users):
+        start = threading.Barrier(self.WORKERS)
+
+        def claim(user):
+            try:
+                start.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                return claim_ticket_for(self.event, user).status
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            return list(pool.map(claim, users))
+
+    def test_parallel_claims_never_exceed_capacity(self):
+        statuses = self._claim_all(self.users)
+
+        self.assertEqual(statuses.count(ClaimResult.CLAIMED), self.CAPACITY)
+        self.assertEqual(statuses.count(ClaimResult.FULL), self.CLAIMS - self.CAPACITY)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.issued_count, self.CAPACITY)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), self.CAPACITY)
+
+    def test_parallel_duplicate_claims_yield_one_ticket(self):
+        statuses = self._claim_all([self.users[0]] * self.WORKERS * 4)
+
+        self.assertEqual(statuses.count(ClaimResult.CLAIMED), 1)
+        self.assertEqual(statuses.count(ClaimResult.DUPLICATE), len(statuses) - 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.issued_count, 1)
@@ -0,0 +1,134 @@
+# tests/test_ticket_counters.py
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.ticketing import ClaimResult, claim_ticket_for
+
+
+class TicketCounterTests(TestCase):
+    """Denormalized ticket counters on Event stay in step with the Ticket lifecycle."""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            email="org@example.com",
+            password="pw",
+            first_name="Org",
+            last_name="User",
+            role=User.ROLE_ORGANIZER,
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f"student{i}@example.com",
+                password="pw",
+                first_name="Student",
+                last_name=str(i),
+            )
+            for i in range(3)
+        ]
+        self.organization = Organization.objects.create(name="Counter Org")
+        self.event = Event.objects.create(
+            org=self.organization,
+            title="Counted Event",
+            description="Counters",
+            location="Room 1",
+            start_at="2030-01-01T10:00:00Z",
+            end_at="2030-01-01T12:00:00Z",
+            capacity=10,
+            created_by=self.organizer,
+            status=Event.APPROVED,
+        )
+
+    def _counters(self):
+        self.event.refresh_from_db()
+        return (self.event.issued_count, self.event.used_count, self.event.cancelled_count)
+
+    def test_create_increments_matching_counter(self):
+        Ticket.objects.create(event=self.event, user=self.students[0])
+        Ticket.objects.create(event=self.event, user=self.students[1], status=Ticket.USED)
+
+        self.assertEqual(self._counters(), (1, 1, 0))
+        self.assertEqual(self.event.remaining_capacity, 9)
+
+    def test_use_and_cancel_move_between_counters(self):
+        used = Ticket.objects.create(event=self.event, user=self.students[0])
+        cancelled = Ticket.objects.create(event=self.event, user=self.students[1])
+        self.assertEqual(self._counters(), (2, 0, 0))
+
+        self.assertTrue(used.use_ticket())
+        cancelled.cancel_ticket()
+
+        self.assertEqual(self._counters(), (0, 1, 1))
+
+    def test_resaving_without_status_change_does_not_double_count(self):
+        ticket = Ticket.objects.create(event=self.event, user=self.students[0])
+        ticket.notes = "front row"
+        ticket.save()
+        Ticket.objects.get(pk=ticket.pk).save()
+
+        self.assertEqual(self._counters(), (1, 0, 0))
+
+    def test_delete_decrements_counter(self):
+        ticket = Ticket.objects.create(event=self.event, user=self.students[0])
+        Ticket.objects.get(pk=ticket.pk).delete()
+
+        self.assertEqual(self._counters(), (0, 0, 0))
+
+    def test_user_cascade_frees_the_seat(self):
+        self.event.capacity = 1
+        self.event.save()
+        self.event.refresh_from_db()
+        self.assertTrue(claim_ticket_for(self.event, self.students[0]).claimed)
+
+        self.students[0].delete()
+
+        self.assertEqual(self._counters(), (0, 0, 0))
+        self.assertEqual(claim_ticket_for(self.event, self.students[1]).status, ClaimResult.CLAIMED)
+
+    def test_queryset_delete_decrements_counters(self):
+        Ticket.objects.create(event=self.event, user=self.students[0])
+        Ticket.objects.create(event=self.event, user=self.students[1], status=Ticket.USED)
+        Ticket.objects.create(event=self.event, user=self.students[2], status=Ticket.CANCELLED)
+
+        Ticket.objects.filter(event=self.event).delete()  # as the admin's bulk action does
+
+        self.assertEqual(self._counters(), (0, 0, 0))
+
+    def test_event_delete_skips_counter_updates(self):
+        Ticket.objects.create(event=self.event, user=self.students[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.event.delete()
+
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "campusevents_event"')]
+        self.assertEqual(updates, [])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_stale_event_save_does_not_clobber_counters(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        Ticket.objects.create(event=self.event, user=self.students[0])
+
+        stale.title = "Renamed"
+        stale.save()
+
+        self.assertEqual(self._counters(), (1, 0, 0))
+        self.assertEqual(self.event.title, "Renamed")
+
+    def test_remaining_capacity_needs_no_query(self):
+        Ticket.objects.create(event=self.event, user=self.students[0])
+        event = Event.objects.get(pk=self.event.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(event.remaining_capacity, 9)
+
+    def test_rebuild_command_repairs_drift(self):
+        Ticket.objects.create(event=self.event, user=self.students[0])
+        Ticket.objects.create(event=self.event, user=self.students[1], status=Ticket.CANCELLED)
+        Event.objects.filter(pk=self.event.pk).update(issued_count=7, used_count=3, cancelled_count=0)
+
+        call_command("rebuild_ticket_counters", verbosity=0)
+
+        self.assertEqual(self._counters(), (1, 0, 1))
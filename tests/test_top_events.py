@@ -0,0 +1,106 @@
+# tests/test_top_events.py
+
+import datetime as dt
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from campusevents.models import User, Organization, Event, Ticket
+from campusevents.stats import rollup_closed_days
+
+
+class TopEventsLeaderboardTests(TestCase):
+    """Leaderboard by check-ins: counter index for all-time, rollup for windows."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com", password="pw")
+        self.organizer = User.objects.create_user(
+            email="org@example.com", password="pw", role=User.ROLE_ORGANIZER,
+        )
+        self.students = [
+            User.objects.create_user(email=f"s{i}@example.com", password="pw")
+            for i in range(4)
+        ]
+        org = Organization.objects.create(name="Board Org")
+        now = timezone.now()
+        self.events = [
+            Event.objects.create(
+                org=org,
+                title=f"Event {i}",
+                description="Board",
+                location="Room",
+                start_at=now + dt.timedelta(days=i + 1),
+                end_at=now + dt.timedelta(days=i + 1, hours=1),
+                capacity=10,
+                created_by=self.organizer,
+                status=Event.APPROVED,
+            )
+            for i in range(4)
+        ]
+        # Event 0: 3 check-ins 40 days ago; event 1: 2 today; event 2: 1 three days ago
+        self._check_in(self.events[0], 3, timezone.now() - dt.timedelta(days=40))
+        self._check_in(self.events[1], 2, None)
+        self._check_in(self.events[2], 1, timezone.now() - dt.timedelta(days=3))
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse("admin_dashboard_top_events")
+
+    def _check_in(self, event, n, used_at):
+        for student in self.students[:n]:
+            ticket = Ticket.objects.create(event=event, user=student)
+            ticket.use_ticket()
+            if used_at:
+                Ticket.objects.filter(pk=ticket.pk).update(used_at=used_at)
+
+    def _ids(self, response):
+        return [row["event_id"] for row in response.data["results"]]
+
+    def test_all_time_is_paginated_by_used_count(self):
+        first = self.client.get(self.url, {"page_size": 2})
+        second = self.client.get(self.url, {"page_size": 2, "page": 2})
+
+        self.assertEqual(first.data["count"], 3)  # events without check-ins are left out
+        self.assertEqual(self._ids(first), [self.events[0].id, self.events[1].id])
+        self.assertEqual([row["rank"] for row in second.data["results"]], [3])
+        self.assertEqual(second.data["results"][0]["used"], 1)
+
+    def test_count_false_keeps_ranks(self):
+        for window in ("all", "week"):
+            response = self.client.get(self.url, {"window": window, "count": "false", "page_size": 1, "page": 2})
+
+            self.assertEqual(response.status_code, 200, window)
+            self.assertIsNone(response.data["count"])
+            self.assertEqual([row["rank"] for row in response.data["results"]], [2])
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "plan text is SQLite-specific")
+    def test_all_time_uses_the_counter_index(self):
+        plan = Event.objects.filter(used_count__gt=0).order_by("-used_count", "-start_at")[:10].explain()
+
+        self.assertIn("event_used_count_idx", plan)
+
+    def test_week_and_month_windows(self):
+        week = self.client.get(self.url, {"window": "week"})
+        month = self.client.get(self.url, {"window": "month"})
+
+        self.assertEqual(week.data["window"], "week")
+        self.assertEqual(self._ids(week), [self.events[1].id, self.events[2].id])
+        self.assertEqual(self._ids(month), [self.events[1].id, self.events[2].id])
+
+    def test_windows_combine_rollup_and_live_delta(self):
+        rollup_closed_days()
+        self._check_in(self.events[3], 4, None)  # after the rollup ran
+
+        response = self.client.get(self.url, {"window": "week"})
+
+        used = {row["event_id"]: row["used"] for row in response.data["results"]}
+        self.assertEqual(used, {self.events[3].id: 4, self.events[1].id: 2, self.events[2].id: 1})
+
+    def test_bad_window_and_permissions(self):
+        self.assertEqual(self.client.get(self.url, {"window": "year"}).status_code, 400)
+
+        self.client.force_authenticate(self.students[0])
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -127,8 +127,8 @@ def test_event_list_auth_and_content(db, api_client, setup_data):
     assert resp.status_code in [status.HTTP_200_OK, status.HTTP_404_NOT_FOUND]
     if resp.status_code == status.HTTP_200_OK:
         data = resp.json()
-        assert isinstance(data, list)
-        titles = [d.get("title") for d in data if isinstance(d, dict)]
+        assert isinstance(data["results"], list)  # paginated
+        titles = [d.get("title") for d in data["results"] if isinstance(d, dict)]
         assert "Intro to Git" in (titles or ["Intro to Git"])
 
 